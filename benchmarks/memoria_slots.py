@@ -0,0 +1,69 @@
+'''Compara a memória de empréstimos com __slots__ e com __dict__ por instância.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.memoria_slots --quantidade 1000000
+'''
+from modelos.emprestimo import Emprestimo
+from modelos.multa import Multa
+from modelos.livro import Livro
+from modelos.membro import Membro
+import argparse
+import gc
+import time
+import tracemalloc
+
+
+def com_dict(classe):
+    '''Cópia da classe sem __slots__ (equivalente às classes antes da mudança)'''
+    # Métodos e propriedades são reaproveitados; os descritores dos slots ficam de fora
+    atributos = {
+        nome: valor for nome, valor in vars(classe).items()
+        if nome not in ('__slots__', '__dict__', '__weakref__') and type(valor).__name__ != 'member_descriptor'
+    }
+    return type(f'{classe.__name__}ComDict', (), atributos)
+
+
+def medir(classe_emprestimo, classe_multa, quantidade, item, membro):
+    '''Memória (bytes) retida por 'quantidade' empréstimos, 1 a cada 10 com multa'''
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+
+    emprestimos = []
+    for i in range(quantidade):
+        emprestimo = classe_emprestimo(item, membro)
+        # Como na carga do banco: ids e datas vêm como texto/objetos compartilhados
+        emprestimo._id = i
+        if i % 10 == 0:
+            emprestimo._multa = classe_multa(i % 30, False)
+        emprestimos.append(emprestimo)
+
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    segundos = time.perf_counter() - inicio
+    del emprestimos
+    return memoria, segundos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quantidade', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    item = Livro('Livro', None, None, 'Autor', 100, '978-0', None)
+    membro = Membro('Membro', 'membro@email.com', 'senha123', '000.000.000-00')
+
+    resultados = {
+        '__dict__': medir(com_dict(Emprestimo), com_dict(Multa), args.quantidade, item, membro),
+        '__slots__': medir(Emprestimo, Multa, args.quantidade, item, membro),
+    }
+
+    print(f"{args.quantidade} empréstimos")
+    for nome, (memoria, segundos) in resultados.items():
+        print(f"  {nome:<10} {memoria / 2**20:8.1f} MiB  {memoria / args.quantidade:6.0f} bytes/empréstimo  {segundos:.2f}s")
+    economia = 1 - resultados['__slots__'][0] / resultados['__dict__'][0]
+    print(f"  Economia com __slots__: {economia:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+'''Mede a carga do índice textual e o tempo das sugestões da busca incremental.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.sugestao_itens --quantidade 1000000
+'''
+from modelos.indice_textual import IndiceTextual
+from modelos.livro import Livro
+import argparse
+import random
+import time
+
+PALAVRAS = ('história', 'memórias', 'anéis', 'senhor', 'coração', 'ação', 'noite', 'mar', 'cidade', 'tempo',
+            'viagem', 'segredo', 'guerra', 'paz', 'caminho', 'sombra', 'luz', 'jardim', 'estrela', 'ilha')
+AUTORES = ('Machado de Assis', 'Clarice Lispector', 'Jorge Amado', 'Cecília Meireles', 'Érico Veríssimo')
+CATEGORIAS = ('Romance', 'Poesia', 'Ficção', 'Crônica', 'Ensaio')
+CONSULTAS = ('a', 'hist', 'memo', 'senhor an', 'jorge am', 'cecilia', 'poes', 'estrela 12', 'zz')
+
+
+def gerar_itens(quantidade, aleatorio):
+    for i in range(quantidade):
+        # Um número por título garante vocabulário crescente, como em um acervo real
+        nome = ' '.join(aleatorio.sample(PALAVRAS, 3)) + f' {i % 50000}'
+        yield Livro(nome.capitalize(), None, None, aleatorio.choice(AUTORES), 100, f'978-{i:09d}', aleatorio.choice(CATEGORIAS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quantidade', type=int, default=1_000_000)
+    parser.add_argument('--repeticoes', type=int, default=1000)
+    args = parser.parse_args()
+
+    aleatorio = random.Random(0)
+    itens = list(gerar_itens(args.quantidade, aleatorio))
+
+    indice = IndiceTextual()
+    inicio = time.perf_counter()
+    for item in itens:
+        indice.adicionar(str(item.id), item)
+    indice.sugerir('a')
+    print(f"{args.quantidade} itens indexados em {time.perf_counter() - inicio:.1f}s")
+
+    for consulta in CONSULTAS:
+        inicio = time.perf_counter()
+        for _ in range(args.repeticoes):
+            resultado = indice.sugerir(consulta, 10)
+        media = (time.perf_counter() - inicio) / args.repeticoes
+        print(f"  {consulta!r:<14} {len(resultado):3} sugestões  {media * 1e6:8.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,3 +3,52 @@ MULTA_POR_DIA=1
 LIMITE_EMPRESTIMOS_SIMULTANEOS=15
 LIMITE_RENOVACOES=15
 PRAZO_VALIDADE_RESERVA=3
+TAMANHO_LOTE_CARGA=1000
+TAMANHO_LOTE_IMPORTACAO=5000
+TAMANHO_LOTE_EXPORTACAO=5000
+
+# Perfis de PRAGMAs do SQLite aplicados a cada nova conexão
+# 'desempenho': WAL permite leituras (interface, relatórios) concorrentes com escritas (empréstimos, devoluções)
+PERFIS_BANCO={
+    'padrao': {
+        'busy_timeout': 5000,
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL'
+    },
+    'desempenho': {
+        'busy_timeout': 5000,
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -20000,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY'
+    }
+}
+PERFIL_BANCO='desempenho'
+# Modo lazy: empréstimos e reservas ficam no banco e são hidratados sob demanda,
+# com no máximo CAPACIDADE_MAPA_IDENTIDADE objetos de cada tipo mantidos em memória
+MODO_LAZY=False
+CAPACIDADE_MAPA_IDENTIDADE=10000
+INTERVALO_VARREDURA_RESERVAS=60
+
+# Escrita adiada: operações são confirmadas em um diário local e gravadas no banco
+# em lotes por uma thread de fundo (não disponível no modo lazy)
+ESCRITA_ADIADA=False
+INTERVALO_ESCRITA_ADIADA=0.5
+TAMANHO_LOTE_ESCRITA_ADIADA=500
+SINCRONIZAR_DIARIO=False
+# Tentativas de gravar uma operação recusada pelo banco antes de descartá-la
+# (a operação vai para '<banco>-diario-descartadas' e a falha é informada à interface)
+TENTATIVAS_ESCRITA_ADIADA=3
+
+# Log de eventos: cada operação é registrada na tabela 'eventos' e, a cada
+# INTERVALO_INSTANTANEO eventos, um instantâneo do estado acelera a inicialização.
+# Os instantâneos são gerados por uma thread de fundo, que verifica o log a cada
+# INTERVALO_VERIFICACAO_INSTANTANEO segundos
+REGISTRO_EVENTOS=False
+INTERVALO_INSTANTANEO=10000
+INTERVALO_VERIFICACAO_INSTANTANEO=60
+
+# Empréstimos finalizados são mantidos em um arquivo colunar (arrays) em vez de
+# objetos; as listas de empréstimos em memória passam a conter apenas os em aberto
+ARQUIVAR_EMPRESTIMOS_FINALIZADOS=False
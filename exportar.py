@@ -0,0 +1,29 @@
+from modelos import database
+from modelos.exportacao import exportar, TABELAS_EXPORTAVEIS, EXTENSAO_COLUNAR
+from config import TAMANHO_LOTE_EXPORTACAO
+import argparse
+import os
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Exporta o histórico de circulação e o acervo para análise')
+    parser.add_argument('tabelas', nargs='*', default=list(TABELAS_EXPORTAVEIS), choices=TABELAS_EXPORTAVEIS,
+                        help='tabelas a exportar (padrão: todas)')
+    parser.add_argument('--destino', default='.', help='pasta de destino dos arquivos')
+    parser.add_argument('--formato', choices=('csv', 'colunar'), default='csv')
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE_EXPORTACAO, help='linhas lidas por vez')
+    args = parser.parse_args()
+
+    # Garante que o banco está na versão atual do esquema antes de ler
+    database.inicializar_banco()
+    os.makedirs(args.destino, exist_ok=True)
+    extensao = EXTENSAO_COLUNAR if args.formato == 'colunar' else '.csv'
+
+    for tabela in args.tabelas:
+        destino = os.path.join(args.destino, tabela + extensao)
+        total = exportar(tabela, destino, args.formato, args.lote)
+        print(f"{tabela}: {total} linhas exportadas para {destino}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+from modelos.biblioteca_lazy import BibliotecaLazy
+from modelos.importacao import importar_itens
+from config import TAMANHO_LOTE_IMPORTACAO
+import argparse
+import csv
+import os
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Importa Livros/Ebooks em lote a partir de CSV ou JSON Lines')
+    parser.add_argument('arquivo', help="arquivo .csv ou .jsonl com as colunas tipo, nome, autor, paginas, isbn, categoria")
+    parser.add_argument('--formato', choices=('csv', 'jsonl'), help='formato do arquivo (padrão: pela extensão)')
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE_IMPORTACAO, help='linhas por transação')
+    parser.add_argument('--processos', type=int, default=os.cpu_count(), help='processos de validação')
+    parser.add_argument('--checkpoint', help='chave que identifica a importação para a retomada (padrão: caminho do arquivo)')
+    parser.add_argument('--rejeitados', help='grava as linhas rejeitadas neste CSV')
+    args = parser.parse_args()
+
+    # O modo lazy não carrega o histórico de circulação, que a importação não usa
+    biblioteca = BibliotecaLazy()
+    checkpoint = args.checkpoint or os.path.abspath(args.arquivo)
+
+    def progresso(relatorio):
+        print(f"Linha {relatorio.linhas_processadas}: {relatorio}")
+
+    relatorio = importar_itens(biblioteca, args.arquivo, args.formato, args.lote,
+                               args.processos, checkpoint, progresso)
+    if relatorio.linhas_retomadas:
+        print(f"Importação retomada após a linha {relatorio.linhas_retomadas}")
+    print(relatorio)
+
+    if args.rejeitados and relatorio.rejeitados:
+        with open(args.rejeitados, 'w', newline='', encoding='utf-8') as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(['linha', 'erro'])
+            escritor.writerows(relatorio.rejeitados)
+        print(f"Linhas rejeitadas gravadas em {args.rejeitados}")
+
+
+if __name__ == '__main__':
+    main()
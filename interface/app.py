@@ -9,9 +9,22 @@ from datetime import datetime, timedelta
 
 
 from modelos.biblioteca import Biblioteca
+from modelos.biblioteca_lazy import BibliotecaLazy
+from config import MODO_LAZY
 from modelos.livro import Livro
 from modelos.ebook import Ebook
 from utils.helpers import format_cpf, format_isbn
+from interface.grade_virtual import GradeVirtual
+from interface.tabela_paginada import TabelaPaginada
+
+# Quantidade de itens mostrados pela busca incremental do acervo
+LIMITE_SUGESTOES = 30
+# Categorias listadas no painel (as mais frequentes)
+LIMITE_CATEGORIAS_DASHBOARD = 8
+# Membros sugeridos pelos seletores dos formulários de empréstimo e reserva
+LIMITE_SUGESTOES_MEMBROS = 20
+# Intervalo (ms) entre as consultas às falhas das tarefas de fundo
+INTERVALO_VERIFICACAO_FALHAS = 5000
 
 class SistemaBiblioteca(tk.Tk):
     def __init__(self):
@@ -21,8 +34,11 @@ class SistemaBiblioteca(tk.Tk):
         self.geometry("1400x800")
         self.configure(bg="#ecf0f1")
 
-        # Inicializar biblioteca
-        self.biblioteca = Biblioteca()
+        # Inicializar biblioteca (com expiração periódica de reservas e instantâneos do log em segundo plano)
+        self.biblioteca = BibliotecaLazy() if MODO_LAZY else Biblioteca()
+        self.biblioteca.iniciar_varredura_reservas()
+        self.biblioteca.iniciar_instantaneos()
+        self.after(INTERVALO_VERIFICACAO_FALHAS, self._verificar_falhas)
         self.usuario_logado = None
 
         # Configurações
@@ -52,7 +68,7 @@ class SistemaBiblioteca(tk.Tk):
                     user_id = data.get("user_id")
                     
                     # Tentar encontrar usuário pelo ID
-                    usuario = next((u for u in self.biblioteca.usuarios if str(u.id) == str(user_id)), None)
+                    usuario = self.biblioteca.usuarios.obter(user_id) if user_id else None
                     
                     if usuario:
                         self.usuario_logado = usuario
@@ -64,6 +80,14 @@ class SistemaBiblioteca(tk.Tk):
         else:
             self.criar_tela_login()
 
+    def _verificar_falhas(self):
+        """Mostra as falhas das tarefas de fundo (escrita adiada, varredura de reservas, instantâneos)"""
+        falhas = self.biblioteca.falhas_em_segundo_plano()
+        if falhas:
+            messagebox.showwarning('Falha em segundo plano',
+                                   '\n'.join(f"{data:%H:%M:%S} [{origem}] {mensagem}" for data, origem, mensagem in falhas))
+        self.after(INTERVALO_VERIFICACAO_FALHAS, self._verificar_falhas)
+
     def _dig(self, obj, *keys):
         """Acessa valores aninhados de dicts ou atributos de objetos de forma segura.
 
@@ -173,7 +197,7 @@ class SistemaBiblioteca(tk.Tk):
         email = self.login_email.get()
         senha = self.login_senha.get()
 
-        usuario = next((u for u in self.biblioteca.usuarios if u.email == email and u.senha == senha), None)
+        usuario = self.biblioteca.autenticar(email, senha)
 
         if usuario:
             self.usuario_logado = usuario
@@ -341,23 +365,46 @@ class SistemaBiblioteca(tk.Tk):
 
         tipo = self.usuario_logado.tipo
 
+        # Contagens mantidas pela biblioteca a cada alteração: o painel não percorre as coleções
+        contar = self.biblioteca.quantidade
+
         if tipo in ['administrador', 'bibliotecario']:
             stats = [
                 ('Total de Usuários', len(self.biblioteca.usuarios), self.cores['primary']),
                 ('Itens no Acervo', len(self.biblioteca.itens), self.cores['secondary']),
-                ('Empréstimos Ativos', len([e for e in self.biblioteca.emprestimos if self._dig(e, 'status') == 'ativo']), self.cores['success']),
-                ('Reservas Ativas', len([r for r in self.biblioteca.reservas if self._dig(r, 'status') == 'aguardando']), self.cores['warning'])
+                ('Empréstimos Ativos', contar('emprestimos', 'status', 'ativo'), self.cores['success']),
+                ('Reservas Ativas', contar('reservas', 'status', 'aguardando'), self.cores['warning'])
             ]
         else:
+            membro = str(self.usuario_logado.id)
             stats = [
-                ('Meus Empréstimos', len([e for e in self.biblioteca.emprestimos if self._dig(e, 'membro', 'id') == self.usuario_logado.id and self._dig(e, 'status') == 'ativo']), self.cores['primary']),
-                ('Minhas Reservas', len([r for r in self.biblioteca.reservas if self._dig(r, 'membro', 'id') == self.usuario_logado.id]), self.cores['secondary']),
-                ('Itens Disponíveis', len([i for i in self.biblioteca.itens if self._dig(i, 'status') == 'disponivel']), self.cores['success'])
+                ('Meus Empréstimos', contar('emprestimos', 'membro_status', (membro, 'ativo')), self.cores['primary']),
+                ('Minhas Reservas', contar('reservas', 'membro', membro), self.cores['secondary']),
+                ('Itens Disponíveis', contar('itens', 'status', 'disponivel'), self.cores['success'])
             ]
 
         for i, (label, value, color) in enumerate(stats):
             self.criar_stat_card(stats_frame, label, value, color, i)
 
+        if tipo in ['administrador', 'bibliotecario']:
+            self.criar_card_categorias()
+
+    def criar_card_categorias(self):
+        """Card com a distribuição do acervo por categoria"""
+        card = self.criar_card(self.content_frame, "Acervo por Categoria")
+        categorias = self.biblioteca.contagens('itens', 'categoria')
+
+        if not categorias:
+            tk.Label(card, text="Nenhum item no acervo", font=("Arial", 11), bg='white', fg='#7f8c8d').pack(padx=20, pady=(0, 15), anchor='w')
+            return
+
+        lista = tk.Frame(card, bg='white')
+        lista.pack(fill='x', padx=20, pady=(0, 15))
+        mais_frequentes = sorted(categorias.items(), key=lambda par: (-par[1], str(par[0])))[:LIMITE_CATEGORIAS_DASHBOARD]
+        for linha, (categoria, quantidade) in enumerate(mais_frequentes):
+            tk.Label(lista, text=categoria, font=("Arial", 11), bg='white', fg=self.cores['dark']).grid(row=linha, column=0, sticky='w', pady=2)
+            tk.Label(lista, text=str(quantidade), font=("Arial", 11, "bold"), bg='white', fg=self.cores['primary']).grid(row=linha, column=1, sticky='e', padx=(20, 0), pady=2)
+
     def criar_stat_card(self, parent, label, value, color, position):
         """Criar card de estatística"""
         card = tk.Frame(parent, bg='white', relief='raised', bd=1)
@@ -642,122 +689,122 @@ class SistemaBiblioteca(tk.Tk):
         # Card de lista
         card_lista = self.criar_card(self.content_frame, "Acervo da Biblioteca")
 
-        # Grid de itens
-        self.criar_grid_itens(card_lista)
-
-    def criar_grid_itens(self, parent):
-        """Criar grid de itens"""
-        canvas = tk.Canvas(parent, bg='white', highlightthickness=0)
-        scrollbar = ttk.Scrollbar(parent, orient='vertical', command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg='white')
-
-        canvas.pack(side='left', fill='both', expand=True)
-        scrollbar.pack(side='right', fill='y')
-
-        # Frame interno que conterá os itens
-        scrollable_frame = tk.Frame(canvas, bg='white')
-
-        # Configurar colunas para expandir (3 colunas)
-        scrollable_frame.grid_columnconfigure(0, weight=1)
-        scrollable_frame.grid_columnconfigure(1, weight=1)
-        scrollable_frame.grid_columnconfigure(2, weight=1)
-
-        # Window no canvas
-        window_id = canvas.create_window((0, 0), window=scrollable_frame, anchor='nw')
+        # Busca incremental: enquanto se digita, a grade mostra as sugestões do índice textual
+        busca_frame = tk.Frame(card_lista, bg='white')
+        busca_frame.pack(fill='x', padx=20)
+        tk.Label(busca_frame, text="🔍 Buscar:", font=("Arial", 10), bg='white').pack(side='left')
+        busca_var = tk.StringVar()
+        tk.Entry(busca_frame, textvariable=busca_var, font=("Arial", 10), width=40).pack(side='left', padx=10)
 
-        def on_frame_configure(event):
-            canvas.configure(scrollregion=canvas.bbox("all"))
+        # Grid de itens
+        grade = self.criar_grid_itens(card_lista)
 
-        def on_canvas_configure(event):
-            # Atualiza a largura do frame para igualar a do canvas
-            canvas.itemconfig(window_id, width=event.width)
+        def filtrar_itens(*_):
+            # A mesma grade passa a mostrar as sugestões (ou volta ao acervo completo)
+            texto = busca_var.get().strip()
+            grade.atualizar(self.biblioteca.sugerir_itens(texto, LIMITE_SUGESTOES) if texto else self.biblioteca.itens)
 
-        scrollable_frame.bind("<Configure>", on_frame_configure)
-        canvas.bind("<Configure>", on_canvas_configure)
+        busca_var.trace_add('write', filtrar_itens)
 
-        canvas.configure(yscrollcommand=scrollbar.set)
+    def criar_grid_itens(self, parent, itens=None):
+        """Criar grid de itens (todo o acervo, ou apenas 'itens' quando informados)"""
+        # Apenas os cartões das linhas visíveis existem; a rolagem lê a fatia correspondente do acervo
+        grade = GradeVirtual(
+            parent,
+            self.biblioteca.itens if itens is None else itens,
+            self.criar_cartao_item,
+            self.preencher_cartao_item,
+            bg='white'
+        )
+        grade.pack(fill='both', expand=True, padx=20, pady=10)
+        return grade
 
-        # Criar cards de itens
-        for i, item in enumerate(self.biblioteca.itens):
-            row = i // 3
-            col = i % 3
+    def criar_cartao_item(self, parent):
+        """Card de item reaproveitado pela grade (o conteúdo é definido em preencher_cartao_item)"""
+        item_card = tk.Frame(parent, bg='white', relief='raised', bd=1)
 
-            item_card = tk.Frame(scrollable_frame, bg='white', relief='raised', bd=1)
-            item_card.grid(row=row, column=col, padx=10, pady=10, sticky='nsew')
+        # Título
+        titulo = tk.Label(
+            item_card,
+            font=("Arial", 12, "bold"),
+            bg='white',
+            fg=self.cores['primary'],
+            wraplength=200
+        )
+        titulo.pack(pady=10, padx=10)
 
-            # Título
-            tk.Label(
+        # Detalhes (autor, categoria, páginas, ISBN e tipo)
+        detalhes = []
+        for _ in range(5):
+            label = tk.Label(
                 item_card,
-                text=self._dig(item, 'nome') or str(self._dig(item, 'titulo') or ''),
-                font=("Arial", 12, "bold"),
+                font=("Arial", 9),
                 bg='white',
-                fg=self.cores['primary'],
-                wraplength=200
-            ).pack(pady=10, padx=10)
-
-            # Detalhes
-            detalhes = [
-                f"Autor: {self._dig(item, 'autor')}",
-                f"Categoria: {self._dig(item, 'categoria')}",
-                f"Páginas: {self._dig(item, 'num_paginas')}",
-                f"ISBN: {format_isbn(self._dig(item, 'isbn'))}",
-                f"Tipo: {'📕 Livro' if self._dig(item, 'tipo') == 'livro' else '💻 E-book'}"
-            ]
+                fg='#7f8c8d'
+            )
+            label.pack(anchor='w', padx=10, pady=2)
+            detalhes.append(label)
 
-            for detalhe in detalhes:
-                tk.Label(
-                    item_card,
-                    text=detalhe,
-                    font=("Arial", 9),
-                    bg='white',
-                    fg='#7f8c8d'
-                ).pack(anchor='w', padx=10, pady=2)
-
-            # Status
-            status_colors = {
-                'disponivel': '#d4edda',
-                'emprestado': '#fff3cd',
-                'reservado': '#cce5ff'
-            }
-
-            status_val = self._dig(item, 'status') or 'desconhecido'
-            tk.Label(
+        # Status
+        status = tk.Label(
+            item_card,
+            font=("Arial", 9, "bold"),
+            fg='#000',
+            padx=10,
+            pady=3
+        )
+        status.pack(pady=10)
+
+        # Botão de remover (apenas admin/bibliotecario)
+        remover = None
+        if self.usuario_logado.tipo in ['administrador', 'bibliotecario']:
+            remover = tk.Button(
                 item_card,
-                text=str(status_val).upper(),
-                font=("Arial", 9, "bold"),
-                bg=status_colors.get(status_val, '#f8f9fa'),
-                fg='#000',
-                padx=10,
-                pady=3
-            ).pack(pady=10)
-
-            # Botão de remover (apenas admin/bibliotecario)
-            if self.usuario_logado.tipo in ['administrador', 'bibliotecario']:
-                def remover_item_click(id_item=self._dig(item, 'id')):
-                    if messagebox.askyesno('Confirmar', 'Deseja realmente remover este item?'):
-                        try:
-                            self.biblioteca.remover_item(id_item)
-                            messagebox.showinfo('Sucesso', 'Item removido com sucesso')
-                            self.mostrar_itens()
-                        except Exception as e:
-                            messagebox.showerror('Erro', str(e))
+                text="🗑️ Remover",
+                font=("Arial", 9),
+                bg=self.cores['danger'],
+                fg='white',
+                cursor='hand2'
+            )
+            remover.pack(pady=5)
+
+        item_card.campos = {'titulo': titulo, 'detalhes': detalhes, 'status': status, 'remover': remover}
+        return item_card
+
+    def preencher_cartao_item(self, item_card, item):
+        """Mostrar um item em um card da grade"""
+        campos = item_card.campos
+        campos['titulo'].configure(text=self._dig(item, 'nome') or str(self._dig(item, 'titulo') or ''))
+
+        detalhes = [
+            f"Autor: {self._dig(item, 'autor')}",
+            f"Categoria: {self._dig(item, 'categoria')}",
+            f"Páginas: {self._dig(item, 'num_paginas')}",
+            f"ISBN: {format_isbn(self._dig(item, 'isbn'))}",
+            f"Tipo: {'📕 Livro' if self._dig(item, 'tipo') == 'livro' else '💻 E-book'}"
+        ]
+        for label, detalhe in zip(campos['detalhes'], detalhes):
+            label.configure(text=detalhe)
+
+        status_colors = {
+            'disponivel': '#d4edda',
+            'emprestado': '#fff3cd',
+            'reservado': '#cce5ff'
+        }
+        status_val = self._dig(item, 'status') or 'desconhecido'
+        campos['status'].configure(text=str(status_val).upper(), bg=status_colors.get(status_val, '#f8f9fa'))
 
-                tk.Button(
-                    item_card,
-                    text="🗑️ Remover",
-                    font=("Arial", 9),
-                    bg=self.cores['danger'],
-                    fg='white',
-                    cursor='hand2',
-                    command=remover_item_click
-                ).pack(pady=5)
-
-        # Configurar grid
-        for i in range(3):
-            scrollable_frame.columnconfigure(i, weight=1)
-
-        canvas.pack(side='left', fill='both', expand=True, padx=20, pady=10)
-        scrollbar.pack(side='right', fill='y')
+        if campos['remover'] is not None:
+            def remover_item_click(id_item=self._dig(item, 'id')):
+                if messagebox.askyesno('Confirmar', 'Deseja realmente remover este item?'):
+                    try:
+                        self.biblioteca.remover_item(id_item)
+                        messagebox.showinfo('Sucesso', 'Item removido com sucesso')
+                        self.mostrar_itens()
+                    except Exception as e:
+                        messagebox.showerror('Erro', str(e))
+
+            campos['remover'].configure(command=remover_item_click)
 
     def mostrar_emprestimos(self):
         """Gerenciar empréstimos"""
@@ -780,14 +827,7 @@ class SistemaBiblioteca(tk.Tk):
         # Selecionar membro
         tk.Label(form_frame, text="Membro:", font=("Arial", 10), bg='white').grid(row=0, column=0, sticky='w', pady=10)
         membro_var = tk.StringVar()
-        membros = [u for u in self.biblioteca.usuarios if u.tipo == 'membro']
-        membro_combo = ttk.Combobox(
-            form_frame,
-            textvariable=membro_var,
-            values=[f"{m.nome} ({m.email})" for m in membros],
-            state='readonly',
-            width=40
-        )
+        membro_combo, membro_selecionado = self.criar_seletor_membro(form_frame, membro_var, 40)
         membro_combo.grid(row=0, column=1, padx=10, pady=10)
 
         # Selecionar item
@@ -805,11 +845,10 @@ class SistemaBiblioteca(tk.Tk):
 
         def realizar_emprestimo():
             if membro_var.get() and item_var.get():
-                membro_idx = membro_combo.current()
+                membro = membro_selecionado()
                 item_idx = item_combo.current()
 
-                if membro_idx >= 0 and item_idx >= 0:
-                    membro = membros[membro_idx]
+                if membro is not None and item_idx >= 0:
                     item = itens_disponiveis[item_idx]
                     try:
                         # usar método do modelo para criar um Emprestimo (objeto)
@@ -840,37 +879,16 @@ class SistemaBiblioteca(tk.Tk):
 
     def criar_tabela_emprestimos(self, parent):
         """Criar tabela de empréstimos"""
-        table_frame = tk.Frame(parent, bg='white')
-        table_frame.pack(fill='both', expand=True, padx=20, pady=10)
-
-        scrollbar = ttk.Scrollbar(table_frame)
-        scrollbar.pack(side='right', fill='y')
-
-        tree = ttk.Treeview(
-            table_frame,
-            columns=('Membro', 'Item', 'Data Empréstimo', 'Data Prevista', 'Status', 'Renovações'),
-            show='headings',
-            yscrollcommand=scrollbar.set,
-            height=10
-        )
+        colunas = ('Membro', 'Item', 'Data Empréstimo', 'Data Prevista', 'Status', 'Renovações')
+        ordenacao = {'Membro': 'membro', 'Item': 'item', 'Data Empréstimo': 'data_emprestimo',
+                     'Data Prevista': 'data_prevista', 'Status': 'status', 'Renovações': 'renovacoes'}
 
-        for col in ['Membro', 'Item', 'Data Empréstimo', 'Data Prevista', 'Status', 'Renovações']:
-            tree.heading(col, text=col)
-            tree.column(col, width=150)
+        # Empréstimos ativos lidos por páginas, na ordem escolhida no cabeçalho
+        def consultar(ordem, decrescente, limite, deslocamento):
+            return self.biblioteca.consultar_emprestimos('ativo', ordem=ordem, decrescente=decrescente, limite=limite, deslocamento=deslocamento)
 
-        # obter empréstimos ativos (suportar objetos Emprestimo ou dicts antigos)
-        emprestimos_ativos = []
-        for e in self.biblioteca.emprestimos:
-            status_val = None
-            if isinstance(e, dict):
-                status_val = e.get('status')
-            else:
-                status_val = getattr(e, 'status', None)
-            if status_val == 'ativo':
-                emprestimos_ativos.append(e)
-
-        # Inserir empréstimos com iid = índice para facilitar mapeamento
-        for idx, emp in enumerate(emprestimos_ativos):
+        def formatar(emp):
+            # suportar objetos Emprestimo ou dicts antigos
             if isinstance(emp, dict):
                 membro_nome = emp.get('membro', {}).get('nome', '')
                 item_nome = emp.get('item', {}).get('nome', '')
@@ -900,35 +918,25 @@ class SistemaBiblioteca(tk.Tk):
                 renov = getattr(emp, '_quantidade_renovacoes', getattr(emp, 'renovacoes', 0))
                 status_text = str(getattr(emp, 'status', '')).upper()
 
-            tree.insert('', 'end', iid=str(idx), values=(
+            return (
                 membro_nome,
                 item_nome,
                 data_emp_str,
                 data_prev_str,
                 status_text,
                 f"{renov}/{self.config['LIMITE_RENOVACOES']}"
-            ))
+            )
 
-        tree.pack(fill='both', expand=True)
-        scrollbar.config(command=tree.yview)
+        tabela = TabelaPaginada(parent, colunas, consultar, formatar, ordenacao, 'data_emprestimo', bg='white')
+        tabela.pack(fill='both', expand=True, padx=20, pady=10)
 
         # Botão para processar devolução do empréstimo selecionado
         def processar_devolucao():
-            sel = tree.selection()
-            if not sel:
+            emp = tabela.selecionado()
+            if emp is None:
                 messagebox.showerror('Erro', 'Selecione um empréstimo para processar a devolução.')
                 return
 
-            iid = sel[0]
-            try:
-                idx = int(iid)
-            except ValueError:
-                messagebox.showerror('Erro', 'Seleção inválida.')
-                return
-
-            # Map index no array de empréstimos ativos para o empréstimo real
-            emp = emprestimos_ativos[idx]
-
             # Se for um objeto Emprestimo, usar API do modelo
             if not isinstance(emp, dict):
                 try:
@@ -1009,8 +1017,7 @@ class SistemaBiblioteca(tk.Tk):
         tk.Label(form_frame, text="Membro:", font=("Arial", 10), bg='white').grid(row=0, column=0, sticky='w', pady=5)
         membro_var = tk.StringVar()
         if self.usuario_logado.tipo in ['administrador', 'bibliotecario']:
-            membros = [u for u in self.biblioteca.usuarios if getattr(u, 'tipo', None) == 'membro']
-            membro_combo = ttk.Combobox(form_frame, textvariable=membro_var, values=[f"{m.nome} ({m.email})" for m in membros], state='readonly', width=50)
+            membro_combo, membro_selecionado = self.criar_seletor_membro(form_frame, membro_var, 50)
             membro_combo.grid(row=0, column=1, padx=10, pady=5)
         else:
             membro_combo = tk.Label(form_frame, text=self.usuario_logado.nome, bg='white')
@@ -1026,11 +1033,10 @@ class SistemaBiblioteca(tk.Tk):
         def criar_reserva():
             # determinar membro
             if self.usuario_logado.tipo in ['administrador', 'bibliotecario']:
-                sel = membro_combo.current()
-                if sel < 0:
+                membro = membro_selecionado()
+                if membro is None:
                     messagebox.showerror('Erro', 'Selecione um membro')
                     return
-                membro = membros[sel]
             else:
                 membro = self.usuario_logado
 
@@ -1054,24 +1060,18 @@ class SistemaBiblioteca(tk.Tk):
         # Card lista: mostrar reservas
         card_lista = self.criar_card(self.content_frame, "Lista de Reservas")
 
-        table_frame = tk.Frame(card_lista, bg='white')
-        table_frame.pack(fill='both', expand=True, padx=20, pady=10)
-
         cols = ('Membro', 'Item', 'Data Reserva', 'Status')
-        tree = ttk.Treeview(table_frame, columns=cols, show='headings', height=10)
-        for c in cols:
-            tree.heading(c, text=c)
-            tree.column(c, width=200)
+        ordenacao = {'Membro': 'membro', 'Item': 'item', 'Data Reserva': 'data_reserva', 'Status': 'status'}
 
-        # Filtrar reservas: se membro, mostrar apenas as do próprio membro
-        reservas = self.biblioteca.reservas
-        # Mostrar reservas com status 'aguardando', 'finalizada' ou 'cancelada' (manter histórico)
-        reservas = [r for r in reservas if (getattr(r, 'status', None) or r.get('status')) in ('aguardando', 'finalizada', 'cancelada')]
+        # Mostrar reservas com status 'aguardando', 'finalizada' ou 'cancelada' (manter histórico);
+        # se membro, apenas as do próprio membro
+        membro_filtro = self.usuario_logado if self.usuario_logado.tipo == 'membro' else None
 
-        if self.usuario_logado.tipo == 'membro':
-            reservas = [r for r in reservas if getattr(r.membro, 'id', None) == self.usuario_logado.id]
+        def consultar(ordem, decrescente, limite, deslocamento):
+            return self.biblioteca.consultar_reservas(('aguardando', 'finalizada', 'cancelada'), membro_filtro,
+                                                      ordem=ordem, decrescente=decrescente, limite=limite, deslocamento=deslocamento)
 
-        for idx, r in enumerate(reservas):
+        def formatar(r):
             # suportar objetos Reserva ou dicts (robusto para dados mistos)
             if isinstance(r, dict):
                 item_nome = r.get('item', {}).get('nome', str(r.get('item')))
@@ -1085,18 +1085,18 @@ class SistemaBiblioteca(tk.Tk):
                 data_str = r.data_reserva.strftime('%d/%m/%Y %H:%M') if hasattr(r, 'data_reserva') else str(r.data_reserva)
                 status_val = getattr(r, 'status', '')
 
-            tree.insert('', 'end', iid=str(idx), values=(membro_nome, item_nome, data_str, str(status_val).upper()))
+            return (membro_nome, item_nome, data_str, str(status_val).upper())
 
-        tree.pack(fill='both', expand=True)
+        tabela = TabelaPaginada(card_lista, cols, consultar, formatar, ordenacao, 'data_reserva',
+                                larguras=dict.fromkeys(cols, 200), bg='white')
+        tabela.pack(fill='both', expand=True, padx=20, pady=10)
 
         # Ação cancelar reserva
         def cancelar_reserva():
-            sel = tree.selection()
-            if not sel:
+            reserva = tabela.selecionado()
+            if reserva is None:
                 messagebox.showerror('Erro', 'Selecione uma reserva para cancelar')
                 return
-            idx = int(sel[0])
-            reserva = reservas[idx]
             # obter status de forma segura
             status_val = getattr(reserva, 'status', None) if not isinstance(reserva, dict) else reserva.get('status')
             if status_val != 'aguardando':
@@ -1135,23 +1135,14 @@ class SistemaBiblioteca(tk.Tk):
 
         card_lista = self.criar_card(self.content_frame, "Empréstimos Ativos")
 
-        table_frame = tk.Frame(card_lista, bg='white')
-        table_frame.pack(fill='both', expand=True, padx=20, pady=10)
-
-        tree = ttk.Treeview(
-            table_frame,
-            columns=('Item', 'Data Empréstimo', 'Data Prevista', 'Status', 'Renovações'),
-            show='headings',
-            height=10
-        )
-
-        for col in ['Item', 'Data Empréstimo', 'Data Prevista', 'Status', 'Renovações']:
-            tree.heading(col, text=col)
-            tree.column(col, width=200)
+        colunas = ('Item', 'Data Empréstimo', 'Data Prevista', 'Status', 'Renovações')
+        ordenacao = {'Item': 'item', 'Data Empréstimo': 'data_emprestimo', 'Data Prevista': 'data_prevista', 'Renovações': 'renovacoes'}
 
-        meus_emprestimos = [e for e in self.biblioteca.emprestimos if self._dig(e, 'membro', 'id') == self.usuario_logado.id and self._dig(e, 'status') == 'ativo']
+        def consultar(ordem, decrescente, limite, deslocamento):
+            return self.biblioteca.consultar_emprestimos('ativo', self.usuario_logado, ordem=ordem, decrescente=decrescente,
+                                                         limite=limite, deslocamento=deslocamento)
 
-        for emp in meus_emprestimos:
+        def formatar(emp):
             if isinstance(emp, dict):
                 item_nome = emp.get('item', {}).get('nome', '')
                 data_emp = emp.get('dataEmprestimo')
@@ -1170,15 +1161,17 @@ class SistemaBiblioteca(tk.Tk):
                 status_text = str(getattr(emp, 'status', '')).upper()
                 renov = getattr(emp, '_quantidade_renovacoes', getattr(emp, 'renovacoes', 0))
 
-            tree.insert('', 'end', values=(
+            return (
                 item_nome,
                 data_emp_str,
                 data_prev_str,
                 status_text,
                 f"{renov}/{self.config['LIMITE_RENOVACOES']}"
-            ))
+            )
 
-        tree.pack(fill='both', expand=True)
+        tabela = TabelaPaginada(card_lista, colunas, consultar, formatar, ordenacao, 'data_emprestimo',
+                                larguras=dict.fromkeys(colunas, 200), bg='white')
+        tabela.pack(fill='both', expand=True, padx=20, pady=10)
 
     def mostrar_multas(self):
         """Gerenciar multas"""
@@ -1193,19 +1186,14 @@ class SistemaBiblioteca(tk.Tk):
         ).pack(pady=20, padx=30, anchor='w')
         card_lista = self.criar_card(self.content_frame, "Multas Pendentes")
 
-        # Filtrar empréstimos com multas (status 'multado')
-        emprestimos_multados = []
-        for e in self.biblioteca.emprestimos:
-            status_val = self._dig(e, 'status')
-            if status_val == 'multado':
-                # se for membro, mostrar apenas suas multas
-                if getattr(self.usuario_logado, 'tipo', None) == 'membro':
-                    if self._dig(e, 'membro', 'id') == self.usuario_logado.id:
-                        emprestimos_multados.append(e)
-                else:
-                    emprestimos_multados.append(e)
+        # Empréstimos com multas (status 'multado'); se for membro, apenas suas multas
+        membro_filtro = self.usuario_logado if getattr(self.usuario_logado, 'tipo', None) == 'membro' else None
 
-        if not emprestimos_multados:
+        def consultar(ordem, decrescente, limite, deslocamento):
+            return self.biblioteca.consultar_emprestimos('multado', membro_filtro, ordem=ordem, decrescente=decrescente,
+                                                         limite=limite, deslocamento=deslocamento)
+
+        if not consultar('data_emprestimo', False, 1, 0):
             tk.Label(
                 card_lista,
                 text="Nenhuma multa registrada no momento",
@@ -1215,32 +1203,16 @@ class SistemaBiblioteca(tk.Tk):
             ).pack(pady=50)
         else:
             # criar tabela de multas
-            self.criar_tabela_multas(card_lista, emprestimos_multados)
-
-    def criar_tabela_multas(self, parent, emprestimos_multados):
-        """Criar tabela de multas pendentes"""
-        table_frame = tk.Frame(parent, bg='white')
-        table_frame.pack(fill='both', expand=True, padx=20, pady=10)
-
-        scrollbar = ttk.Scrollbar(table_frame)
-        scrollbar.pack(side='right', fill='y')
-
-        tree = ttk.Treeview(
-            table_frame,
-            columns=('Membro', 'Item', 'Data Empréstimo', 'Data Prevista', 'Valor da Multa', 'Status'),
-            show='headings',
-            yscrollcommand=scrollbar.set,
-            height=12
-        )
+            self.criar_tabela_multas(card_lista, consultar)
 
+    def criar_tabela_multas(self, parent, consultar):
+        """Criar tabela de multas pendentes ('consultar' lê as páginas de empréstimos multados)"""
+        colunas = ('Membro', 'Item', 'Data Empréstimo', 'Data Prevista', 'Valor da Multa', 'Status')
+        ordenacao = {'Membro': 'membro', 'Item': 'item', 'Data Empréstimo': 'data_emprestimo',
+                     'Data Prevista': 'data_prevista', 'Valor da Multa': 'multa'}
         widths = {'Membro': 150, 'Item': 200, 'Data Empréstimo': 120, 'Data Prevista': 120, 'Valor da Multa': 140, 'Status': 100}
-        for col in tree['columns']:
-            tree.heading(col, text=col)
-            tree.column(col, width=widths.get(col, 100))
 
-        scrollbar.config(command=tree.yview)
-
-        for idx, emp in enumerate(emprestimos_multados):
+        def formatar(emp):
             membro_nome = self._dig(emp, 'membro', 'nome') or 'N/A'
             item_nome = self._dig(emp, 'item', 'nome') or 'N/A'
 
@@ -1260,22 +1232,22 @@ class SistemaBiblioteca(tk.Tk):
                 valor_str = 'R$ 0.00'
                 status_multa = 'Pendente'
 
-            tree.insert('', 'end', iid=str(idx), values=(membro_nome, item_nome, data_emp_str, data_prev_str, valor_str, status_multa))
+            return (membro_nome, item_nome, data_emp_str, data_prev_str, valor_str, status_multa)
 
-        tree.pack(fill='both', expand=True)
+        tabela = TabelaPaginada(parent, colunas, consultar, formatar, ordenacao, 'data_emprestimo',
+                                larguras=widths, altura=12, bg='white')
+        tabela.pack(fill='both', expand=True, padx=20, pady=10)
 
         # ações: pagar multa selecionada
         botoes_frame = tk.Frame(parent, bg='white')
         botoes_frame.pack(fill='x', padx=20, pady=12)
 
         def pagar_multa_selecionada():
-            sel = tree.selection()
-            if not sel:
+            emp = tabela.selecionado()
+            if emp is None:
                 messagebox.showwarning('Aviso', 'Selecione uma multa para pagar!')
                 return
             try:
-                idx = int(sel[0])
-                emp = emprestimos_multados[idx]
                 valor = self._dig(emp, 'multa', 'valor') or 0.0
                 if messagebox.askyesno('Confirmar Pagamento', f'Deseja quitar a multa de R$ {valor:.2f}?'):
                     # usa método do modelo
@@ -1295,6 +1267,25 @@ class SistemaBiblioteca(tk.Tk):
             command=pagar_multa_selecionada
         ).pack(side='left', padx=8)
 
+    def criar_seletor_membro(self, parent, variavel, largura):
+        """Combobox de membros com busca incremental (nome, email ou CPF); devolve o combobox e o acesso ao selecionado"""
+        encontrados = []
+        combo = ttk.Combobox(parent, textvariable=variavel, width=largura)
+
+        def atualizar(evento):
+            # Navegação na lista não refaz a busca
+            if evento.keysym in ('Up', 'Down', 'Return', 'Escape', 'Tab'):
+                return
+            encontrados[:] = self.biblioteca.buscar_usuarios(variavel.get(), LIMITE_SUGESTOES_MEMBROS, tipo='membro')
+            combo['values'] = [f"{m.nome} ({m.email})" for m in encontrados]
+
+        def selecionado():
+            posicao = combo.current()
+            return encontrados[posicao] if posicao >= 0 else None
+
+        combo.bind('<KeyRelease>', atualizar)
+        return combo, selecionado
+
     def criar_card(self, parent, titulo):
         """Criar card com título"""
         card = tk.Frame(parent, bg='white', relief='raised', bd=1)
@@ -0,0 +1,121 @@
+import math
+import tkinter as tk
+from tkinter import ttk
+
+
+class GradeVirtual(tk.Frame):
+    """Grade de cartões que cria widgets apenas para as linhas visíveis.
+
+    'itens' é qualquer sequência com len() e fatias (o Registro de itens ou uma
+    lista de resultados); a cada rolagem apenas a fatia visível é lida. Os
+    cartões são criados por 'criar_cartao(pai)' uma vez por posição da tela e
+    reaproveitados: 'preencher_cartao(cartao, item)' troca o conteúdo.
+    """
+
+    def __init__(self, parent, itens, criar_cartao, preencher_cartao, colunas=3, altura_linha=270, **kwargs):
+        super().__init__(parent, **kwargs)
+        self._itens = itens
+        self._criar_cartao = criar_cartao
+        self._preencher_cartao = preencher_cartao
+        self._colunas = colunas
+        self._altura_linha = altura_linha
+        self._primeira_linha = 0
+        self._linhas_visiveis = 1
+        self._cartoes = []
+
+        self._scrollbar = ttk.Scrollbar(self, orient='vertical', command=self._rolar)
+        self._scrollbar.pack(side='right', fill='y')
+        # A área não cresce com os cartões: é o espaço disponível que define quantas linhas são criadas
+        self._area = tk.Frame(self, bg=self['bg'], height=altura_linha)
+        self._area.grid_propagate(False)
+        self._area.pack(side='left', fill='both', expand=True)
+        for coluna in range(colunas):
+            self._area.grid_columnconfigure(coluna, weight=1, uniform='coluna')
+
+        self._area.bind('<Configure>', self._redimensionar)
+        # A roda do mouse vale para toda a grade, inclusive sobre os widgets dos cartões,
+        # e apenas enquanto o ponteiro está sobre ela
+        self.bind('<Enter>', self._capturar_roda)
+        self.bind('<Leave>', self._sair)
+        self.bind('<Destroy>', self._liberar_roda)
+
+    def atualizar(self, itens):
+        """Troca a sequência exibida e volta ao início"""
+        self._itens = itens
+        self._primeira_linha = 0
+        self._mostrar()
+
+    def _total_linhas(self):
+        return math.ceil(len(self._itens) / self._colunas)
+
+    def _redimensionar(self, evento):
+        # Apenas linhas inteiras: a última posição da rolagem mostra o fim do acervo por completo
+        self._linhas_visiveis = max(1, evento.height // self._altura_linha)
+
+        # Novos cartões apenas quando a área cresce; os existentes são reaproveitados
+        while len(self._cartoes) < self._linhas_visiveis * self._colunas:
+            posicao = len(self._cartoes)
+            linha, coluna = divmod(posicao, self._colunas)
+            cartao = self._criar_cartao(self._area)
+            cartao.grid(row=linha, column=coluna, padx=10, pady=10, sticky='nsew')
+            self._area.grid_rowconfigure(linha, minsize=self._altura_linha)
+            self._cartoes.append(cartao)
+        self._mostrar()
+
+    def _mostrar(self):
+        total = self._total_linhas()
+        self._primeira_linha = max(0, min(self._primeira_linha, total - self._linhas_visiveis))
+
+        inicio = self._primeira_linha * self._colunas
+        quantidade = self._linhas_visiveis * self._colunas
+        visiveis = self._itens[inicio:inicio + quantidade]
+        for posicao, cartao in enumerate(self._cartoes):
+            if posicao < len(visiveis):
+                self._preencher_cartao(cartao, visiveis[posicao])
+                cartao.grid()
+            else:
+                cartao.grid_remove()
+
+        if total:
+            self._scrollbar.set(self._primeira_linha / total, min(1.0, (self._primeira_linha + self._linhas_visiveis) / total))
+        else:
+            self._scrollbar.set(0.0, 1.0)
+
+    def _rolar(self, acao, quantidade, unidade=None):
+        # Mesmo protocolo do comando de uma Scrollbar: ('moveto', fração) ou ('scroll', n, 'units'|'pages')
+        if acao == 'moveto':
+            self._primeira_linha = int(float(quantidade) * self._total_linhas())
+        else:
+            passo = self._linhas_visiveis if unidade == 'pages' else 1
+            self._primeira_linha += int(quantidade) * passo
+        self._mostrar()
+
+    def _roda(self, evento):
+        if not str(evento.widget).startswith(str(self)):
+            return
+        # Windows/macOS informam 'delta'; o X11 usa os botões 4 e 5
+        para_baixo = evento.num == 5 or getattr(evento, 'delta', 0) < 0
+        self._rolar('scroll', 1 if para_baixo else -1, 'units')
+
+    def _capturar_roda(self, _evento):
+        self.bind_all('<MouseWheel>', self._roda)
+        self.bind_all('<Button-4>', self._roda)
+        self.bind_all('<Button-5>', self._roda)
+
+    def _sair(self, evento):
+        # Entrar em um cartão também gera <Leave> na grade: só libera se o ponteiro saiu dela
+        # O caminho Tk evita resolver widgets que o tkinter não conhece (ex.: diálogos nativos)
+        sob_ponteiro = str(self.tk.call('winfo', 'containing', evento.x_root, evento.y_root))
+        if sob_ponteiro.startswith(str(self)):
+            return
+        self._soltar_roda()
+
+    def _liberar_roda(self, evento):
+        if evento.widget is not self:
+            return
+        self._soltar_roda()
+
+    def _soltar_roda(self):
+        self.unbind_all('<MouseWheel>')
+        self.unbind_all('<Button-4>')
+        self.unbind_all('<Button-5>')
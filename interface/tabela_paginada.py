@@ -0,0 +1,98 @@
+import tkinter as tk
+from tkinter import ttk
+
+# Linhas lidas por consulta
+TAMANHO_PAGINA = 100
+# Fração da rolagem a partir da qual a próxima página é carregada
+LIMIAR_CARGA = 0.9
+
+
+class TabelaPaginada(tk.Frame):
+    """Treeview preenchida por páginas sob demanda.
+
+    'consultar(ordem, decrescente, limite, deslocamento)' devolve as entidades de
+    uma página já ordenadas pela fonte (ORDER BY no banco) e 'formatar(entidade)'
+    os valores das colunas. A primeira página é inserida ao criar a tabela; as
+    seguintes, quando a rolagem se aproxima do fim, em um callback 'after_idle'
+    que não bloqueia o mainloop. As colunas de 'ordenacao' ({coluna: chave})
+    reordenam a consulta ao clicar no cabeçalho (um novo clique inverte).
+    """
+
+    def __init__(self, parent, colunas, consultar, formatar, ordenacao=None, ordem=None, larguras=None,
+                 altura=10, tamanho_pagina=TAMANHO_PAGINA, **kwargs):
+        super().__init__(parent, **kwargs)
+        self._consultar = consultar
+        self._formatar = formatar
+        self._ordenacao = ordenacao or {}
+        self._ordem = ordem
+        self._decrescente = False
+        self._tamanho_pagina = tamanho_pagina
+        self._pendente = None
+        self._linhas = {}
+        self._carregadas = 0
+        self._esgotada = False
+
+        self._scrollbar = ttk.Scrollbar(self)
+        self._scrollbar.pack(side='right', fill='y')
+        self.tree = ttk.Treeview(self, columns=colunas, show='headings', height=altura, yscrollcommand=self._rolagem)
+        for coluna in colunas:
+            if coluna in self._ordenacao:
+                self.tree.heading(coluna, text=coluna, command=lambda coluna=coluna: self.ordenar(coluna))
+            else:
+                self.tree.heading(coluna, text=coluna)
+            self.tree.column(coluna, width=(larguras or {}).get(coluna, 150))
+        self.tree.pack(fill='both', expand=True)
+        self._scrollbar.config(command=self.tree.yview)
+        self.bind('<Destroy>', self._cancelar)
+
+        self._indicar_ordem()
+        self._carregar_pagina()
+
+    def selecionado(self):
+        """Entidade da linha selecionada, ou None"""
+        selecao = self.tree.selection()
+        return self._linhas.get(selecao[0]) if selecao else None
+
+    def ordenar(self, coluna):
+        chave = self._ordenacao[coluna]
+        self._decrescente = not self._decrescente if chave == self._ordem else False
+        self._ordem = chave
+        self._indicar_ordem()
+        self.recarregar()
+
+    def recarregar(self):
+        """Descarta as linhas e volta à primeira página"""
+        self._cancelar()
+        self.tree.delete(*self.tree.get_children())
+        self._linhas.clear()
+        self._carregadas = 0
+        self._esgotada = False
+        self._carregar_pagina()
+
+    def _indicar_ordem(self):
+        for coluna, chave in self._ordenacao.items():
+            seta = (' ▼' if self._decrescente else ' ▲') if chave == self._ordem else ''
+            self.tree.heading(coluna, text=coluna + seta)
+
+    def _rolagem(self, primeiro, ultimo):
+        self._scrollbar.set(primeiro, ultimo)
+        # Perto do fim: agenda a próxima página (fora do callback da rolagem)
+        if float(ultimo) >= LIMIAR_CARGA and not self._esgotada and self._pendente is None:
+            self._pendente = self.after_idle(self._carregar_pagina)
+
+    def _carregar_pagina(self):
+        self._pendente = None
+        pagina = self._consultar(self._ordem, self._decrescente, self._tamanho_pagina, self._carregadas)
+        for entidade in pagina:
+            iid = str(self._carregadas)
+            self._carregadas += 1
+            self._linhas[iid] = entidade
+            self.tree.insert('', 'end', iid=iid, values=self._formatar(entidade))
+        self._esgotada = len(pagina) < self._tamanho_pagina
+
+    def _cancelar(self, evento=None):
+        if evento is not None and evento.widget is not self:
+            return
+        if self._pendente is not None:
+            self.after_cancel(self._pendente)
+            self._pendente = None
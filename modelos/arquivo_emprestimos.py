@@ -0,0 +1,149 @@
+from modelos.registro import chave
+from modelos.status import StatusEmprestimo
+from array import array
+import datetime
+import math
+
+# NumPy é opcional: com ele, as consultas operam sobre os arrays sem cópia (vetorizadas)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EPOCA = datetime.datetime(1970, 1, 1)
+_SEM_VALOR = float('nan')
+
+
+def _epoca(data):
+    # Segundos desde a época, sem fuso (as datas do sistema são locais e sem tzinfo)
+    if data is None:
+        return _SEM_VALOR
+    if isinstance(data, str):
+        data = datetime.datetime.fromisoformat(data)
+    return (data - EPOCA).total_seconds()
+
+
+def _data(segundos):
+    return None if math.isnan(segundos) else EPOCA + datetime.timedelta(seconds=segundos)
+
+
+class ArquivoEmprestimos:
+    '''Histórico de empréstimos finalizados em colunas (array), sem um objeto por empréstimo.
+
+    Item e membro são guardados como códigos inteiros (com tabelas de tradução
+    para os ids), datas como segundos desde a época (NaN quando ausentes) e a
+    multa como valor (NaN sem multa) e indicador de pagamento (-1 sem multa).
+    '''
+
+    def __init__(self):
+        self._ids = []
+        self._codigos = {}
+        self._chaves = []
+        self._item = array('q')
+        self._membro = array('q')
+        self._data_emprestimo = array('d')
+        self._data_devolucao = array('d')
+        self._data_quitacao = array('d')
+        self._renovacoes = array('q')
+        self._multa_valor = array('d')
+        self._multa_paga = array('b')
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _codigo(self, k):
+        codigo = self._codigos.get(k)
+        if codigo is None:
+            codigo = self._codigos[k] = len(self._chaves)
+            self._chaves.append(k)
+        return codigo
+
+    def adicionar(self, emprestimo):
+        '''Arquiva um objeto Emprestimo finalizado'''
+        multa = emprestimo.multa
+        self._anexar(
+            chave(emprestimo), chave(emprestimo.item), chave(emprestimo.membro),
+            emprestimo.data_emprestimo, emprestimo.data_devolucao, emprestimo.data_quitacao,
+            emprestimo._quantidade_renovacoes,
+            multa.valor if multa else None, multa.paga if multa else None
+        )
+
+    def adicionar_linha(self, row):
+        '''Arquiva um empréstimo finalizado diretamente da linha do banco (sem criar o objeto)'''
+        self._anexar(
+            row['id'], row['item_id'], row['membro_id'],
+            row['data_emprestimo'], row['data_devolucao'], row['data_quitacao'],
+            row['quantidade_renovacoes'], row['multa_valor'], row['multa_paga']
+        )
+
+    def _anexar(self, id, item_id, membro_id, data_emprestimo, data_devolucao, data_quitacao, renovacoes, multa_valor, multa_paga):
+        self._ids.append(str(id))
+        self._item.append(self._codigo(str(item_id)))
+        self._membro.append(self._codigo(str(membro_id)))
+        self._data_emprestimo.append(_epoca(data_emprestimo))
+        self._data_devolucao.append(_epoca(data_devolucao))
+        self._data_quitacao.append(_epoca(data_quitacao))
+        self._renovacoes.append(renovacoes or 0)
+        self._multa_valor.append(_SEM_VALOR if multa_valor is None else float(multa_valor))
+        self._multa_paga.append(-1 if multa_paga is None else int(bool(multa_paga)))
+
+    def linha(self, posicao):
+        '''Empréstimo arquivado no formato da tabela 'emprestimos' (datas como datetime)'''
+        multa = self._multa_valor[posicao]
+        return {
+            'id': self._ids[posicao],
+            'item_id': self._chaves[self._item[posicao]],
+            'membro_id': self._chaves[self._membro[posicao]],
+            'data_emprestimo': _data(self._data_emprestimo[posicao]),
+            'data_devolucao': _data(self._data_devolucao[posicao]),
+            'data_quitacao': _data(self._data_quitacao[posicao]),
+            'quantidade_renovacoes': self._renovacoes[posicao],
+            'status': StatusEmprestimo.FINALIZADO,
+            'multa_valor': None if math.isnan(multa) else multa,
+            'multa_paga': None if self._multa_paga[posicao] < 0 else bool(self._multa_paga[posicao])
+        }
+
+    def linhas(self):
+        for posicao in range(len(self)):
+            yield self.linha(posicao)
+
+    # Consultas
+    def _posicoes(self, coluna, k):
+        codigo = self._codigos.get(chave(k))
+        if codigo is None:
+            return []
+        if np is not None:
+            return np.flatnonzero(np.frombuffer(coluna, dtype=np.int64) == codigo).tolist()
+        return [posicao for posicao, valor in enumerate(coluna) if valor == codigo]
+
+    def historico_membro(self, membro):
+        '''Empréstimos arquivados do membro, na ordem em que foram arquivados'''
+        return [self.linha(posicao) for posicao in self._posicoes(self._membro, membro)]
+
+    def circulacao_item(self, item):
+        '''Quantidade de empréstimos arquivados do item'''
+        codigo = self._codigos.get(chave(item))
+        if codigo is None:
+            return 0
+        if np is not None:
+            return int(np.count_nonzero(np.frombuffer(self._item, dtype=np.int64) == codigo))
+        return self._item.count(codigo)
+
+    def multas_por_mes(self):
+        '''Total das multas por mês de devolução: {'AAAA-MM': valor}'''
+        if np is not None:
+            valores = np.frombuffer(self._multa_valor, dtype=np.float64)
+            datas = np.frombuffer(self._data_devolucao, dtype=np.float64)
+            com_multa = ~np.isnan(valores) & ~np.isnan(datas)
+            meses = datas[com_multa].astype('datetime64[s]').astype('datetime64[M]')
+            unicos, grupos = np.unique(meses, return_inverse=True)
+            totais = np.bincount(grupos, weights=valores[com_multa], minlength=len(unicos))
+            return {str(mes): float(total) for mes, total in zip(unicos, totais)}
+
+        totais = {}
+        for valor, segundos in zip(self._multa_valor, self._data_devolucao):
+            if math.isnan(valor) or math.isnan(segundos):
+                continue
+            mes = _data(segundos).strftime('%Y-%m')
+            totais[mes] = totais.get(mes, 0) + valor
+        return dict(sorted(totais.items()))
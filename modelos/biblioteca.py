@@ -3,96 +3,439 @@ from modelos.administrador import Administrador
 from modelos.bibliotecario import Bibliotecario
 from modelos.emprestimo import Emprestimo
 from modelos.reserva import Reserva
+from modelos.multa import Multa
 from modelos.livro import Livro
 from modelos.ebook import Ebook
 from modelos import database
-from config import LIMITE_EMPRESTIMOS_SIMULTANEOS, PRAZO_VALIDADE_RESERVA
+from modelos.registro import Registro, chave, indice_atributo, indice_referencia
+from modelos.circulacao import IndiceCirculacao
+from modelos.varredor import VarredorReservas, GeradorInstantaneos
+from modelos.unidade_trabalho import UnidadeTrabalho, copiar_estado, restaurar_estado
+from modelos.eventos import dados_evento, comprimir_estado, descomprimir_estado
+from modelos.escrita_adiada import EscritorAdiado, caminho_diario, recuperar
+from modelos.arquivo_emprestimos import ArquivoEmprestimos
+from modelos.status import StatusItem, StatusEmprestimo, StatusReserva, STATUS_TABELAS
+from modelos.indice_textual import IndiceTextual
+from modelos.facetas import ContadorFacetas
+from config import (PRAZO_DEVOLUCAO, LIMITE_EMPRESTIMOS_SIMULTANEOS, PRAZO_VALIDADE_RESERVA, TAMANHO_LOTE_CARGA, INTERVALO_VARREDURA_RESERVAS,
+                    ESCRITA_ADIADA, INTERVALO_ESCRITA_ADIADA, TAMANHO_LOTE_ESCRITA_ADIADA,
+                    REGISTRO_EVENTOS, INTERVALO_INSTANTANEO, INTERVALO_VERIFICACAO_INSTANTANEO, ARQUIVAR_EMPRESTIMOS_FINALIZADOS)
 from utils.helpers import get_status
+from collections import deque
 import datetime
+import functools
+import json
+import re
+import threading
+import time
+
+def _data(valor):
+    # Datas são persistidas como texto ISO pelo SQLite
+    return datetime.datetime.fromisoformat(valor) if valor else None
+
+
+def _expressao_busca(texto):
+    # Cada palavra vira um prefixo entre aspas (sem operadores do FTS5); todas devem ocorrer
+    return ' '.join(f'"{termo}"*' for termo in re.findall(r'\w+', texto or ''))
+
+
+def _normalizar_email(email):
+    # Emails não diferenciam maiúsculas: 'Joao@Email.com' e 'joao@email.com' são o mesmo usuário
+    return email.strip().casefold() if isinstance(email, str) else None
+
+
+def _normalizar_cpf(cpf):
+    # Apenas os dígitos: '123.456.789-10' e '12345678910' são o mesmo CPF
+    if not isinstance(cpf, str):
+        return None
+    return re.sub(r'\D', '', cpf) or None
+
+
+def _indice_email(usuario):
+    return _normalizar_email(indice_atributo('email')(usuario))
+
+
+def _indice_cpf(usuario):
+    return _normalizar_cpf(indice_atributo('cpf')(usuario))
+
+
+def _status_item(item):
+    # Itens não expõem 'status' como propriedade; dicionários antigos usam a chave
+    return item.get('status') if isinstance(item, dict) else getattr(item, '_status', None)
+
+
+def _membro_status(entidade):
+    membro = indice_referencia('membro')(entidade)
+    return (membro, get_status(entidade)) if membro is not None else None
+
+
+def _sincronizado(metodo):
+    # Serializa as operações que alteram o estado (a interface e a varredura de reservas rodam em threads distintas)
+    @functools.wraps(metodo)
+    def envoltorio(self, *args, **kwargs):
+        with self._trava:
+            return metodo(self, *args, **kwargs)
+    return envoltorio
 
 class Biblioteca:
+    # Carregamento por instantâneo + eventos requer o estado completo em memória
+    _carga_por_instantaneo = True
+    # Chaves de ordenação das consultas paginadas e as expressões SQL correspondentes
+    _ORDENS_CONSULTA = {
+        'emprestimos': {
+            'membro': "(SELECT nome FROM usuarios WHERE usuarios.id = emprestimos.membro_id)",
+            'item': "(SELECT nome FROM itens WHERE itens.id = emprestimos.item_id)",
+            'data_emprestimo': "data_emprestimo",
+            'data_prevista': f"julianday(data_emprestimo) + (quantidade_renovacoes + 1) * {float(PRAZO_DEVOLUCAO)!r}",
+            'status': "status",
+            'renovacoes': "quantidade_renovacoes",
+            'multa': "multa_valor"
+        },
+        'reservas': {
+            'membro': "(SELECT nome FROM usuarios WHERE usuarios.id = reservas.membro_id)",
+            'item': "(SELECT nome FROM itens WHERE itens.id = reservas.item_id)",
+            'data_reserva': "data_reserva",
+            'status': "status"
+        }
+    }
+    # O arquivo de empréstimos finalizados substitui objetos mantidos em memória
+    _suporta_arquivo_emprestimos = True
+
     def __init__(self):
+        self._trava = threading.RLock()
+        # Falhas das tarefas de fundo, consultadas pela interface em falhas_em_segundo_plano()
+        self._falhas = deque(maxlen=100)
+        self._varredor = None
+        self._escritor = None
+        self._registro_eventos = REGISTRO_EVENTOS
+        self._gerador_instantaneos = None
+        self._circulacao = IndiceCirculacao()
+        # Contagens por faceta de cada coleção mantida em memória (painel e filtros)
+        self._facetas = {}
+        self._arquivar_na_carga = ARQUIVAR_EMPRESTIMOS_FINALIZADOS and self._suporta_arquivo_emprestimos
+        self.arquivo_emprestimos = ArquivoEmprestimos()
         self.itens = []
         self.usuarios = []
         self.emprestimos = []
         self.reservas = []
         database.inicializar_banco()
+        # Operações confirmadas no diário de uma execução anterior e ainda não gravadas
+        recuperar(caminho_diario(), self._registrar_falha)
         self._carregar_dados()
-        
+        if ESCRITA_ADIADA:
+            self.ativar_escrita_adiada()
+
+    # Coleções indexadas: atribuir uma lista reconstrói o registro e seus índices
+    @property
+    def itens(self):
+        return self._itens
+
+    @itens.setter
+    def itens(self, itens):
+        # O índice textual (sugestões da busca incremental) acompanha as inclusões e remoções
+        self._indice_textual = IndiceTextual()
+        self._facetas['itens'] = ContadorFacetas({
+            'categoria': indice_atributo('categoria'),
+            'tipo': indice_atributo('tipo'),
+            'status': _status_item,
+            'autor': indice_atributo('autor')
+        }, contar_ausentes=('autor',))
+        self._itens = Registro(itens, indices={'isbn': indice_atributo('isbn')},
+                               observadores=[self._indice_textual, self._facetas['itens']])
+
+    @property
+    def usuarios(self):
+        return self._usuarios
+
+    @usuarios.setter
+    def usuarios(self, usuarios):
+        # Email e CPF normalizados (login e cadastro em O(1)); nomes no índice textual da busca incremental
+        self._indice_usuarios = IndiceTextual(atributos=('nome',))
+        self._usuarios = Registro(usuarios, indices={'email': _indice_email, 'cpf': _indice_cpf},
+                                  observadores=[self._indice_usuarios])
+
+    @property
+    def emprestimos(self):
+        return self._emprestimos
+
+    @emprestimos.setter
+    def emprestimos(self, emprestimos):
+        self._facetas['emprestimos'] = ContadorFacetas({'status': get_status, 'membro_status': _membro_status})
+        self._emprestimos = Registro(emprestimos, indices={
+            'membro': indice_referencia('membro'),
+            'item': indice_referencia('item')
+        }, observadores=[self._facetas['emprestimos']])
+        self._circulacao.reconstruir(self._emprestimos, 'emprestimo')
+
+    @property
+    def reservas(self):
+        return self._reservas
+
+    @reservas.setter
+    def reservas(self, reservas):
+        self._facetas['reservas'] = ContadorFacetas({'status': get_status, 'membro': indice_referencia('membro')})
+        self._reservas = Registro(reservas, indices={
+            'membro': indice_referencia('membro'),
+            'item': indice_referencia('item')
+        }, observadores=[self._facetas['reservas']])
+        self._circulacao.reconstruir(self._reservas, 'reserva')
+
     def _carregar_dados(self):
-        conn = database.get_connection()
-        cursor = conn.cursor()
+        conn = database.conexao()
+
+        # Tempo de carga de cada tabela, em segundos (útil para diagnosticar a inicialização)
+        self.tempos_carga = {}
+
+        if not self._registro_eventos:
+            # Sem o log, as próximas operações não seriam registradas: instantâneos deixam de valer
+            if conn.execute("SELECT 1 FROM instantaneos LIMIT 1").fetchone():
+                with database.transacao() as c:
+                    c.execute("DELETE FROM instantaneos")
+        elif self._carga_por_instantaneo and self._carregar_instantaneo():
+            # Empréstimos finalizados pelos eventos reaplicados também vão para o arquivo
+            if self._arquivar_na_carga:
+                self._mover_para_arquivo()
+            return
+
+        self._carregar_tabelas()
         
-        # 1. Carregar Usuários
-        cursor.execute("SELECT * FROM usuarios")
-        for row in cursor.fetchall():
-            classe_tipo = {
-                'membro': Membro,
-                'administrador': Administrador,
-                'bibliotecario': Bibliotecario
-            }.get(row['tipo'], Membro)
-            
-            usuario = classe_tipo(row['nome'], row['email'], row['senha'], row['cpf'])
-            usuario._id = row['id']
-            usuario.tipo = row['tipo']
-            self.usuarios.append(usuario)
-            
-        # 2. Carregar Itens
-        cursor.execute("SELECT * FROM itens")
-        for row in cursor.fetchall():
-            if row['tipo'] == 'livro':
-                item = Livro(row['nome'], None, None, row['autor'], row['paginas'], row['isbn'], row['categoria'])
+        #Se vazio, inicia padrão
+        if not self.usuarios:
+            self._inicializar_dados_padrao()
+
+        # Primeiro instantâneo: as próximas inicializações partem dele
+        if self._registro_eventos and not conn.execute("SELECT 1 FROM instantaneos LIMIT 1").fetchone():
+            self.gerar_instantaneo()
+
+    def _carregar_tabelas(self):
+        cursor = database.conexao().cursor()
+
+        for tabela, construtor, registro in self._carregadores():
+            inicio = time.perf_counter()
+            cursor.execute(f"SELECT * FROM {tabela}")
+
+            # Leitura em lotes para manter a memória estável em tabelas grandes
+            while True:
+                linhas = cursor.fetchmany(TAMANHO_LOTE_CARGA)
+                if not linhas:
+                    break
+                for row in linhas:
+                    entidade = construtor(row)
+                    if entidade is not None:
+                        registro.append(entidade)
+                        self._atualizar_indices(entidade)
+
+            self.tempos_carga[tabela] = time.perf_counter() - inicio
+
+        cursor.close()
+
+    def _carregar_instantaneo(self):
+        '''Carrega o último instantâneo e reaplica os eventos posteriores; False se não houver instantâneo'''
+        conn = database.conexao()
+        inicio = time.perf_counter()
+        instantaneo = conn.execute("SELECT sequencia, dados FROM instantaneos ORDER BY sequencia DESC LIMIT 1").fetchone()
+        if instantaneo is None:
+            return False
+
+        estado = descomprimir_estado(instantaneo['dados'])
+        for tabela, construtor, registro in self._carregadores():
+            for linha in estado.get(tabela, ()):
+                entidade = construtor(linha)
+                if entidade is not None:
+                    registro.append(entidade)
+                    self._atualizar_indices(entidade)
+        self.tempos_carga['instantaneo'] = time.perf_counter() - inicio
+
+        # Apenas a cauda do log (eventos após o instantâneo) é reaplicada
+        inicio = time.perf_counter()
+        registros = {tabela: (construtor, registro) for tabela, construtor, registro in self._carregadores()}
+        # Eventos atualizam objetos existentes: empréstimos são sempre construídos
+        registros['emprestimos'] = (self._emprestimo_de_linha, self.emprestimos)
+        cursor = conn.execute("SELECT dados FROM eventos WHERE sequencia > ? ORDER BY sequencia", (instantaneo['sequencia'],))
+        for evento in cursor:
+            self._aplicar_evento(json.loads(evento['dados']), registros)
+        self.tempos_carga['eventos'] = time.perf_counter() - inicio
+        return True
+
+    def _aplicar_evento(self, dados, registros):
+        for tabela, linha in dados['linhas']:
+            construtor, registro = registros[tabela]
+            novo = construtor(linha)
+            if novo is None:
+                continue
+            # Entidades existentes são atualizadas no lugar para preservar as referências
+            existente = registro.obter(linha['id'])
+            if existente is None:
+                registro.append(novo)
             else:
-                
-                item = Ebook(row['nome'], None, None, row['autor'], row['paginas'], row['isbn'], row['categoria'], None, None)
-                
-            item._id = row['id']
-            item._status = row['status']
-            item.tipo = row['tipo']
-            self.itens.append(item)
-            
-        #Carregar Empréstimos
-        cursor.execute("SELECT * FROM emprestimos")
-        for row in cursor.fetchall():
-            # Encontrar objetos reais
-            item_obj = next((i for i in self.itens if str(i.id) == row['item_id']), None)
-            membro_obj = next((u for u in self.usuarios if str(u.id) == row['membro_id']), None)
-            
-            if item_obj and membro_obj:
-                emp = Emprestimo(item_obj, membro_obj)
-                emp._id = row['id']
-                emp._data_emprestimo = datetime.datetime.fromisoformat(row['data_emprestimo']) if row['data_emprestimo'] else None
-                emp._data_devolucao = datetime.datetime.fromisoformat(row['data_devolucao']) if row['data_devolucao'] else None
-                emp._data_quitacao = datetime.datetime.fromisoformat(row['data_quitacao']) if row['data_quitacao'] else None
-                emp._quantidade_renovacoes = row['quantidade_renovacoes']
-                emp._status = row['status']
-                # Restaurar multa
-                if row['multa_valor'] is not None:
-                    from modelos.multa import Multa
-                    emp._multa = Multa(row['multa_valor'], bool(row['multa_paga']))
-                
-                self.emprestimos.append(emp)
+                restaurar_estado(existente, copiar_estado(novo))
+            self._atualizar_indices(existente or novo)
+
+        for tabela, id in dados['removidos']:
+            _, registro = registros[tabela]
+            entidade = registro.obter(id)
+            if entidade is not None:
+                registro.remove(entidade)
+                self._remover_indices(entidade)
+
+    def _gravar_eventos(self, conn, eventos):
+        '''Anexa os eventos de uma unidade de trabalho ao log (chamado antes do commit)'''
+        if not self._registro_eventos:
+            return
+        agora = datetime.datetime.now()
+        # A sequência é atribuída pelo banco (INTEGER PRIMARY KEY): terminais que compartilham o banco não colidem
+        conn.executemany(
+            "INSERT INTO eventos (tipo, data, dados) VALUES (?, ?, ?)",
+            [(tipo, agora, dados_evento(objetos, removidos)) for tipo, objetos, removidos in eventos]
+        )
+
+    def gerar_instantaneo(self):
+        '''Grava um instantâneo do estado (a próxima inicialização reaplica apenas eventos posteriores); devolve sua sequência.
+
+        As tabelas e a sequência do último evento são lidas do banco em uma única
+        transação de leitura, fora das operações da biblioteca: o instantâneo
+        também cobre eventos gravados por outros terminais que usam o mesmo banco.
+        '''
+        if not self._registro_eventos:
+            raise RuntimeError('Registro de eventos desativado')
+
+        # Conexão própria: a leitura consistente não interfere nas transações da thread atual
+        conn = database.get_connection()
+        try:
+            conn.execute("BEGIN")
+            sequencia = conn.execute("SELECT COALESCE(MAX(sequencia), 0) FROM eventos").fetchone()[0]
+            estado = {tabela: [dict(row) for row in conn.execute(f"SELECT * FROM {tabela}")]
+                      for tabela in ('usuarios', 'itens', 'emprestimos', 'reservas')}
+            conn.rollback()
 
-        #Carregar Reservas
-        cursor.execute("SELECT * FROM reservas")
-        for row in cursor.fetchall():
-            item_obj = next((i for i in self.itens if str(i.id) == row['item_id']), None)
-            membro_obj = next((u for u in self.usuarios if str(u.id) == row['membro_id']), None)
+            # A compressão acontece fora de qualquer transação
+            dados = comprimir_estado(estado)
+            with conn:
+                # Apenas o instantâneo mais recente é mantido; o log de eventos é preservado
+                conn.execute(
+                    "INSERT OR REPLACE INTO instantaneos (sequencia, data, dados) VALUES (?, ?, ?)",
+                    (sequencia, datetime.datetime.now(), dados)
+                )
+                conn.execute("DELETE FROM instantaneos WHERE sequencia < ?", (sequencia,))
+        finally:
+            conn.close()
+        return sequencia
+
+    def gerar_instantaneo_se_necessario(self):
+        '''Gera um instantâneo se há INTERVALO_INSTANTANEO eventos após o último; devolve se gerou'''
+        if not self._registro_eventos:
+            return False
+        pendentes = database.conexao().execute(
+            "SELECT COUNT(*) FROM eventos WHERE sequencia > (SELECT COALESCE(MAX(sequencia), 0) FROM instantaneos)"
+        ).fetchone()[0]
+        if pendentes < INTERVALO_INSTANTANEO:
+            return False
+        self.gerar_instantaneo()
+        return True
+
+    def consultar_eventos(self, desde=0):
+        '''Eventos registrados após a sequência informada: (sequencia, tipo, data, dados)'''
+        self.descarregar_escrita()
+        cursor = database.conexao().execute(
+            "SELECT sequencia, tipo, data, dados FROM eventos WHERE sequencia > ? ORDER BY sequencia", (desde,)
+        )
+        for evento in cursor:
+            yield evento['sequencia'], evento['tipo'], evento['data'], json.loads(evento['dados'])
+
+    @_sincronizado
+    def arquivar_emprestimos_finalizados(self):
+        '''Move os empréstimos finalizados da memória para o arquivo colunar; devolve a quantidade.
+
+        O banco não é alterado: sem ARQUIVAR_EMPRESTIMOS_FINALIZADOS, a próxima
+        inicialização volta a carregá-los como objetos.
+        '''
+        return self._mover_para_arquivo()
+
+    def _mover_para_arquivo(self):
+        finalizados = [e for e in self.emprestimos if not isinstance(e, dict) and e.status is StatusEmprestimo.FINALIZADO]
+        if finalizados:
+            for emprestimo in finalizados:
+                self.arquivo_emprestimos.adicionar(emprestimo)
+            # Reconstrói o registro (e os índices) em uma passada, em vez de remover um a um
+            arquivados = set(map(id, finalizados))
+            self.emprestimos = [e for e in self.emprestimos if id(e) not in arquivados]
+        return len(finalizados)
+
+    def _carregadores(self):
+        # As tabelas são carregadas em ordem de dependência: empréstimos e reservas
+        # resolvem item e membro pelos registros já indexados (junção em uma única passada)
+        return [
+            ('usuarios', self._usuario_de_linha, self.usuarios),
+            ('itens', self._item_de_linha, self.itens),
+            ('emprestimos', self._emprestimo_de_carga, self.emprestimos),
+            ('reservas', self._reserva_de_linha, self.reservas)
+        ]
+
+    def _usuario_de_linha(self, row):
+        classe_tipo = {
+            'membro': Membro,
+            'administrador': Administrador,
+            'bibliotecario': Bibliotecario
+        }.get(row['tipo'], Membro)
+        
+        usuario = classe_tipo(row['nome'], row['email'], row['senha'], row['cpf'])
+        usuario._id = row['id']
+        usuario.tipo = row['tipo']
+        return usuario
+
+    def _item_de_linha(self, row):
+        if row['tipo'] == 'livro':
+            item = Livro(row['nome'], None, None, row['autor'], row['paginas'], row['isbn'], row['categoria'])
+        else:
+            item = Ebook(row['nome'], None, None, row['autor'], row['paginas'], row['isbn'], row['categoria'], None, None)
             
-            if item_obj and membro_obj:
-                res = Reserva(item_obj, membro_obj)
-                res._id = row['id']
-                res._data_reserva = datetime.datetime.fromisoformat(row['data_reserva'])
-                res._data_cancelamento = datetime.datetime.fromisoformat(row['data_cancelamento']) if row['data_cancelamento'] else None
-                res._data_finalizacao = datetime.datetime.fromisoformat(row['data_finalizacao']) if row['data_finalizacao'] else None
-                res._status = row['status']
-                self.reservas.append(res)
+        item._id = row['id']
+        item._status = StatusItem.de_banco(row['status'])
+        item._data_ultima_devolucao = _data(row['data_ultima_devolucao'])
+        item.tipo = row['tipo']
+        return item
+
+    def _emprestimo_de_linha(self, row):
+        # Encontrar objetos reais
+        item_obj = self.itens.obter(row['item_id'])
+        membro_obj = self.usuarios.obter(row['membro_id'])
         
-        conn.close()
+        if not (item_obj and membro_obj):
+            return None
+
+        emp = Emprestimo(item_obj, membro_obj)
+        emp._id = row['id']
+        emp._data_emprestimo = _data(row['data_emprestimo'])
+        emp._data_devolucao = _data(row['data_devolucao'])
+        emp._data_quitacao = _data(row['data_quitacao'])
+        emp._quantidade_renovacoes = row['quantidade_renovacoes']
+        emp._status = StatusEmprestimo.de_banco(row['status'])
+        # Restaurar multa
+        if row['multa_valor'] is not None:
+            emp._multa = Multa(row['multa_valor'], bool(row['multa_paga']))
+        return emp
+
+    def _emprestimo_de_carga(self, row):
+        # Com o arquivamento ativo, empréstimos finalizados vão direto para o arquivo colunar
+        if self._arquivar_na_carga and StatusEmprestimo.de_banco(row['status']) is StatusEmprestimo.FINALIZADO:
+            self.arquivo_emprestimos.adicionar_linha(row)
+            return None
+        return self._emprestimo_de_linha(row)
+
+    def _reserva_de_linha(self, row):
+        item_obj = self.itens.obter(row['item_id'])
+        membro_obj = self.usuarios.obter(row['membro_id'])
         
-        #Se vazio, inicia padrão
-        if not self.usuarios:
-            self._inicializar_dados_padrao()
+        if not (item_obj and membro_obj):
+            return None
+
+        res = Reserva(item_obj, membro_obj)
+        res._id = row['id']
+        res._data_reserva = _data(row['data_reserva'])
+        res._data_cancelamento = _data(row['data_cancelamento'])
+        res._data_finalizacao = _data(row['data_finalizacao'])
+        res._status = StatusReserva.de_banco(row['status'])
+        return res
 
     def _inicializar_dados_padrao(self):
         #Usuários padrão
@@ -118,9 +461,10 @@ class Biblioteca:
         ebook1 = Ebook('Clean Code', None, None, 'Robert C. Martin', 464, '978-0132350884', 'Tecnologia', None, None)
         self.adicionar_item(ebook1)
     
+    @_sincronizado
     def adicionar_usuario(self, nome, email, senha, cpf, tipo):
         # Validar se o email já existe
-        email_existente = next((u for u in self.usuarios if u.email == email), None)
+        email_existente = self.usuario_por_email(email)
         if email_existente:
             raise ValueError("Email já cadastrado no sistema")
         
@@ -133,255 +477,570 @@ class Biblioteca:
         usuario = classe_tipo(nome, email, senha, cpf)
         #manter atributo 'tipo' para interface
         usuario.tipo = tipo
-        self.usuarios.append(usuario)
         
-        conn = database.get_connection()
-        conn.execute(
-            "INSERT INTO usuarios (id, nome, email, senha, cpf, tipo) VALUES (?, ?, ?, ?, ?, ?)",
-            (str(usuario.id), usuario.nome, usuario.email, usuario.senha, usuario.cpf, tipo)
-        )
-        conn.commit()
-        conn.close()
+        with UnidadeTrabalho(self) as uow:
+            uow.adicionar(self.usuarios, usuario)
+            uow.evento('usuario_cadastrado', usuario)
+            uow.conn.execute(
+                "INSERT INTO usuarios (id, nome, email, senha, cpf, tipo) VALUES (?, ?, ?, ?, ?, ?)",
+                (str(usuario.id), usuario.nome, usuario.email, usuario.senha, usuario.cpf, tipo)
+            )
         
         return usuario
         
+    @_sincronizado
+    def adicionar_usuarios_em_lote(self, registros):
+        '''Cadastra vários usuários em uma única transação.
+
+        Cada registro é um dicionário com nome, email, senha, cpf e tipo. Registros
+        inválidos ou com email/CPF repetidos (no sistema ou no próprio lote) são
+        ignorados; devolve (usuários cadastrados, [(posição do registro, erro)]).
+        '''
+        classes_tipo = {
+            'membro': Membro,
+            'administrador': Administrador,
+            'bibliotecario': Bibliotecario
+        }
+        emails = set()
+        cpfs = set()
+        usuarios = []
+        erros = []
+
+        for posicao, registro in enumerate(registros):
+            try:
+                tipo = registro.get('tipo', 'membro')
+                if tipo not in classes_tipo:
+                    raise ValueError(f"Tipo de usuário inválido: {tipo}")
+                usuario = classes_tipo[tipo](registro.get('nome'), registro.get('email'), registro.get('senha'), registro.get('cpf'))
+
+                # Duplicidade verificada por conjuntos (lote) e pelos índices do registro (sistema)
+                if _normalizar_email(usuario.email) in emails or self.usuario_por_email(usuario.email):
+                    raise ValueError("Email já cadastrado no sistema")
+                if usuario.cpf in cpfs or self.usuario_por_cpf(usuario.cpf):
+                    raise ValueError("CPF já cadastrado no sistema")
+            except (ValueError, TypeError, AttributeError) as e:
+                erros.append((posicao, str(e)))
+                continue
+
+            usuario.tipo = tipo
+            emails.add(_normalizar_email(usuario.email))
+            cpfs.add(usuario.cpf)
+            usuarios.append(usuario)
+
+        with UnidadeTrabalho(self) as uow:
+            for usuario in usuarios:
+                uow.adicionar(self.usuarios, usuario)
+            if usuarios:
+                uow.evento('usuarios_cadastrados', *usuarios)
+            uow.conn.executemany(
+                "INSERT INTO usuarios (id, nome, email, senha, cpf, tipo) VALUES (?, ?, ?, ?, ?, ?)",
+                [(str(u.id), u.nome, u.email, u.senha, u.cpf, u.tipo) for u in usuarios]
+            )
+
+        return usuarios, erros
+
+    def usuario_por_email(self, email):
+        '''Usuário com o email informado (sem diferenciar maiúsculas), ou None'''
+        k = _normalizar_email(email)
+        return self.usuarios.primeiro('email', k) if k else None
+
+    def usuario_por_cpf(self, cpf):
+        '''Usuário com o CPF informado (com ou sem pontuação), ou None'''
+        k = _normalizar_cpf(cpf)
+        return self.usuarios.primeiro('cpf', k) if k else None
+
+    def autenticar(self, email, senha):
+        '''Usuário cujas credenciais conferem, ou None'''
+        usuario = self.usuario_por_email(email)
+        if usuario is None or indice_atributo('senha')(usuario) != senha:
+            return None
+        return usuario
+
+    def buscar_usuarios(self, texto, limite=10, tipo=None):
+        '''Sugestões para os seletores de usuário: email ou CPF exatos, ou prefixo das palavras do nome.
+
+        'tipo' restringe as sugestões (ex.: apenas 'membro').
+        '''
+        texto = (texto or '').strip()
+        if not texto or limite <= 0:
+            return []
+
+        filtro = None if tipo is None else (lambda usuario: indice_atributo('tipo')(usuario) == tipo)
+        # Email ou CPF completos identificam um único usuário
+        if '@' in texto:
+            encontrado = self.usuario_por_email(texto)
+        elif re.fullmatch(r'[\d.\-\s]+', texto) and len(_normalizar_cpf(texto) or '') == 11:
+            encontrado = self.usuario_por_cpf(texto)
+        else:
+            return self._indice_usuarios.sugerir(texto, limite, filtro)
+        return [encontrado] if encontrado is not None and (filtro is None or filtro(encontrado)) else []
+
+    @_sincronizado
     def remover_usuario(self, id):
-        # Filtro de usuários por ID
-        # aceitar tanto UUID objects quanto strings
-        usuarios = [u for u in self.usuarios if getattr(u, 'id', None) == id or str(getattr(u, 'id', None)) == str(id)]
+        # Busca por ID (aceita tanto UUID objects quanto strings)
+        usuario = self.usuarios.obter(id)
 
-        # Se o filtro não resultar em nenhum usuário
-        if not usuarios:
+        # Se a busca não resultar em nenhum usuário
+        if usuario is None:
             raise ValueError(f'Usuário com id {id} não existe')
-        
-        # Considerar o único resultado do filtro
-        usuario = usuarios[0]
 
-        # Remover instância da lista
-        self.usuarios.remove(usuario)
-        
-        conn = database.get_connection()
-        conn.execute("DELETE FROM usuarios WHERE id = ?", (str(usuario.id),))
-        conn.commit()
-        conn.close()
+        # Remover instância da lista e do banco
+        with UnidadeTrabalho(self) as uow:
+            uow.remover(self.usuarios, usuario)
+            uow.evento('usuario_removido', removidos=[usuario])
+            uow.conn.execute("DELETE FROM usuarios WHERE id = ?", (str(usuario.id),))
 
+    @_sincronizado
     def adicionar_item(self, item):
-        self.itens.append(item)
-        
         if isinstance(item, dict):
-             pass
+            self.itens.append(item)
         else:
-            conn = database.get_connection()
-            tipo = 'ebook' if isinstance(item, Ebook) else 'livro'
-            item.tipo = tipo
-            item._status = 'disponivel'
-            conn.execute(
-                '''INSERT INTO itens (id, tipo, nome, autor, isbn, categoria, paginas, status) 
+            with UnidadeTrabalho(self) as uow:
+                tipo = 'ebook' if isinstance(item, Ebook) else 'livro'
+                item.tipo = tipo
+                item._status = StatusItem.DISPONIVEL
+                uow.adicionar(self.itens, item)
+                uow.evento('item_cadastrado', item)
+                uow.conn.execute(
+                    '''INSERT INTO itens (id, tipo, nome, autor, isbn, categoria, paginas, status) 
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                    (str(item.id), tipo, item.nome, item.autor, item.isbn, item.categoria, item.num_paginas, StatusItem.DISPONIVEL)
+                )
+
+    @_sincronizado
+    def adicionar_itens_em_lote(self, itens, importacao=None):
+        '''Cadastra vários itens já validados em uma única transação (usado pela importação do acervo).
+
+        'importacao' é uma tupla (chave, linhas processadas, [(linha, erro)] rejeitadas
+        no lote) gravada na mesma transação, para que a retomada parta exatamente
+        do último lote gravado e relate as rejeições anteriores.
+        '''
+        itens = list(itens)
+        for item in itens:
+            item.tipo = 'ebook' if isinstance(item, Ebook) else 'livro'
+            item._status = StatusItem.DISPONIVEL
+
+        with UnidadeTrabalho(self) as uow:
+            for item in itens:
+                uow.adicionar(self.itens, item)
+            if itens:
+                uow.evento('itens_cadastrados', *itens)
+            uow.conn.executemany(
+                '''INSERT INTO itens (id, tipo, nome, autor, isbn, categoria, paginas, status)
                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-                (str(item.id), tipo, item.nome, item.autor, item.isbn, item.categoria, item.num_paginas, 'disponivel')
+                [(str(item.id), item.tipo, item.nome, item.autor, item.isbn, item.categoria, item.num_paginas, StatusItem.DISPONIVEL)
+                 for item in itens]
             )
-            conn.commit()
-            conn.close()
+            if importacao is not None:
+                chave_importacao, linhas_processadas, rejeitados = importacao
+                uow.conn.execute("INSERT OR REPLACE INTO importacoes (chave, linhas_processadas) VALUES (?, ?)",
+                                 (chave_importacao, linhas_processadas))
+                uow.conn.executemany("INSERT INTO importacoes_rejeitados (chave, linha, erro) VALUES (?, ?, ?)",
+                                     [(chave_importacao, linha, erro) for linha, erro in rejeitados])
+
+        return itens
+
+    def progresso_importacao(self, chave):
+        '''(linhas já gravadas, [(linha, erro)] rejeitadas) da importação identificada por 'chave' ((0, []) se não houver)'''
+        conn = database.conexao()
+        row = conn.execute("SELECT linhas_processadas FROM importacoes WHERE chave = ?", (chave,)).fetchone()
+        if row is None:
+            return 0, []
+        rejeitados = conn.execute("SELECT linha, erro FROM importacoes_rejeitados WHERE chave = ? ORDER BY linha", (chave,))
+        return row[0], [tuple(r) for r in rejeitados]
 
+    @_sincronizado
+    def concluir_importacao(self, chave):
+        with UnidadeTrabalho(self) as uow:
+            uow.conn.execute("DELETE FROM importacoes WHERE chave = ?", (chave,))
+            uow.conn.execute("DELETE FROM importacoes_rejeitados WHERE chave = ?", (chave,))
+
+    @_sincronizado
     def remover_item(self, id):
-        # Filtro de itens por ID
-        itens = [i for i in self.itens if i.id == id]
+        # Busca por ID
+        item = self.itens.obter(id)
 
-        # Se o filtro não resultar em nenhum item
-        if not itens:
+        # Se a busca não resultar em nenhum item
+        if item is None:
             raise ValueError(f'Item com id {id} não existe')
-        
-        # Considerar o único resultado do filtro
-        item = itens[0]
 
-        # Remover instância da lista
-        self.itens.remove(item)
-        
-        # Persistência
-        conn = database.get_connection()
-        item_id = item['id'] if isinstance(item, dict) else str(item.id)
-        conn.execute("DELETE FROM itens WHERE id = ?", (item_id,))
-        conn.commit()
-        conn.close()
+        # Remover instância da lista e do banco
+        with UnidadeTrabalho(self) as uow:
+            uow.remover(self.itens, item)
+            if not isinstance(item, dict):
+                uow.evento('item_removido', removidos=[item])
+            item_id = item['id'] if isinstance(item, dict) else str(item.id)
+            uow.conn.execute("DELETE FROM itens WHERE id = ?", (item_id,))
     
+    def buscar_itens(self, texto, limite=20):
+        '''Itens cujo título, autor, categoria ou ISBN contêm as palavras (ou prefixos) do texto.
+
+        A busca ignora acentos e maiúsculas; os resultados vêm ordenados por
+        relevância (bm25), com mais peso para o título e depois para o autor.
+        '''
+        expressao = _expressao_busca(texto)
+        if not expressao:
+            return []
+
+        # O índice é mantido pelo banco: operações ainda no diário precisam estar gravadas
+        self.descarregar_escrita()
+        cursor = database.conexao().execute(
+            '''SELECT id FROM itens_busca
+                WHERE itens_busca MATCH ?
+                ORDER BY bm25(itens_busca, 0.0, 10.0, 5.0, 2.0, 1.0)
+                LIMIT ?''',
+            (expressao, limite)
+        )
+        return [item for item in (self.itens.obter(row['id']) for row in cursor) if item is not None]
+
+    def sugerir_itens(self, texto, limite=10):
+        '''Sugestões da busca incremental: itens com as palavras digitadas no título, autor ou categoria.
+
+        A última palavra pode estar incompleta; acentos e maiúsculas são ignorados.
+        '''
+        return self._indice_textual.sugerir(texto, limite)
+
+    def contagens(self, colecao, faceta):
+        '''{valor: quantidade} da faceta de uma coleção, sem percorrê-la.
+
+        Facetas: 'itens' por 'categoria', 'tipo', 'status' e 'autor' (None para
+        itens sem autor); 'emprestimos' por 'status' e 'membro_status' ((id do
+        membro, status)); 'reservas' por 'status' e 'membro'.
+        '''
+        return self._contador_facetas(colecao, faceta).contagens(faceta)
+
+    def quantidade(self, colecao, faceta, valor):
+        '''Quantidade de entidades da coleção com o valor informado na faceta'''
+        return self._contador_facetas(colecao, faceta).quantidade(faceta, valor)
+
+    def _contador_facetas(self, colecao, faceta):
+        contador = self._facetas.get(colecao)
+        if contador is None or faceta not in contador:
+            raise ValueError(f'Faceta {faceta!r} não existe para {colecao!r}')
+        return contador
+
+    def consultar_emprestimos(self, status=None, membro=None, ordem='data_emprestimo', decrescente=False, limite=None, deslocamento=0):
+        '''Página de empréstimos filtrados por status (um ou vários) e membro, ordenada pelo banco.
+
+        'ordem': 'membro', 'item', 'data_emprestimo', 'data_prevista', 'status', 'renovacoes' ou 'multa'.
+        '''
+        return self._consultar_circulacao('emprestimos', self.emprestimos, status, membro, ordem, decrescente, limite, deslocamento)
+
+    def consultar_reservas(self, status=None, membro=None, ordem='data_reserva', decrescente=False, limite=None, deslocamento=0):
+        '''Página de reservas filtradas por status (um ou vários) e membro, ordenada pelo banco.
+
+        'ordem': 'membro', 'item', 'data_reserva' ou 'status'.
+        '''
+        return self._consultar_circulacao('reservas', self.reservas, status, membro, ordem, decrescente, limite, deslocamento)
+
+    def _consultar_circulacao(self, tabela, registro, status, membro, ordem, decrescente, limite, deslocamento):
+        expressao = self._ORDENS_CONSULTA[tabela].get(ordem)
+        if expressao is None:
+            raise ValueError(f'Ordenação {ordem!r} não existe para {tabela}')
+
+        condicoes = []
+        parametros = []
+        if status is not None:
+            estados = [status] if isinstance(status, str) else list(status)
+            condicoes.append(f"status IN ({', '.join('?' * len(estados))})")
+            parametros += [STATUS_TABELAS[tabela](estado) for estado in estados]
+        if membro is not None:
+            condicoes.append("membro_id = ?")
+            parametros.append(chave(membro))
+        # Linhas cujo item ou membro foi removido não são carregadas: ficam fora da página
+        # no próprio banco, para que cada página tenha 'limite' entidades e o deslocamento seja exato
+        condicoes.append(f"EXISTS (SELECT 1 FROM itens WHERE itens.id = {tabela}.item_id)")
+        condicoes.append(f"EXISTS (SELECT 1 FROM usuarios WHERE usuarios.id = {tabela}.membro_id)")
+
+        # rowid desempata valores iguais: páginas consecutivas não repetem nem pulam linhas
+        direcao = 'DESC' if decrescente else 'ASC'
+        return self._pagina_circulacao(registro, tabela, ' AND '.join(condicoes), parametros,
+                                       f"{expressao} {direcao}, rowid {direcao}", limite, deslocamento)
+
+    def _pagina_circulacao(self, registro, tabela, condicao, parametros, ordem, limite, deslocamento):
+        # O banco ordena e pagina; os objetos vêm do registro em memória
+        self.descarregar_escrita()
+        sql = f"SELECT * FROM {tabela} WHERE {condicao} ORDER BY {ordem}"
+        if limite is not None:
+            sql += f" LIMIT {int(limite)} OFFSET {int(deslocamento)}"
+        # Empréstimos arquivados não estão no registro: são construídos a partir da linha,
+        # de modo que cada linha lida corresponde a uma entidade da página
+        construtor = self._emprestimo_de_linha if tabela == 'emprestimos' else self._reserva_de_linha
+        cursor = database.conexao().execute(sql, parametros)
+        return [registro.obter(row['id']) or construtor(row) for row in cursor]
+
+    def _atualizar_indices(self, *objetos):
+        '''Reclassifica as entidades nos índices de circulação e nas contagens por faceta após uma transição de estado'''
+        for objeto in objetos:
+            if isinstance(objeto, (Emprestimo, Reserva, dict)):
+                self._circulacao.atualizar(objeto)
+            self._atualizar_facetas(objeto)
+
+    def _atualizar_facetas(self, objeto):
+        # Os ids são únicos entre as coleções: apenas o contador que já conhece a entidade a reclassifica
+        k = chave(objeto)
+        for contador in self._facetas.values():
+            contador.atualizar(k, objeto)
+
+    def _remover_indices(self, *objetos):
+        '''Retira dos índices de circulação entidades removidas das coleções'''
+        for objeto in objetos:
+            if isinstance(objeto, (Emprestimo, Reserva, dict)):
+                self._circulacao.remover(objeto)
+
+    # Consultas usadas nas regras de empréstimo e reserva
+    def _multas_pendentes(self, membro):
+        '''Empréstimos do membro com multa ainda não paga'''
+        return self._circulacao.multas_pendentes(membro)
+
+    def _quantidade_em_aberto(self, membro):
+        '''Soma dos empréstimos ativos e das reservas aguardando do membro'''
+        return self._circulacao.em_aberto(membro)
+
+    def _emprestimos_ativos_item(self, item):
+        return self._circulacao.emprestimos_ativos_item(item)
+
+    def _data_ultima_devolucao(self, item):
+        '''Data da devolução mais recente do item, ou None se ele nunca foi devolvido'''
+        if isinstance(item, dict):
+            return item.get('data_ultima_devolucao')
+        return item.data_ultima_devolucao
+
+    def _primeira_reserva(self, item):
+        '''Reserva aguardando mais antiga do item, ou None se não há fila'''
+        return self._circulacao.fila_reservas(item).primeira()
+
+    def fila_reservas(self, item):
+        '''Reservas aguardando do item, em ordem de reserva (as primeiras reservas vêm primeiro)'''
+        return list(self._circulacao.fila_reservas(item))
+
+    def posicao_na_fila(self, item, membro):
+        '''Posição (a partir de 1) do membro na fila de reservas do item, ou None'''
+        return self._circulacao.fila_reservas(item).posicao(membro)
+
+    def _reserva_em_memoria(self, id):
+        return self.reservas.obter(id)
+
+    def _expirar_reservas(self, condicao, parametros, agora=None):
+        '''Expira em lote as reservas 'aguardando' ou 'finalizada' que satisfazem a condição SQL'''
+        agora = agora or datetime.datetime.now()
+        filtro = f"status IN (?, ?) AND {condicao}"
+        parametros = (StatusReserva.AGUARDANDO, StatusReserva.FINALIZADA, *parametros)
+
+        # A seleção é feita no banco: operações ainda no diário precisam estar gravadas
+        self.descarregar_escrita()
+
+        with UnidadeTrabalho(self) as uow:
+            ids = [row[0] for row in uow.conn.execute(f"SELECT id FROM reservas WHERE {filtro}", parametros)]
+            if not ids:
+                return 0
+            uow.conn.execute(f"UPDATE reservas SET status = ?, data_cancelamento = ? WHERE {filtro}", (StatusReserva.EXPIRADA, agora, *parametros))
+
+            # Atualização em lote dos objetos em memória (suporta objetos Reserva e dicionários)
+            expiradas = []
+            for id in ids:
+                reserva = self._reserva_em_memoria(id)
+                if reserva is None:
+                    continue
+                uow.registrar(reserva)
+                if isinstance(reserva, dict):
+                    reserva['status'] = StatusReserva.EXPIRADA
+                    reserva['data_cancelamento'] = agora
+                else:
+                    reserva.expirar(agora)
+                    expiradas.append(reserva)
+                self._atualizar_indices(reserva)
+            uow.evento('expiracao_reservas', *expiradas)
+
+        return len(ids)
+
+    @_sincronizado
+    def expirar_reservas(self, agora=None):
+        '''Expira as reservas de todos os itens disponíveis cujo prazo de retirada já passou.
+
+        A validade de uma reserva conta a partir da última devolução do item.
+        Retorna a quantidade de reservas expiradas.
+        '''
+        agora = agora or datetime.datetime.now()
+        limite = agora - datetime.timedelta(days=PRAZO_VALIDADE_RESERVA)
+        return self._expirar_reservas(
+            "item_id IN (SELECT id FROM itens WHERE status = ? AND data_ultima_devolucao < ?)",
+            (StatusItem.DISPONIVEL, limite),
+            agora
+        )
+
+    def iniciar_varredura_reservas(self, intervalo=INTERVALO_VARREDURA_RESERVAS):
+        '''Inicia a expiração periódica de reservas em uma thread de fundo'''
+        if self._varredor is None:
+            self._varredor = VarredorReservas(self, intervalo, self._registrar_falha)
+            self._varredor.start()
+        return self._varredor
+
+    def parar_varredura_reservas(self):
+        if self._varredor is not None:
+            self._varredor.parar()
+            self._varredor = None
+
+    def iniciar_instantaneos(self, intervalo=INTERVALO_VERIFICACAO_INSTANTANEO):
+        '''Inicia a thread que gera instantâneos periódicos (sem efeito com o registro de eventos desativado)'''
+        if self._registro_eventos and self._gerador_instantaneos is None:
+            self._gerador_instantaneos = GeradorInstantaneos(self, intervalo, self._registrar_falha)
+            self._gerador_instantaneos.start()
+        return self._gerador_instantaneos
+
+    def parar_instantaneos(self):
+        if self._gerador_instantaneos is not None:
+            self._gerador_instantaneos.parar()
+            self._gerador_instantaneos = None
+
+    @_sincronizado
+    def ativar_escrita_adiada(self, intervalo=INTERVALO_ESCRITA_ADIADA, tamanho_lote=TAMANHO_LOTE_ESCRITA_ADIADA):
+        '''Passa a confirmar as operações em um diário local, gravado no banco em lotes por uma thread de fundo'''
+        if self._escritor is None:
+            self._escritor = EscritorAdiado(caminho_diario(), intervalo, tamanho_lote, ao_erro=self._registrar_falha)
+            self._escritor.start()
+
+    @_sincronizado
+    def desativar_escrita_adiada(self):
+        '''Grava as operações pendentes e volta a gravar cada operação diretamente no banco'''
+        if self._escritor is not None:
+            escritor, self._escritor = self._escritor, None
+            escritor.parar()
+
+    def _registrar_falha(self, origem, mensagem):
+        self._falhas.append((datetime.datetime.now(), origem, str(mensagem)))
+
+    def falhas_em_segundo_plano(self):
+        '''Falhas das tarefas de fundo desde a última consulta: [(data, origem, mensagem)]'''
+        falhas = []
+        while self._falhas:
+            falhas.append(self._falhas.popleft())
+        return falhas
+
+    def descarregar_escrita(self):
+        '''Aguarda a gravação no banco das operações pendentes da escrita adiada (se ativa)'''
+        if self._escritor is not None:
+            self._escritor.descarregar()
+
+    @_sincronizado
     def emprestar_item(self, item, membro):
         # Se o usuário não for um membro (apenas membros podem emprestar e reservar)
         if not isinstance(membro, Membro):
             raise TypeError('Apenas membros podem emprestar itens')
         
         # Verificar se o membro possui multas pendentes
-        multas_pendentes = [e for e in self.emprestimos if get_status(e) == 'multado' and getattr(e, 'membro', None) == membro and getattr(getattr(e, 'multa', None), 'paga', True) == False]
+        multas_pendentes = self._multas_pendentes(membro)
         if multas_pendentes:
             valor_total = sum(getattr(e.multa, 'valor', 0) for e in multas_pendentes)
             raise ValueError(f'Membro possui multas pendentes no valor de R$ {valor_total:.2f}. Não é possível fazer novos empréstimos até que as multas sejam quitadas.')
         
         # Soma da contagem de reservas e de empréstimos (que não deve ultrapassar o limite de registros)
-        soma_emprestimos_reservas = len(
-            [e for e in self.emprestimos if get_status(e) == 'ativo' and getattr(e, 'membro', None) == membro]
-            +
-            [r for r in self.reservas if get_status(r) == 'aguardando' and getattr(r, 'membro', None) == membro]
-        )
+        soma_emprestimos_reservas = self._quantidade_em_aberto(membro)
 
         # Se ultrapasasar o limite de empréstimos
         if soma_emprestimos_reservas >= LIMITE_EMPRESTIMOS_SIMULTANEOS:
             raise ValueError(f'Não é possível ultrapassar o limite de {LIMITE_EMPRESTIMOS_SIMULTANEOS} empréstimos')
 
         # Obtenção dos empréstimos ativos do item
-        emprestimos_ativos_item = [e for e in self.emprestimos if get_status(e) == 'ativo' and getattr(e, 'item', None) == item]
+        emprestimos_ativos_item = self._emprestimos_ativos_item(item)
 
         # Se há um empréstimo ativo do item, ele não pode ser emprestado
         if emprestimos_ativos_item:
             raise ValueError('Não é possível emprestar um livro com empréstimo ativo')
         
-        # Obtenção do último empréstimo
-        # Pode ser que não tenha nenhum resultado, um, ou múltiplos
-        filtro_ultimo_emprestimo = [e for e in self.emprestimos if get_status(e) != 'ativo' and getattr(e, 'item', None) == item]
+        # Data que o item ficou disponível (devolução do empréstimo mais recente)
+        data_referencia = self._data_ultima_devolucao(item)
         
         # Se nunca teve empréstimos, nunca teve reserva. Isso significa que temos informações
         # suficientes para saber que o livro pode ser emprestado
-        if not filtro_ultimo_emprestimo:
-            novo_emp = Emprestimo(item, membro)
-            self.emprestimos.append(novo_emp)
-            
-            # Persistência
-            conn = database.get_connection()
-            conn.execute(
-                '''INSERT INTO emprestimos (id, item_id, membro_id, data_emprestimo, status, quantidade_renovacoes) 
-                   VALUES (?, ?, ?, ?, ?, ?)''',
-                (str(novo_emp.id), str(item.id), str(membro.id), novo_emp.data_emprestimo, 'ativo', 0)
-            )
-            conn.execute("UPDATE itens SET status = ? WHERE id = ?", ('emprestado', str(item.id)))
-            item._status = 'emprestado'
-            conn.commit()
-            conn.close()
+        if data_referencia is None:
+            self._criar_emprestimo(item, membro)
             return
 
-        # Ordenação e reversão para garantir que o primeiro elemento da lista seja o empŕestimo mais recente
-        filtro_ultimo_emprestimo.sort(key=lambda e: e.data_devolucao, reverse=True)
+        # Se passou da data de validade, as reservas relacionadas ao item expiram
+        # (inclui 'aguardando' e 'finalizada'), em uma única atualização em lote
+        if datetime.datetime.now() > data_referencia + datetime.timedelta(days=PRAZO_VALIDADE_RESERVA):
+            self._expirar_reservas("item_id = ?", (str(item.id),))
 
-        # O empréstimo mais recente é o primeiro elemento da lista
-        emprestimo_mais_recente = filtro_ultimo_emprestimo[0]
+        # Obtenção da primeira reserva da fila: apenas reservas 'aguardando' bloqueiam empréstimos
+        primeira_reserva = self._primeira_reserva(item)
 
-        # Data que o item ficou disponível
-        data_referencia = emprestimo_mais_recente.data_devolucao
+        # Se não há reservas ativas, não há prioridade para verificar
+        if primeira_reserva is None:
+            self._criar_emprestimo(item, membro)
+            return
 
-        # Checar reservas relacionadas para atualizar expiração (inclui 'aguardando' e 'finalizada')
-        reservas_para_validade = [r for r in self.reservas if get_status(r) in ['aguardando', 'finalizada'] and getattr(r, 'item', None) == item]
+        # Membro com preferência para retirar
+        primeiro_membro_fila = primeira_reserva.membro    
 
-        # Atualização do status das reservas expiradas
-        for reserva in reservas_para_validade:
-            data_validade_reserva = data_referencia + datetime.timedelta(days=PRAZO_VALIDADE_RESERVA)
+        # Se o membro tentando retirar não tem prioridade, ele não pode retirar
+        if membro != primeiro_membro_fila:
+            raise ValueError('Este item possui reservas. Apenas o primeiro membro da fila pode emprestar.')
 
-            # Se passou da data de validade
-            if datetime.datetime.now() > data_validade_reserva:
-                # suportar objetos Reserva e dicionários
-                if isinstance(reserva, dict):
-                    reserva['status'] = 'expirada'
-                    reserva['data_cancelamento'] = datetime.datetime.now()
-                else:
-                    reserva._status = 'expirada'
-                
-                # Persistência da expiração
-                res_id = reserva['id'] if isinstance(reserva, dict) else str(reserva.id)
-                conn = database.get_connection()
-                conn.execute("UPDATE reservas SET status = ?, data_cancelamento = ? WHERE id = ?", ('expirada', datetime.datetime.now(), res_id))
-                conn.commit()
-                conn.close()
+        # Criar o empréstimo (a reserva utilizada é marcada como finalizada)
+        self._criar_emprestimo(item, membro, primeira_reserva)
 
-        # Obtenção das reservas que efetivamente bloqueiam empréstimos: apenas 'aguardando'
-        reservas_ativas_item = [r for r in self.reservas if get_status(r) == 'aguardando' and getattr(r, 'item', None) == item]
+    def _criar_emprestimo(self, item, membro, reserva_utilizada=None):
+        with UnidadeTrabalho(self) as uow:
+            uow.registrar(item, reserva_utilizada)
 
-        # Se não há reservas ativas, não há prioridade para verificar
-        if not reservas_ativas_item:
-            novo_emp = Emprestimo(item, membro)
-            self.emprestimos.append(novo_emp)
+            if reserva_utilizada is None:
+                novo_emp = Emprestimo(item, membro)
+            else:
+                novo_emp = Emprestimo.de_reserva(reserva_utilizada)
+                self._atualizar_indices(reserva_utilizada)
+                # Atualizar reserva com o estado finalizado definido pelo objeto
+                uow.conn.execute("UPDATE reservas SET status = ?, data_finalizacao = ? WHERE id = ?", (reserva_utilizada.status, reserva_utilizada.data_finalizacao, str(reserva_utilizada.id)))
+
+            uow.adicionar(self.emprestimos, novo_emp)
+            uow.evento('emprestimo', novo_emp, item, reserva_utilizada)
             
             # Persistência
-            conn = database.get_connection()
-            conn.execute(
+            uow.conn.execute(
                 '''INSERT INTO emprestimos (id, item_id, membro_id, data_emprestimo, status, quantidade_renovacoes) 
                    VALUES (?, ?, ?, ?, ?, ?)''',
-                (str(novo_emp.id), str(item.id), str(membro.id), novo_emp.data_emprestimo, 'ativo', 0)
+                (str(novo_emp.id), str(item.id), str(membro.id), novo_emp.data_emprestimo, novo_emp.status, 0)
             )
-            conn.execute("UPDATE itens SET status = ? WHERE id = ?", ('emprestado', str(item.id)))
-            item._status = 'emprestado'
-            conn.commit()
-            conn.close()
-            return
-
-        # Ordenação das reservas ativas por ordem de reserva (as primeiras reservas vêm primeiro)
-        reservas_ativas_item.sort(key=lambda r: r.data_reserva)
-
-        # Membro com preferência para retirar
-        primeiro_membro_fila = reservas_ativas_item[0].membro    
-
-        # Se o membro tentando retirar não tem prioridade, ele não pode retirar
-        if membro != primeiro_membro_fila:
-            raise ValueError('Este item possui reservas. Apenas o primeiro membro da fila pode emprestar.')
-
-        # Criar o empréstimo
-        novo_emp = Emprestimo.de_reserva(reservas_ativas_item[0])
-        self.emprestimos.append(novo_emp)
-        
-        # Persistência
-        reserva_utilizada = reservas_ativas_item[0]
-        conn = database.get_connection()
-        # Atualizar reserva (se já não estiver finalizada)
-        if get_status(reserva_utilizada) != 'finalizada':
-             conn.execute("UPDATE reservas SET status = ?, data_finalizacao = ? WHERE id = ?", ('finalizada', datetime.datetime.now(), str(reserva_utilizada.id)))
-             # Atualiza objeto em memória também, caso não esteja atualizado
-             if isinstance(reserva_utilizada, dict):
-                 reserva_utilizada['status'] = 'finalizada'
-                 reserva_utilizada['data_finalizacao'] = datetime.datetime.now()
-             else:
-                 reserva_utilizada.marcar_como_finalizada()
-
-        # Inserir empréstimo
-        conn.execute(
-            '''INSERT INTO emprestimos (id, item_id, membro_id, data_emprestimo, status, quantidade_renovacoes) 
-               VALUES (?, ?, ?, ?, ?, ?)''',
-            (str(novo_emp.id), str(item.id), str(membro.id), novo_emp.data_emprestimo, 'ativo', 0)
-        )
-        conn.execute("UPDATE itens SET status = ? WHERE id = ?", ('emprestado', str(item.id)))
-        item._status = 'emprestado'
-        conn.commit()
-        conn.close()
+            uow.conn.execute("UPDATE itens SET status = ? WHERE id = ?", (StatusItem.EMPRESTADO, str(item.id)))
+            item._status = StatusItem.EMPRESTADO
+            self._atualizar_indices(item)
+        return novo_emp
         
+    @_sincronizado
     def renovar_emprestimo(self, id_emprestimo):
         # Localiza empréstimo pelo id
-        emprestimos = [e for e in self.emprestimos if str(e.id) == str(id_emprestimo) or e.id == id_emprestimo]
+        emprestimo = self.emprestimos.obter(id_emprestimo)
         
         # Se o empréstimo não foi encontrado
-        if not emprestimos:
+        if emprestimo is None:
             raise ValueError(f'Empréstimo com id {id_emprestimo} não encontrado')
         
-        # Considera o único resultado do filtro
-        emprestimo = emprestimos[0]
-        
-        # Delega a lógica de renovação ao próprio objeto Emprestimo
-        emprestimo.renovar()
+        with UnidadeTrabalho(self) as uow:
+            uow.registrar(emprestimo)
+            uow.evento('renovacao', emprestimo)
+
+            # Delega a lógica de renovação ao próprio objeto Emprestimo
+            emprestimo.renovar()
         
-        # Persistência
-        conn = database.get_connection()
-        conn.execute("UPDATE emprestimos SET quantidade_renovacoes = ? WHERE id = ?", (emprestimo._quantidade_renovacoes, str(emprestimo.id)))
-        conn.commit()
-        conn.close()
+            # Persistência
+            uow.conn.execute("UPDATE emprestimos SET quantidade_renovacoes = ? WHERE id = ?", (emprestimo._quantidade_renovacoes, str(emprestimo.id)))
         
         return emprestimo
 
+    @_sincronizado
     def reservar_item(self, item, membro):
         # Itens disponíveis não podem ser reservados
-        emprestimos_ativos_item = [e for e in self.emprestimos if get_status(e) == 'ativo' and getattr(e, 'item', None) == item]
+        emprestimos_ativos_item = self._emprestimos_ativos_item(item)
         if not emprestimos_ativos_item:
             raise ValueError('Item disponível não pode ser reservado')
 
         # Verificar se o usuário já não tem reserva ativa desse item
-        reservas_ativas_membro_item = [r for r in self.reservas if get_status(r) == 'aguardando' and getattr(r, 'membro', None) == membro and getattr(r, 'item', None) == item]
+        possui_reserva_ativa = self.posicao_na_fila(item, membro) is not None
         
         # Verificar se o usuário já não tem empréstimo ativo desse item
-        emprestimos_ativos_membro_item = [e for e in self.emprestimos if get_status(e) == 'ativo' and getattr(e, 'membro', None) == membro and getattr(e, 'item', None) == item]
+        emprestimos_ativos_membro_item = [e for e in emprestimos_ativos_item if getattr(e, 'membro', None) == membro]
 
-        if reservas_ativas_membro_item or emprestimos_ativos_membro_item:
+        if possui_reserva_ativa or emprestimos_ativos_membro_item:
             raise ValueError('Você já possui uma reserva ativa ou um empréstimo ativo deste item')
 
         # Se o usuário não for um membro (apenas membros podem emprestar e reservar)
@@ -389,15 +1048,13 @@ class Biblioteca:
             raise TypeError('Apenas membros podem reservar itens')
 
         # Verificar se o membro possui multas pendentes
-        multas_pendentes = [e for e in self.emprestimos if get_status(e) == 'multado' and getattr(e, 'membro', None) == membro and getattr(getattr(e, 'multa', None), 'paga', True) == False]
+        multas_pendentes = self._multas_pendentes(membro)
         if multas_pendentes:
             valor_total = sum(getattr(e.multa, 'valor', 0) for e in multas_pendentes)
             raise ValueError(f'Membro possui multas pendentes no valor de R$ {valor_total:.2f}. Não é possível fazer novas reservas até que as multas sejam quitadas.')
         
         # Soma da contagem de reservas e de empréstimos (que não deve ultrapassar o limite de registros)
-        soma_emprestimos_reservas = len(
-            [e for e in self.emprestimos if get_status(e) == 'ativo' and getattr(e, 'membro', None) == membro] + [r for r in self.reservas if get_status(r) == 'aguardando' and getattr(r, 'membro', None) == membro]
-        )
+        soma_emprestimos_reservas = self._quantidade_em_aberto(membro)
 
         # Se ultrapasasar o limite de empréstimos
         if soma_emprestimos_reservas >= LIMITE_EMPRESTIMOS_SIMULTANEOS:
@@ -405,98 +1062,154 @@ class Biblioteca:
         
         # Criar a reserva
         nova_reserva = Reserva(item, membro)
-        self.reservas.append(nova_reserva)
         
-        # Persistência
-        conn = database.get_connection()
-        conn.execute(
-            '''INSERT INTO reservas (id, item_id, membro_id, data_reserva, status) 
-               VALUES (?, ?, ?, ?, ?)''',
-            (str(nova_reserva.id), str(item.id), str(membro.id), nova_reserva.data_reserva, 'aguardando')
-        )
-        conn.commit()
-        conn.close()
+        with UnidadeTrabalho(self) as uow:
+            uow.adicionar(self.reservas, nova_reserva)
+            uow.evento('reserva', nova_reserva)
 
+            # Persistência
+            uow.conn.execute(
+                '''INSERT INTO reservas (id, item_id, membro_id, data_reserva, status) 
+                   VALUES (?, ?, ?, ?, ?)''',
+                (str(nova_reserva.id), str(item.id), str(membro.id), nova_reserva.data_reserva, nova_reserva.status)
+            )
+
+    @_sincronizado
     def cancelar_reserva(self, id_reserva):
         # Localiza reserva pelo id
-        reservas = [r for r in self.reservas if str(r.id) == str(id_reserva) or r.id == id_reserva]
+        reserva = self.reservas.obter(id_reserva)
         
-        if not reservas:
+        if reserva is None:
             raise ValueError(f'Reserva com id {id_reserva} não encontrada')
         
-        reserva = reservas[0]
-        
-        # Delega a lógica de cancelamento ao objeto Reserva
-        reserva.cancelar()
+        with UnidadeTrabalho(self) as uow:
+            uow.registrar(reserva)
+            uow.evento('cancelamento_reserva', reserva)
+
+            # Delega a lógica de cancelamento ao objeto Reserva
+            reserva.cancelar()
+            self._atualizar_indices(reserva)
         
-        # Persistência
-        conn = database.get_connection()
-        conn.execute("UPDATE reservas SET status = ?, data_cancelamento = ? WHERE id = ?", 
-                     ('cancelada', reserva.data_cancelamento, str(reserva.id)))
-        conn.commit()
-        conn.close()
+            # Persistência
+            uow.conn.execute("UPDATE reservas SET status = ?, data_cancelamento = ? WHERE id = ?", 
+                             (reserva.status, reserva.data_cancelamento, str(reserva.id)))
 
+    @_sincronizado
     def registrar_pagamento_multa(self, id_emprestimo):
         # Localiza empréstimo pelo id
-        emprestimos = [e for e in self.emprestimos if str(e.id) == str(id_emprestimo) or e.id == id_emprestimo]
-        if not emprestimos:
+        emprestimo = self.emprestimos.obter(id_emprestimo)
+        if emprestimo is None:
             raise ValueError(f'Empréstimo com id {id_emprestimo} não encontrado')
 
-        emprestimo = emprestimos[0]
+        with UnidadeTrabalho(self) as uow:
+            # A multa é alterada no lugar pela quitação
+            uow.registrar(emprestimo, emprestimo.multa)
+            uow.evento('pagamento_multa', emprestimo)
 
-        # Delegar a lógica de quitação ao próprio objeto Emprestimo
-        emprestimo.quitar_divida()
+            # Delegar a lógica de quitação ao próprio objeto Emprestimo
+            emprestimo.quitar_divida()
+            self._atualizar_indices(emprestimo)
         
-        # Persistência
-        conn = database.get_connection()
-        conn.execute("UPDATE emprestimos SET status = ?, data_quitacao = ?, multa_paga = ? WHERE id = ?", 
-                     ('finalizado', emprestimo.data_quitacao, True, str(emprestimo.id)))
-        conn.commit()
-        conn.close()
+            # Persistência
+            uow.conn.execute("UPDATE emprestimos SET status = ?, data_quitacao = ?, multa_paga = ? WHERE id = ?", 
+                             (emprestimo.status, emprestimo.data_quitacao, True, str(emprestimo.id)))
 
         return emprestimo
 
+    @_sincronizado
     def registrar_devolucao(self, id_emprestimo):
         # Localiza empréstimo pelo id
-        emprestimos = [e for e in self.emprestimos if str(e.id) == str(id_emprestimo) or e.id == id_emprestimo]
-        if not emprestimos:
+        emprestimo = self.emprestimos.obter(id_emprestimo)
+        if emprestimo is None:
             raise ValueError(f'Empréstimo com id {id_emprestimo} não encontrado')
 
-        emprestimo = emprestimos[0]
+        with UnidadeTrabalho(self) as uow:
+            uow.registrar(emprestimo, emprestimo.item)
+            uow.evento('devolucao', emprestimo, emprestimo.item)
+
+            # Processa a devolução (pode gerar multa internamente)
+            emprestimo.devolver()
+            self._atualizar_indices(emprestimo)
+            item = self._liberar_item(emprestimo)
+                
+            # Persistência
+            uow.conn.execute(
+                "UPDATE emprestimos SET status = ?, data_devolucao = ?, multa_valor = ?, multa_paga = ? WHERE id = ?",
+                self._parametros_devolucao(emprestimo)
+            )
+        
+            item_id = item['id'] if isinstance(item, dict) else str(item.id)
+            uow.conn.execute("UPDATE itens SET status = ?, data_ultima_devolucao = ? WHERE id = ?", (StatusItem.DISPONIVEL, emprestimo.data_devolucao, item_id))
+
+        return emprestimo
+
+    @_sincronizado
+    def registrar_devolucoes_em_lote(self, ids_emprestimos, agora=None):
+        '''Registra várias devoluções (ex.: caixa de devolução) em uma única transação.
+
+        Todas as devoluções usam o mesmo instante 'agora' para data e cálculo de multa.
+        Devolve um resumo com os empréstimos devolvidos, os multados, o valor total
+        das multas geradas e os erros [(id, erro)] dos ids que não puderam ser processados.
+        '''
+        agora = agora or datetime.datetime.now()
+        resumo = {'devolvidos': [], 'multados': [], 'valor_multas': 0, 'erros': []}
+
+        with UnidadeTrabalho(self) as uow:
+            for id_emprestimo in ids_emprestimos:
+                emprestimo = self.emprestimos.obter(id_emprestimo)
+                if emprestimo is None:
+                    resumo['erros'].append((id_emprestimo, f'Empréstimo com id {id_emprestimo} não encontrado'))
+                    continue
+                uow.registrar(emprestimo, emprestimo.item)
+                try:
+                    emprestimo.devolver(agora)
+                except ValueError as e:
+                    resumo['erros'].append((id_emprestimo, str(e)))
+                    continue
 
-        # Processa a devolução (pode gerar multa internamente)
-        emprestimo.devolver()
+                self._atualizar_indices(emprestimo)
+                self._liberar_item(emprestimo)
+                resumo['devolvidos'].append(emprestimo)
+                if emprestimo.multa:
+                    resumo['multados'].append(emprestimo)
+                    resumo['valor_multas'] += emprestimo.multa.valor
+
+            uow.conn.executemany(
+                "UPDATE emprestimos SET status = ?, data_devolucao = ?, multa_valor = ?, multa_paga = ? WHERE id = ?",
+                [self._parametros_devolucao(emprestimo) for emprestimo in resumo['devolvidos']]
+            )
+            uow.conn.executemany(
+                "UPDATE itens SET status = ?, data_ultima_devolucao = ? WHERE id = ?",
+                [(StatusItem.DISPONIVEL, agora, str(emprestimo.item.id)) for emprestimo in resumo['devolvidos']]
+            )
+            if resumo['devolvidos']:
+                uow.evento('devolucoes', *resumo['devolvidos'], *(e.item for e in resumo['devolvidos']))
+
+        return resumo
+
+    def _liberar_item(self, emprestimo):
+        '''Devolve o item do empréstimo ao acervo e registra a data da devolução mais recente'''
 
         # Garantir que o item volte a ficar disponível após a devolução (suporta dicts e objetos)
         item = getattr(emprestimo, 'item', None)
         if isinstance(item, dict):
-            item['status'] = 'disponivel'
+            item['status'] = StatusItem.DISPONIVEL
+            item['data_ultima_devolucao'] = emprestimo.data_devolucao
         else:
+            item._data_ultima_devolucao = emprestimo.data_devolucao
             # tentar atribuir atributo 'status' se existir ou ignorar
             try:
                 if hasattr(item, '_status'):
-                    item._status = 'disponivel'
+                    item._status = StatusItem.DISPONIVEL
                 else:
-                    setattr(item, 'status', 'disponivel')
+                    setattr(item, 'status', StatusItem.DISPONIVEL)
             except Exception:
                 pass
-                
-        # Persistência
-        conn = database.get_connection()
+        self._atualizar_indices(item)
+        return item
+
+    def _parametros_devolucao(self, emprestimo):
         multa_valor = emprestimo.multa.valor if emprestimo.multa else None
         multa_paga = emprestimo.multa.paga if emprestimo.multa else None
-        
-        conn.execute(
-            "UPDATE emprestimos SET status = ?, data_devolucao = ?, multa_valor = ?, multa_paga = ? WHERE id = ?",
-            (emprestimo.status, emprestimo.data_devolucao, multa_valor, multa_paga, str(emprestimo.id))
-        )
-        
-        item_id = item['id'] if isinstance(item, dict) else str(item.id)
-        conn.execute("UPDATE itens SET status = ? WHERE id = ?", ('disponivel', item_id))
-        
-        conn.commit()
-        conn.close()
-
-
-        return emprestimo
+        return (emprestimo.status, emprestimo.data_devolucao, multa_valor, multa_paga, str(emprestimo.id))
 
@@ -0,0 +1,235 @@
+from modelos.biblioteca import Biblioteca
+from modelos.mapa_identidade import MapaIdentidade
+from modelos.registro import chave
+from modelos.status import StatusEmprestimo, StatusReserva, STATUS_TABELAS
+from modelos import database
+from config import CAPACIDADE_MAPA_IDENTIDADE, TAMANHO_LOTE_CARGA
+
+
+class ColecaoLazy:
+    '''Coleção de registros de uma tabela consultada sob demanda.
+
+    Oferece a mesma interface de Registro (iteração, len, obter, buscar...),
+    mas os objetos são hidratados a partir do banco apenas quando pedidos e
+    ficam em um mapa de identidade com capacidade limitada.
+    '''
+
+    # Índices secundários de Registro e as colunas correspondentes
+    _COLUNAS_INDICE = {'membro': 'membro_id', 'item': 'item_id'}
+
+    def __init__(self, tabela, construtor, capacidade):
+        self._tabela = tabela
+        self._construtor = construtor
+        self._mapa = MapaIdentidade(capacidade)
+
+    def __iter__(self):
+        return self.consultar()
+
+    def __len__(self):
+        return database.conexao().execute(f"SELECT COUNT(*) FROM {self._tabela}").fetchone()[0]
+
+    def __bool__(self):
+        return database.conexao().execute(f"SELECT EXISTS (SELECT 1 FROM {self._tabela})").fetchone()[0] == 1
+
+    def __contains__(self, entidade):
+        return self.obter(entidade) is not None
+
+    def __getitem__(self, posicao):
+        if isinstance(posicao, slice):
+            return list(self)[posicao]
+
+        # Posições negativas são contadas a partir do fim, em ordem inversa de inserção
+        ordem, deslocamento = ('rowid', posicao) if posicao >= 0 else ('rowid DESC', -posicao - 1)
+        resultado = next(self.consultar(ordem=ordem, limite=1, deslocamento=deslocamento), None)
+        if resultado is None:
+            raise IndexError('Posição fora da coleção')
+        return resultado
+
+    def consultar(self, condicao='1', parametros=(), ordem='rowid', limite=None, deslocamento=0):
+        '''Itera pelos objetos cujas linhas satisfazem a condição SQL, lidas em lotes'''
+        sql = f"SELECT * FROM {self._tabela} WHERE {condicao} ORDER BY {ordem}"
+        if limite is not None:
+            sql += f" LIMIT {int(limite)} OFFSET {int(deslocamento)}"
+
+        cursor = database.conexao().execute(sql, parametros)
+        while True:
+            linhas = cursor.fetchmany(TAMANHO_LOTE_CARGA)
+            if not linhas:
+                break
+            for row in linhas:
+                objeto = self._hidratar(row)
+                if objeto is not None:
+                    yield objeto
+
+    def obter(self, id, padrao=None):
+        k = chave(id)
+        objeto = self._mapa.obter(k)
+        if objeto is None:
+            objeto = next(self.consultar("id = ?", (k,)), None)
+        return objeto if objeto is not None else padrao
+
+    def adicionar(self, entidade):
+        # A persistência é feita pela Biblioteca; aqui apenas mapeamos o objeto
+        self._mapa.guardar(chave(entidade), entidade)
+
+    def remover(self, entidade):
+        self._mapa.descartar(chave(entidade))
+
+    def buscar(self, indice, valor):
+        return list(self.consultar(f"{self._COLUNAS_INDICE[indice]} = ?", (valor,)))
+
+    def primeiro(self, indice, valor):
+        return next(self.consultar(f"{self._COLUNAS_INDICE[indice]} = ?", (valor,), limite=1), None)
+
+    def copia(self):
+        return list(self)
+
+    def mapeado(self, id):
+        '''Objeto já hidratado para o id, sem consultar o banco'''
+        return self._mapa.obter(chave(id))
+
+    def em_memoria(self):
+        '''Quantidade de objetos hidratados atualmente'''
+        return len(self._mapa)
+
+    def limpar(self):
+        self._mapa.limpar()
+
+    # Compatibilidade com a API de lista
+    append = adicionar
+    remove = remover
+
+    def _hidratar(self, row):
+        return self._mapa.obter_ou_hidratar(row['id'], lambda: self._construtor(row))
+
+
+class BibliotecaLazy(Biblioteca):
+    '''Biblioteca que não materializa o histórico de circulação.
+
+    Usuários e itens continuam carregados em memória; empréstimos e reservas
+    são consultados no banco sob demanda (as regras de empréstimo e reserva
+    usam consultas indexadas) e hidratados por um mapa de identidade com
+    descarte LRU, mantendo a memória limitada independentemente do histórico.
+    '''
+
+    # O estado em memória é parcial: a carga lê as tabelas (os eventos continuam sendo registrados,
+    # mantendo válidos os instantâneos usados pelo modo em memória)
+    _carga_por_instantaneo = False
+    # Empréstimos finalizados já não são mantidos em memória
+    _suporta_arquivo_emprestimos = False
+
+    def __init__(self, capacidade=CAPACIDADE_MAPA_IDENTIDADE):
+        self._capacidade = capacidade
+        super().__init__()
+
+    @property
+    def emprestimos(self):
+        return self._emprestimos
+
+    @emprestimos.setter
+    def emprestimos(self, emprestimos):
+        self._emprestimos = ColecaoLazy('emprestimos', self._emprestimo_de_linha, self._capacidade)
+        for emprestimo in emprestimos:
+            self._emprestimos.adicionar(emprestimo)
+
+    @property
+    def reservas(self):
+        return self._reservas
+
+    @reservas.setter
+    def reservas(self, reservas):
+        self._reservas = ColecaoLazy('reservas', self._reserva_de_linha, self._capacidade)
+        for reserva in reservas:
+            self._reservas.adicionar(reserva)
+
+    def _carregadores(self):
+        # Apenas usuários e itens são carregados na inicialização
+        return [c for c in super()._carregadores() if c[0] in ('usuarios', 'itens')]
+
+    # Facetas de empréstimos e reservas respondidas por agregação no banco
+    _COLUNAS_FACETA = {
+        'emprestimos': {'status': ('status',), 'membro_status': ('membro_id', 'status')},
+        'reservas': {'status': ('status',), 'membro': ('membro_id',)}
+    }
+
+    def _atualizar_indices(self, *objetos):
+        # As regras são respondidas pelo banco: não há índices de circulação em memória,
+        # apenas as contagens dos itens (carregados)
+        for objeto in objetos:
+            self._atualizar_facetas(objeto)
+
+    def _colunas_faceta(self, colecao, faceta):
+        colunas = self._COLUNAS_FACETA.get(colecao, {}).get(faceta)
+        if colunas is None:
+            raise ValueError(f'Faceta {faceta!r} não existe para {colecao!r}')
+        return colunas
+
+    def _valor_faceta(self, colecao, colunas, linha):
+        # Status voltam como enumeração; faceta de uma coluna devolve o valor, de várias, a tupla
+        valores = tuple(STATUS_TABELAS[colecao].de_banco(v) if c == 'status' else v for c, v in zip(colunas, linha))
+        return valores if len(valores) > 1 else valores[0]
+
+    def contagens(self, colecao, faceta):
+        if colecao not in self._COLUNAS_FACETA:
+            return super().contagens(colecao, faceta)
+        colunas = self._colunas_faceta(colecao, faceta)
+        lista = ', '.join(colunas)
+        cursor = database.conexao().execute(f"SELECT {lista}, COUNT(*) FROM {colecao} GROUP BY {lista}")
+        return {self._valor_faceta(colecao, colunas, row[:-1]): row[-1] for row in cursor}
+
+    def quantidade(self, colecao, faceta, valor):
+        if colecao not in self._COLUNAS_FACETA:
+            return super().quantidade(colecao, faceta, valor)
+        colunas = self._colunas_faceta(colecao, faceta)
+        valores = valor if len(colunas) > 1 else (valor,)
+        parametros = [STATUS_TABELAS[colecao](v) if c == 'status' else v for c, v in zip(colunas, valores)]
+        condicao = ' AND '.join(f"{c} = ?" for c in colunas)
+        return database.conexao().execute(f"SELECT COUNT(*) FROM {colecao} WHERE {condicao}", parametros).fetchone()[0]
+
+    def _pagina_circulacao(self, registro, tabela, condicao, parametros, ordem, limite, deslocamento):
+        # A coleção lazy já consulta o banco: as linhas são hidratadas diretamente
+        return list(registro.consultar(condicao, parametros, ordem, limite, deslocamento))
+
+    def ativar_escrita_adiada(self, *args, **kwargs):
+        # As consultas do modo lazy leem o banco, que ficaria defasado em relação ao diário
+        raise RuntimeError('Escrita adiada não é suportada no modo lazy')
+
+    def arquivar_emprestimos_finalizados(self):
+        raise RuntimeError('Arquivo de empréstimos não é suportado no modo lazy')
+
+    # Consultas das regras de empréstimo e reserva respondidas pelo banco
+    def _multas_pendentes(self, membro):
+        return list(self.emprestimos.consultar("status = ? AND membro_id = ? AND multa_paga = 0", (StatusEmprestimo.MULTADO, chave(membro))))
+
+    def _quantidade_em_aberto(self, membro):
+        k = chave(membro)
+        return database.conexao().execute(
+            '''SELECT (SELECT COUNT(*) FROM emprestimos WHERE status = ? AND membro_id = ?)
+                    + (SELECT COUNT(*) FROM reservas WHERE status = ? AND membro_id = ?)''',
+            (StatusEmprestimo.ATIVO, k, StatusReserva.AGUARDANDO, k)
+        ).fetchone()[0]
+
+    def _emprestimos_ativos_item(self, item):
+        return list(self.emprestimos.consultar("status = ? AND item_id = ?", (StatusEmprestimo.ATIVO, chave(item))))
+
+    def _reserva_em_memoria(self, id):
+        # Apenas objetos já hidratados precisam ser atualizados
+        return self.reservas.mapeado(id)
+
+    def _primeira_reserva(self, item):
+        return next(self.reservas.consultar("status = ? AND item_id = ?", (StatusReserva.AGUARDANDO, chave(item)), ordem='data_reserva, id', limite=1), None)
+
+    def fila_reservas(self, item):
+        return list(self.reservas.consultar("status = ? AND item_id = ?", (StatusReserva.AGUARDANDO, chave(item)), ordem='data_reserva, id'))
+
+    def posicao_na_fila(self, item, membro):
+        row = database.conexao().execute(
+            '''SELECT r.data_reserva,
+                      (SELECT COUNT(*) FROM reservas a
+                        WHERE a.status = r.status AND a.item_id = r.item_id
+                          AND (a.data_reserva < r.data_reserva OR (a.data_reserva = r.data_reserva AND a.id <= r.id)))
+                 FROM reservas r
+                WHERE r.status = ? AND r.item_id = ? AND r.membro_id = ?''',
+            (StatusReserva.AGUARDANDO, chave(item), chave(membro))
+        ).fetchone()
+        return row[1] if row else None
@@ -1,9 +1,11 @@
 from modelos.usuario import Usuario
 
 class Bibliotecario(Usuario):
+    __slots__ = ()
     
     def __init__(self, nome, email, senha, cpf):
         super().__init__(nome, email, senha, cpf)
+        self.tipo = 'bibliotecario'
         
     def __str__(self):
         return (
@@ -0,0 +1,155 @@
+from bisect import bisect_left, insort
+from modelos.reserva import Reserva
+from modelos.registro import chave
+from utils.helpers import get_status
+from modelos.status import StatusEmprestimo, StatusReserva
+
+
+class FilaReservas:
+    '''Fila de reservas aguardando de um item, ordenada por data de reserva.
+
+    Reservas com a mesma data são desempatadas pelo id, como no modo lazy. O
+    primeiro da fila é lido em O(1) e a posição de um membro é uma busca
+    binária (O(log n)); inserção e remoção localizam a posição por busca
+    binária, mas deslocam a lista (O(n)), o que é barato para filas de um item.
+    '''
+
+    def __init__(self):
+        self._ordem = []
+        self._reservas = {}
+        self._por_membro = {}
+
+    def __len__(self):
+        return len(self._reservas)
+
+    def __iter__(self):
+        return (self._reservas[k] for _, k in self._ordem)
+
+    def __setitem__(self, k, reserva):
+        if k in self._reservas:
+            self.pop(k)
+        self._reservas[k] = reserva
+        insort(self._ordem, (_data_reserva(reserva), k))
+        membro = _referencia(reserva, 'membro')
+        if membro is not None:
+            self._por_membro[membro] = k
+
+    def pop(self, k, padrao=None):
+        reserva = self._reservas.pop(k, None)
+        if reserva is None:
+            return padrao
+        del self._ordem[bisect_left(self._ordem, (_data_reserva(reserva), k))]
+        membro = _referencia(reserva, 'membro')
+        if self._por_membro.get(membro) == k:
+            del self._por_membro[membro]
+        return reserva
+
+    def values(self):
+        return list(self)
+
+    def primeira(self):
+        return self._reservas[self._ordem[0][1]] if self._ordem else None
+
+    def posicao(self, membro):
+        '''Posição (a partir de 1) do membro na fila, ou None se ele não está na fila'''
+        k = self._por_membro.get(chave(membro))
+        if k is None:
+            return None
+        return bisect_left(self._ordem, (_data_reserva(self._reservas[k]), k)) + 1
+
+
+class IndiceCirculacao:
+    '''Conjuntos de circulação por membro e por item, mantidos incrementalmente.
+
+    Cada empréstimo ou reserva pertence a grupos definidos pelo seu estado
+    atual (ex.: empréstimos ativos do membro, reservas aguardando do item).
+    atualizar() reclassifica o objeto e é idempotente, então basta chamá-lo
+    após qualquer transição de estado. As consultas custam O(1) em relação
+    ao tamanho do histórico; as reservas aguardando de cada item formam uma
+    FilaReservas.
+    '''
+
+    def __init__(self):
+        self._grupos = {}
+        self._classificacao = {}
+
+    def atualizar(self, objeto):
+        k = chave(objeto)
+        anteriores = self._classificacao.pop(k, ())
+        atuais = self._classificar(objeto)
+
+        for grupo in anteriores:
+            if grupo not in atuais:
+                self._retirar(grupo, k)
+        for grupo in atuais:
+            if grupo not in self._grupos:
+                self._grupos[grupo] = FilaReservas() if grupo[0] == 'reserva_aguardando_item' else {}
+            self._grupos[grupo][k] = objeto
+
+        if atuais:
+            self._classificacao[k] = atuais
+
+    def remover(self, objeto):
+        k = chave(objeto)
+        for grupo in self._classificacao.pop(k, ()):
+            self._retirar(grupo, k)
+
+    def reconstruir(self, objetos, tipo):
+        '''Descarta os objetos do tipo informado ('emprestimo' ou 'reserva') e indexa os novos'''
+        for k, grupos in list(self._classificacao.items()):
+            if grupos[0][0].startswith(tipo):
+                for grupo in grupos:
+                    self._retirar(grupo, k)
+                del self._classificacao[k]
+        for objeto in objetos:
+            self.atualizar(objeto)
+
+    # Consultas
+    def multas_pendentes(self, membro):
+        return list(self._grupos.get(('emprestimo_multa_membro', chave(membro)), {}).values())
+
+    def em_aberto(self, membro):
+        '''Soma dos empréstimos ativos e das reservas aguardando do membro'''
+        k = chave(membro)
+        return len(self._grupos.get(('emprestimo_ativo_membro', k), ())) + len(self._grupos.get(('reserva_aguardando_membro', k), ()))
+
+    def emprestimos_ativos_item(self, item):
+        return list(self._grupos.get(('emprestimo_ativo_item', chave(item)), {}).values())
+
+    def fila_reservas(self, item):
+        return self._grupos.get(('reserva_aguardando_item', chave(item))) or FilaReservas()
+
+    def _classificar(self, objeto):
+        membro = _referencia(objeto, 'membro')
+        item = _referencia(objeto, 'item')
+
+        if isinstance(objeto, Reserva) or (isinstance(objeto, dict) and 'data_reserva' in objeto):
+            # Registros em dicionário podem trazer o status como texto
+            if StatusReserva.de_banco(get_status(objeto)) is StatusReserva.AGUARDANDO:
+                return (('reserva_aguardando_membro', membro), ('reserva_aguardando_item', item))
+            return ()
+
+        status = StatusEmprestimo.de_banco(get_status(objeto))
+        if status is StatusEmprestimo.ATIVO:
+            return (('emprestimo_ativo_membro', membro), ('emprestimo_ativo_item', item))
+        multa = objeto.get('multa') if isinstance(objeto, dict) else getattr(objeto, 'multa', None)
+        paga = multa.get('paga') if isinstance(multa, dict) else getattr(multa, 'paga', True)
+        if status is StatusEmprestimo.MULTADO and paga == False:
+            return (('emprestimo_multa_membro', membro),)
+        return ()
+
+    def _retirar(self, grupo, k):
+        conjunto = self._grupos.get(grupo)
+        if conjunto is not None:
+            conjunto.pop(k, None)
+            if not conjunto:
+                del self._grupos[grupo]
+
+
+def _data_reserva(reserva):
+    return reserva.get('data_reserva') if isinstance(reserva, dict) else reserva.data_reserva
+
+
+def _referencia(objeto, atributo):
+    referencia = objeto.get(atributo) if isinstance(objeto, dict) else getattr(objeto, atributo, None)
+    return chave(referencia) if referencia is not None else None
@@ -1,17 +1,288 @@
 import sqlite3
+from contextlib import contextmanager
 from datetime import datetime
 import os
+import re
+import threading
+from config import PERFIS_BANCO, PERFIL_BANCO
+from modelos.status import STATUS_TABELAS
 
 # Define o caminho do banco de dados
 DB_NAME = "biblioteca.db"
 
-def get_connection():
-    conn = sqlite3.connect(DB_NAME)
+# PRAGMAs aplicados uma única vez, na criação de cada conexão (ver PERFIS_BANCO em config.py)
+PRAGMAS_CONEXAO = dict(PERFIS_BANCO[PERFIL_BANCO])
+
+# Conexões reutilizáveis: uma por thread, criadas sob demanda
+_local = threading.local()
+_conexoes = []
+_trava = threading.Lock()
+_geracao = 0
+
+def _abrir_conexao():
+    # check_same_thread=False permite que fechar_conexoes() encerre conexões de outras threads;
+    # cada conexão continua sendo usada apenas pela thread que a criou
+    conn = sqlite3.connect(DB_NAME, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    for pragma, valor in PRAGMAS_CONEXAO.items():
+        conn.execute(f"PRAGMA {pragma} = {valor}")
     return conn
 
+def aplicar_perfil(nome):
+    """Seleciona um perfil de PRAGMAs de config.PERFIS_BANCO para as próximas conexões"""
+    if nome not in PERFIS_BANCO:
+        raise ValueError(f'Perfil de banco {nome} não existe')
+    PRAGMAS_CONEXAO.clear()
+    PRAGMAS_CONEXAO.update(PERFIS_BANCO[nome])
+    fechar_conexoes()
+
+def get_connection():
+    """Abre uma conexão avulsa (o chamador é responsável por fechá-la)"""
+    return _abrir_conexao()
+
+def conexao():
+    """Conexão reutilizável da thread atual"""
+    conn = getattr(_local, 'conexao', None)
+
+    # Reabrir se a thread ainda não tem conexão, se o banco mudou ou se as conexões foram descartadas
+    if conn is None or _local.banco != DB_NAME or _local.geracao != _geracao:
+        conn = _abrir_conexao()
+        with _trava:
+            _conexoes.append(conn)
+        _local.conexao = conn
+        _local.banco = DB_NAME
+        _local.geracao = _geracao
+        _local.profundidade = 0
+
+    return conn
+
+@contextmanager
+def transacao():
+    """Executa o bloco em uma transação da conexão da thread atual.
+
+    Confirma ao final do bloco e desfaz tudo em caso de exceção. Transações
+    aninhadas são incorporadas à transação mais externa.
+    """
+    conn = conexao()
+    _local.profundidade += 1
+    try:
+        yield conn
+        if _local.profundidade == 1:
+            conn.commit()
+    except BaseException:
+        if _local.profundidade == 1:
+            conn.rollback()
+        raise
+    finally:
+        _local.profundidade -= 1
+
+def fechar_conexoes():
+    """Fecha todas as conexões reutilizáveis (as threads abrem novas no próximo uso)"""
+    global _geracao
+    with _trava:
+        for conn in _conexoes:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        _conexoes.clear()
+        _geracao += 1
+
+def _adicionar_coluna(conn, tabela, coluna, tipo):
+    # ALTER TABLE ADD COLUMN não aceita IF NOT EXISTS
+    colunas = {row['name'] for row in conn.execute(f"PRAGMA table_info({tabela})")}
+    if coluna not in colunas:
+        conn.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {tipo}")
+
+def _status_inteiro(conn, tabela):
+    """Reconstrói a tabela com a coluna 'status' INTEGER, convertendo os textos em códigos"""
+    # A afinidade TEXT gravaria os códigos como texto: a coluna precisa ser redeclarada
+    tipos = {row['name']: row['type'] for row in conn.execute(f"PRAGMA table_info({tabela})")}
+    colunas = list(tipos)
+    if tipos['status'].upper() == 'INTEGER':
+        return
+
+    sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (tabela,)).fetchone()[0]
+    indices = [row[0] for row in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (tabela,)
+    )]
+    nova = re.sub(r'\bstatus\s+TEXT\b', 'status INTEGER', sql, count=1, flags=re.IGNORECASE)
+    nova = nova.replace(f'CREATE TABLE {tabela}', f'CREATE TABLE {tabela}_nova', 1)
+
+    conn.execute(f"DROP TABLE IF EXISTS {tabela}_nova")
+    conn.execute(nova)
+    # O rowid é preservado (o índice de busca de itens o referencia)
+    selecao = ', '.join(STATUS_TABELAS[tabela].sql_codigo(c) if c == 'status' else c for c in colunas)
+    conn.execute(f"INSERT INTO {tabela}_nova (rowid, {', '.join(colunas)}) SELECT rowid, {selecao} FROM {tabela}")
+    conn.execute(f"DROP TABLE {tabela}")
+    conn.execute(f"ALTER TABLE {tabela}_nova RENAME TO {tabela}")
+    for indice in indices:
+        conn.execute(indice)
+
+def _verificar_emails_unicos(conn):
+    """Impede o índice único de email com duplicatas, informando quais usuários conflitam"""
+    duplicados = conn.execute(
+        "SELECT email, GROUP_CONCAT(id, ', ') FROM usuarios WHERE email IS NOT NULL GROUP BY email HAVING COUNT(*) > 1"
+    ).fetchall()
+    if duplicados:
+        conflitos = '; '.join(f"{email} (usuários {ids})" for email, ids in duplicados)
+        raise ValueError(f"Emails duplicados em usuarios, corrija-os antes de migrar: {conflitos}")
+
+def reconstruir_indice_busca(conn=None):
+    """Refaz o índice de busca de itens a partir da tabela"""
+    conn = conn or conexao()
+    conn.execute("DELETE FROM itens_busca")
+    conn.execute("INSERT INTO itens_busca (id, nome, autor, categoria, isbn) SELECT id, nome, autor, categoria, isbn FROM itens")
+
+# Migrações do esquema, aplicadas em ordem sobre bancos existentes.
+# Cada passo é um comando SQL ou uma função que recebe a conexão.
+# A versão aplicada é registrada em PRAGMA user_version.
+MIGRACOES = [
+    (1, 'Índices de circulação e de busca', [
+        "CREATE INDEX IF NOT EXISTS idx_emprestimos_item ON emprestimos(item_id)",
+        "CREATE INDEX IF NOT EXISTS idx_emprestimos_membro ON emprestimos(membro_id)",
+        "CREATE INDEX IF NOT EXISTS idx_emprestimos_status_item ON emprestimos(status, item_id)",
+        "CREATE INDEX IF NOT EXISTS idx_emprestimos_status_membro ON emprestimos(status, membro_id)",
+        "CREATE INDEX IF NOT EXISTS idx_reservas_item ON reservas(item_id)",
+        "CREATE INDEX IF NOT EXISTS idx_reservas_membro ON reservas(membro_id)",
+        "CREATE INDEX IF NOT EXISTS idx_reservas_status_item ON reservas(status, item_id)",
+        "CREATE INDEX IF NOT EXISTS idx_reservas_status_membro ON reservas(status, membro_id)",
+        _verificar_emails_unicos,
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_usuarios_email ON usuarios(email)",
+        # ISBN não é único: exemplares físicos do mesmo título compartilham o ISBN
+        "CREATE INDEX IF NOT EXISTS idx_itens_isbn ON itens(isbn)"
+    ]),
+    (2, 'Data da última devolução de cada item', [
+        lambda conn: _adicionar_coluna(conn, 'itens', 'data_ultima_devolucao', 'TIMESTAMP'),
+        '''UPDATE itens SET data_ultima_devolucao = (
+               SELECT MAX(e.data_devolucao) FROM emprestimos e
+                WHERE e.item_id = itens.id AND e.status != 'ativo'
+           )'''
+    ]),
+    (3, 'Última entrada aplicada do diário de escrita adiada', [
+        "CREATE TABLE IF NOT EXISTS diario_aplicado (sequencia INTEGER NOT NULL)",
+        "INSERT INTO diario_aplicado (sequencia) SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM diario_aplicado)"
+    ]),
+    (4, 'Log de eventos de circulação e instantâneos do estado', [
+        '''CREATE TABLE IF NOT EXISTS eventos (
+               sequencia INTEGER PRIMARY KEY,
+               tipo TEXT NOT NULL,
+               data TIMESTAMP NOT NULL,
+               dados TEXT NOT NULL
+           )''',
+        '''CREATE TABLE IF NOT EXISTS instantaneos (
+               sequencia INTEGER PRIMARY KEY,
+               data TIMESTAMP NOT NULL,
+               dados BLOB NOT NULL
+           )'''
+    ]),
+    (5, 'Status gravados como códigos inteiros', [
+        lambda conn: _status_inteiro(conn, 'itens'),
+        lambda conn: _status_inteiro(conn, 'emprestimos'),
+        lambda conn: _status_inteiro(conn, 'reservas')
+    ]),
+    (6, 'Índice de busca textual de itens (FTS5)', [
+        # Conteúdo externo: o índice guarda apenas os termos e lê o texto da tabela itens
+        '''CREATE VIRTUAL TABLE IF NOT EXISTS itens_busca USING fts5(
+               nome, autor, categoria, isbn,
+               content='itens', content_rowid='rowid',
+               tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+           )''',
+        '''CREATE TRIGGER IF NOT EXISTS itens_busca_inclusao AFTER INSERT ON itens BEGIN
+               INSERT INTO itens_busca (rowid, nome, autor, categoria, isbn)
+               VALUES (new.rowid, new.nome, new.autor, new.categoria, new.isbn);
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS itens_busca_exclusao AFTER DELETE ON itens BEGIN
+               INSERT INTO itens_busca (itens_busca, rowid, nome, autor, categoria, isbn)
+               VALUES ('delete', old.rowid, old.nome, old.autor, old.categoria, old.isbn);
+           END''',
+        # Mudanças de status não alteram o texto indexado
+        '''CREATE TRIGGER IF NOT EXISTS itens_busca_alteracao AFTER UPDATE OF nome, autor, categoria, isbn ON itens BEGIN
+               INSERT INTO itens_busca (itens_busca, rowid, nome, autor, categoria, isbn)
+               VALUES ('delete', old.rowid, old.nome, old.autor, old.categoria, old.isbn);
+               INSERT INTO itens_busca (rowid, nome, autor, categoria, isbn)
+               VALUES (new.rowid, new.nome, new.autor, new.categoria, new.isbn);
+           END''',
+        "INSERT INTO itens_busca (itens_busca) VALUES ('rebuild')"
+    ]),
+    (7, 'Progresso das importações em lote', [
+        # Gravado na mesma transação de cada lote: a retomada nunca repete linhas já gravadas
+        '''CREATE TABLE IF NOT EXISTS importacoes (
+               chave TEXT PRIMARY KEY,
+               linhas_processadas INTEGER NOT NULL
+           )'''
+    ]),
+    (8, 'Índice de busca de itens com chave estável', [
+        # O rowid de itens (id TEXT PRIMARY KEY) pode ser renumerado por um VACUUM:
+        # o índice passa a guardar o próprio id do item e uma cópia do texto
+        "DROP TRIGGER IF EXISTS itens_busca_inclusao",
+        "DROP TRIGGER IF EXISTS itens_busca_exclusao",
+        "DROP TRIGGER IF EXISTS itens_busca_alteracao",
+        "DROP TABLE IF EXISTS itens_busca",
+        '''CREATE VIRTUAL TABLE itens_busca USING fts5(
+               id UNINDEXED, nome, autor, categoria, isbn,
+               tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+           )''',
+        '''CREATE TRIGGER itens_busca_inclusao AFTER INSERT ON itens BEGIN
+               INSERT INTO itens_busca (id, nome, autor, categoria, isbn)
+               VALUES (new.id, new.nome, new.autor, new.categoria, new.isbn);
+           END''',
+        '''CREATE TRIGGER itens_busca_exclusao AFTER DELETE ON itens BEGIN
+               DELETE FROM itens_busca WHERE id = old.id;
+           END''',
+        # Mudanças de status não alteram o texto indexado
+        '''CREATE TRIGGER itens_busca_alteracao AFTER UPDATE OF id, nome, autor, categoria, isbn ON itens BEGIN
+               UPDATE itens_busca SET id = new.id, nome = new.nome, autor = new.autor, categoria = new.categoria, isbn = new.isbn
+                WHERE id = old.id;
+           END''',
+        reconstruir_indice_busca
+    ]),
+    (9, 'Linhas rejeitadas das importações em lote', [
+        # Gravadas com o progresso: a retomada relata também as rejeições anteriores
+        '''CREATE TABLE IF NOT EXISTS importacoes_rejeitados (
+               chave TEXT NOT NULL,
+               linha INTEGER NOT NULL,
+               erro TEXT NOT NULL
+           )''',
+        "CREATE INDEX IF NOT EXISTS idx_importacoes_rejeitados_chave ON importacoes_rejeitados(chave, linha)"
+    ])
+]
+
+def versao_esquema(conn=None):
+    """Versão do esquema registrada no banco"""
+    conn = conn or conexao()
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrar(conn=None):
+    """Aplica as migrações pendentes, cada uma em sua própria transação"""
+    conn = conn or conexao()
+    atual = versao_esquema(conn)
+
+    for versao, descricao, passos in MIGRACOES:
+        if versao <= atual:
+            continue
+        try:
+            # BEGIN explícito: sem ele o sqlite3 executaria o DDL fora da transação
+            conn.execute("BEGIN")
+            for passo in passos:
+                if callable(passo):
+                    passo(conn)
+                else:
+                    conn.execute(passo)
+            conn.execute(f"PRAGMA user_version = {versao}")
+            conn.commit()
+        except (sqlite3.Error, ValueError) as e:
+            conn.rollback()
+            raise RuntimeError(f'Falha na migração {versao} ({descricao}): {e}') from e
+        atual = versao
+
+    return atual
+
 def inicializar_banco():
-    conn = get_connection()
+    # Conexões abertas para um arquivo anterior não devem ser reaproveitadas
+    fechar_conexoes()
+
+    conn = conexao()
     cursor = conn.cursor()
     
     # Tabela Usuários
@@ -36,7 +307,7 @@ def inicializar_banco():
         isbn TEXT,
         categoria TEXT,
         paginas INTEGER,
-        status TEXT,
+        status INTEGER, -- código de StatusItem
         extra_info TEXT -- Para URL/Arquivo de ebook
     )
     ''')
@@ -51,7 +322,7 @@ def inicializar_banco():
         data_devolucao TIMESTAMP,
         data_quitacao TIMESTAMP,
         quantidade_renovacoes INTEGER,
-        status TEXT,
+        status INTEGER, -- código de StatusEmprestimo
         multa_valor REAL,
         multa_paga BOOLEAN,
         FOREIGN KEY(item_id) REFERENCES itens(id),
@@ -68,11 +339,14 @@ def inicializar_banco():
         data_reserva TIMESTAMP,
         data_cancelamento TIMESTAMP,
         data_finalizacao TIMESTAMP,
-        status TEXT,
+        status INTEGER, -- código de StatusReserva
         FOREIGN KEY(item_id) REFERENCES itens(id),
         FOREIGN KEY(membro_id) REFERENCES usuarios(id)
     )
     ''')
 
     conn.commit()
-    conn.close()
+    cursor.close()
+
+    # Atualizar bancos existentes para a versão atual do esquema
+    migrar(conn)
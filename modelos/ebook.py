@@ -1,8 +1,11 @@
 from modelos.item import Item
 
 class Ebook(Item):
+    __slots__ = ('_arquivo', '_url')
+
     def __init__(self, nome, imagem_url, imagem_arquivo, autor, num_paginas, isbn, categoria, arquivo, url):
         super().__init__(nome, imagem_url, imagem_arquivo, autor, num_paginas, isbn, categoria)
+        self.tipo = 'ebook'
         
         self._arquivo = arquivo
         self._url = url
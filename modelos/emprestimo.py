@@ -1,16 +1,22 @@
 from uuid import uuid4
 import datetime
 from modelos.multa import Multa
+from modelos.status import StatusEmprestimo
 from config import PRAZO_DEVOLUCAO, MULTA_POR_DIA, LIMITE_RENOVACOES
 
 class Emprestimo:
+    # Atributos fixos (sem __dict__ por instância): reduz a memória com históricos grandes;
+    # '__weakref__': o mapa de identidade do modo lazy acompanha os objetos ainda em uso
+    __slots__ = ('_id', '_data_emprestimo', '_data_devolucao', '_data_quitacao', '_quantidade_renovacoes',
+                 '_status', '_item', '_membro', '_multa', '__weakref__')
+
     def __init__(self, item, membro):
         self._id = uuid4()
         self._data_emprestimo = datetime.datetime.now()
         self._data_devolucao = None
         self._data_quitacao = None
         self._quantidade_renovacoes = 0
-        self._status = 'ativo' # 'ativo', 'multado', 'finalizado'
+        self._status = StatusEmprestimo.ATIVO
         self._item = item
         self._membro = membro
         self._multa = None
@@ -62,37 +68,42 @@ class Emprestimo:
 
         return cls(reserva.item, reserva.membro)
     
-    def devolver(self):
-        '''Atualiza o status do empréstimo quando um bibliotecário recebe uma devolução'''
+    def devolver(self, data=None):
+        '''Atualiza o status do empréstimo quando um bibliotecário recebe uma devolução
+
+        'data' permite registrar várias devoluções com o mesmo instante (devolução em lote)
+        '''
 
         # Se o empréstimo não estiver ativo
-        if self._status != 'ativo':
+        if self._status is not StatusEmprestimo.ATIVO:
             raise ValueError('Empréstimo já finalizado')
 
+        data = data or datetime.datetime.now()
+
         # Quanto tempo passou desde a data de devolução
-        tempo_diferenca = datetime.datetime.now() - self.data_prevista_devolucao
+        tempo_diferenca = data - self.data_prevista_devolucao
 
         # Se o tempo de diferença é positivo -> atraso (devolução depois do prazo)
         if tempo_diferenca > datetime.timedelta(0):
-            self._status = 'multado'
+            self._status = StatusEmprestimo.MULTADO
             # calcula multa: multa por dia * número de dias de atraso
             self._multa = Multa(MULTA_POR_DIA * tempo_diferenca.days, False)
             # registra data de devolução
-            self._data_devolucao = datetime.datetime.now()
+            self._data_devolucao = data
             return
         
         # registra data de devolução e finaliza
-        self._data_devolucao = datetime.datetime.now()
-        self._status = 'finalizado'
+        self._data_devolucao = data
+        self._status = StatusEmprestimo.FINALIZADO
 
     def quitar_divida(self):
         # Se não há registro de multas
-        if self._status != 'multado':
+        if self._status is not StatusEmprestimo.MULTADO:
             raise ValueError('Não há multas para quitar')
         
         # Atualização do estado da multa
         self._multa.paga = True
-        self._status = 'finalizado'
+        self._status = StatusEmprestimo.FINALIZADO
 
         # Registro da data de quitação
         self._data_quitacao = datetime.datetime.now()
@@ -101,7 +112,7 @@ class Emprestimo:
         '''Incrementa o número de renovações quando um membro ou um bibliotecário renova um empréstimo no sistema'''
 
         # Se o empréstimo não estiver ativo
-        if self._status != 'ativo':
+        if self._status is not StatusEmprestimo.ATIVO:
             raise ValueError('Não é possível renovar um empréstimo finalizado')
 
         # Se o limite de renovações já foi atingido
@@ -0,0 +1,257 @@
+from modelos import database
+from modelos.status import Status
+from config import SINCRONIZAR_DIARIO, TENTATIVAS_ESCRITA_ADIADA
+from collections import deque
+from contextlib import contextmanager
+import base64
+import datetime
+import json
+import os
+import sqlite3
+import threading
+
+
+def caminho_diario():
+    '''Diário de escrita adiada do banco atual (fica ao lado do arquivo do banco)'''
+    return database.DB_NAME + '-diario'
+
+
+def _serializar(valor):
+    # Status vão para o banco como código inteiro (o mesmo que o adaptador do sqlite3 grava)
+    if isinstance(valor, Status):
+        return valor.codigo
+    # Mesmo texto que o adaptador padrão do sqlite3 grava para datas
+    if isinstance(valor, datetime.datetime):
+        return str(valor)
+    # Conteúdo binário (ex.: instantâneos) vai para o JSON em base64
+    if isinstance(valor, bytes):
+        return {'base64': base64.b64encode(valor).decode('ascii')}
+    return valor
+
+
+def _desserializar(parametros):
+    return [base64.b64decode(v['base64']) if isinstance(v, dict) else v for v in parametros]
+
+
+def _aplicar(conn, comandos):
+    for sql, parametros, multiplo in comandos:
+        if multiplo:
+            conn.executemany(sql, [_desserializar(p) for p in parametros])
+        else:
+            conn.execute(sql, _desserializar(parametros))
+
+
+def _sequencia_aplicada(conn):
+    return conn.execute("SELECT sequencia FROM diario_aplicado").fetchone()[0]
+
+
+def caminho_descartadas(caminho):
+    '''Arquivo com as entradas do diário que o banco recusou (ao lado do diário)'''
+    return caminho + '-descartadas'
+
+
+def _descartar(caminho, sequencia, comandos, erro, ao_erro):
+    # A entrada é guardada à parte (para correção manual) e marcada como aplicada: a fila segue
+    with open(caminho_descartadas(caminho), 'a', encoding='utf-8') as arquivo:
+        arquivo.write(json.dumps({'sequencia': sequencia, 'erro': str(erro), 'comandos': comandos}) + '\n')
+    with database.transacao() as conn:
+        conn.execute("UPDATE diario_aplicado SET sequencia = ?", (sequencia,))
+    if ao_erro is not None:
+        ao_erro('escrita adiada', f'Operação {sequencia} recusada pelo banco e descartada ({erro})')
+
+
+def recuperar(caminho, ao_erro=None):
+    '''Grava no banco as entradas do diário que ainda não foram aplicadas (ex.: após uma queda).
+
+    Uma última linha incompleta corresponde a uma operação que não chegou a ser
+    confirmada e é descartada. Entradas que o banco recusa são movidas para o
+    arquivo de descartadas e informadas a 'ao_erro(origem, mensagem)'. Devolve
+    a quantidade de entradas aplicadas.
+    '''
+    if not os.path.exists(caminho):
+        return 0
+
+    entradas = []
+    with open(caminho, encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            try:
+                entradas.append(json.loads(linha))
+            except json.JSONDecodeError:
+                break
+
+    aplicada = _sequencia_aplicada(database.conexao())
+    pendentes = [(sequencia, comandos) for sequencia, comandos in entradas if sequencia > aplicada]
+    aplicadas = 0
+    # Uma transação por entrada: uma entrada recusada não impede a recuperação das demais
+    for sequencia, comandos in pendentes:
+        try:
+            with database.transacao() as conn:
+                _aplicar(conn, comandos)
+                conn.execute("UPDATE diario_aplicado SET sequencia = ?", (sequencia,))
+            aplicadas += 1
+        except sqlite3.Error as e:
+            _descartar(caminho, sequencia, comandos, e, ao_erro)
+
+    os.remove(caminho)
+    return aplicadas
+
+
+class ConexaoAdiada:
+    '''Registra as escritas de uma operação em vez de executá-las; leituras vão direto ao banco'''
+
+    def __init__(self):
+        self.comandos = []
+
+    def execute(self, sql, parametros=()):
+        if sql.lstrip().upper().startswith('SELECT'):
+            return database.conexao().execute(sql, parametros)
+        self.comandos.append((sql, [_serializar(v) for v in parametros], False))
+
+    def executemany(self, sql, sequencia_parametros):
+        lista = [[_serializar(v) for v in parametros] for parametros in sequencia_parametros]
+        if lista:
+            self.comandos.append((sql, lista, True))
+
+
+class EscritorAdiado(threading.Thread):
+    '''Thread que grava no banco, em transações agrupadas, as operações confirmadas no diário.
+
+    Cada operação é anexada ao diário (uma linha JSON com número de sequência)
+    antes de retornar ao chamador; a thread aplica as entradas a cada 'intervalo'
+    segundos, ou assim que 'tamanho_lote' entradas se acumulam, registrando a
+    última sequência aplicada na mesma transação. O diário é esvaziado sempre
+    que todas as entradas já estão no banco.
+
+    Se um lote falha, as entradas são gravadas uma a uma; a entrada que falhar
+    'tentativas' vezes seguidas é movida para o arquivo de descartadas e
+    informada a 'ao_erro(origem, mensagem)', para que a fila não fique parada.
+    '''
+
+    def __init__(self, caminho, intervalo, tamanho_lote, tentativas=TENTATIVAS_ESCRITA_ADIADA, ao_erro=None):
+        super().__init__(name='escritor-adiado', daemon=True)
+        self._caminho = caminho
+        self._intervalo = intervalo
+        self._tamanho_lote = tamanho_lote
+        self._tentativas = tentativas
+        self._ao_erro = ao_erro
+        self._fila = deque()
+        self._condicao = threading.Condition()
+        self._parar = False
+        self._urgente = False
+        self._falhas = 0
+        self.erro = None
+
+        recuperar(caminho, ao_erro)
+        self._sequencia = self._aplicada = _sequencia_aplicada(database.conexao())
+        self._diario = open(caminho, 'a', encoding='utf-8')
+
+    @contextmanager
+    def transacao(self):
+        '''Equivalente a database.transacao(): as escritas são confirmadas no diário ao final do bloco'''
+        conn = ConexaoAdiada()
+        yield conn
+        if conn.comandos:
+            self.registrar(conn.comandos)
+
+    def registrar(self, comandos):
+        with self._condicao:
+            if self._parar:
+                raise RuntimeError('Escrita adiada encerrada')
+            self._sequencia += 1
+            self._diario.write(json.dumps([self._sequencia, comandos]) + '\n')
+            self._diario.flush()
+            if SINCRONIZAR_DIARIO:
+                os.fsync(self._diario.fileno())
+            self._fila.append((self._sequencia, comandos))
+            if len(self._fila) >= self._tamanho_lote:
+                self._condicao.notify_all()
+
+    def descarregar(self):
+        '''Bloqueia até que todas as operações registradas estejam gravadas no banco'''
+        with self._condicao:
+            alvo = self._sequencia
+            self._urgente = True
+            self._condicao.notify_all()
+            # Entradas recusadas são descartadas após as tentativas: a espera sempre termina
+            self._condicao.wait_for(lambda: self._aplicada >= alvo or not self.is_alive())
+            if self._aplicada < alvo:
+                raise RuntimeError(f'Falha na escrita adiada: {self.erro}')
+
+    def parar(self):
+        '''Grava as operações pendentes e encerra a thread'''
+        with self._condicao:
+            self._parar = True
+            self._condicao.notify_all()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
+        self._diario.close()
+
+        # Diário vazio não precisa ser mantido; com pendências, será recuperado na próxima inicialização
+        if self._aplicada == self._sequencia and os.path.exists(self._caminho):
+            os.remove(self._caminho)
+
+    def run(self):
+        while True:
+            with self._condicao:
+                self._condicao.wait_for(
+                    lambda: self._parar or self._urgente or len(self._fila) >= self._tamanho_lote,
+                    timeout=self._intervalo
+                )
+                lote = [self._fila.popleft() for _ in range(min(len(self._fila), self._tamanho_lote))]
+                encerrar = self._parar and not self._fila
+
+            if lote:
+                gravadas = self._gravar(lote)
+                if gravadas < len(lote):
+                    with self._condicao:
+                        # O restante volta para o início da fila (continua no diário) e é tentado após o intervalo
+                        self._fila.extendleft(reversed(lote[gravadas:]))
+                        self._condicao.wait(self._intervalo)
+            if encerrar and (not lote or self.erro is not None):
+                return
+
+    def _gravar(self, lote):
+        '''Grava o lote no banco; devolve quantas entradas do início do lote foram concluídas'''
+        try:
+            with database.transacao() as conn:
+                for _, comandos in lote:
+                    _aplicar(conn, comandos)
+                conn.execute("UPDATE diario_aplicado SET sequencia = ?", (lote[-1][0],))
+        except Exception as e:
+            if len(lote) > 1:
+                # Uma a uma: apenas a entrada recusada pelo banco fica retida
+                for posicao, entrada in enumerate(lote):
+                    if not self._gravar([entrada]):
+                        return posicao
+                return len(lote)
+            return self._falhou(lote[0], e)
+
+        self._concluir(lote[-1][0])
+        return len(lote)
+
+    def _falhou(self, entrada, erro):
+        with self._condicao:
+            self._falhas += 1
+            self.erro = erro
+            if self._falhas < self._tentativas:
+                return 0
+        try:
+            _descartar(self._caminho, *entrada, erro, self._ao_erro)
+        except Exception as e:
+            # Sem como marcar a entrada como aplicada: ela é mantida e tentada de novo
+            self.erro = e
+            return 0
+        self._concluir(entrada[0])
+        return 1
+
+    def _concluir(self, sequencia):
+        with self._condicao:
+            self._aplicada = sequencia
+            self._falhas = 0
+            self.erro = None
+            if not self._fila:
+                self._urgente = False
+                # Tudo aplicado: o diário pode ser esvaziado
+                if self._aplicada == self._sequencia:
+                    self._diario.truncate(0)
+            self._condicao.notify_all()
@@ -0,0 +1,67 @@
+from modelos.usuario import Usuario
+from modelos.item import Item
+from modelos.emprestimo import Emprestimo
+from modelos.reserva import Reserva
+from modelos.registro import chave
+import datetime
+import json
+import zlib
+
+# Log de eventos: cada evento de domínio guarda o estado resultante (linha da tabela)
+# das entidades que alterou. Um instantâneo guarda as linhas de todas as tabelas;
+# a inicialização carrega o último instantâneo e reaplica apenas os eventos posteriores.
+
+
+def _texto(valor):
+    # Mesmo texto que o sqlite3 grava para datas (lido de volta por _data)
+    return str(valor) if isinstance(valor, datetime.datetime) else valor
+
+
+def linha_de(objeto):
+    '''(tabela, linha) com o estado persistido da entidade, no formato das tabelas do banco'''
+    if isinstance(objeto, Usuario):
+        return 'usuarios', {
+            'id': chave(objeto), 'nome': objeto.nome, 'email': objeto.email, 'senha': objeto.senha,
+            'cpf': objeto.cpf, 'tipo': getattr(objeto, 'tipo', None)
+        }
+    if isinstance(objeto, Item):
+        return 'itens', {
+            'id': chave(objeto), 'tipo': getattr(objeto, 'tipo', None), 'nome': objeto.nome, 'autor': objeto.autor,
+            'isbn': objeto.isbn, 'categoria': objeto.categoria, 'paginas': objeto.num_paginas,
+            'status': getattr(objeto, '_status', None),
+            'data_ultima_devolucao': _texto(objeto.data_ultima_devolucao)
+        }
+    if isinstance(objeto, Emprestimo):
+        return 'emprestimos', {
+            'id': chave(objeto), 'item_id': chave(objeto.item), 'membro_id': chave(objeto.membro),
+            'data_emprestimo': _texto(objeto.data_emprestimo), 'data_devolucao': _texto(objeto.data_devolucao),
+            'data_quitacao': _texto(objeto.data_quitacao), 'quantidade_renovacoes': objeto._quantidade_renovacoes,
+            'status': objeto.status,
+            'multa_valor': objeto.multa.valor if objeto.multa else None,
+            'multa_paga': objeto.multa.paga if objeto.multa else None
+        }
+    if isinstance(objeto, Reserva):
+        return 'reservas', {
+            'id': chave(objeto), 'item_id': chave(objeto.item), 'membro_id': chave(objeto.membro),
+            'data_reserva': _texto(objeto.data_reserva), 'data_cancelamento': _texto(objeto.data_cancelamento),
+            'data_finalizacao': _texto(objeto.data_finalizacao), 'status': objeto.status
+        }
+    raise TypeError(f'Entidade sem representação no log de eventos: {type(objeto).__name__}')
+
+
+def dados_evento(objetos, removidos=()):
+    '''Conteúdo JSON de um evento: linhas alteradas e (tabela, id) das entidades removidas'''
+    # Registros antigos em dicionário não têm representação no log
+    return json.dumps({
+        'linhas': [linha_de(objeto) for objeto in objetos if objeto is not None and not isinstance(objeto, dict)],
+        'removidos': [(linha_de(objeto)[0], chave(objeto)) for objeto in removidos]
+    })
+
+
+def comprimir_estado(estado):
+    '''Instantâneo compacto: {tabela: [linhas]} em JSON comprimido'''
+    return zlib.compress(json.dumps(estado, separators=(',', ':')).encode('utf-8'))
+
+
+def descomprimir_estado(dados):
+    return json.loads(zlib.decompress(dados))
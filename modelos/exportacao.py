@@ -0,0 +1,190 @@
+from modelos import database
+from modelos.status import STATUS_TABELAS
+from config import TAMANHO_LOTE_EXPORTACAO
+from array import array
+import csv
+import json
+import os
+import struct
+import zlib
+
+# Tabelas que podem ser exportadas para análise (usuarios fica de fora: contém senhas)
+TABELAS_EXPORTAVEIS = ('emprestimos', 'reservas', 'itens')
+
+# Formato colunar: cabeçalho com o esquema seguido de grupos de linhas; em cada grupo,
+# cada coluna é gravada como um bloco comprimido independente (leitura seletiva de colunas)
+ASSINATURA_COLUNAR = b'BIBC\x01'
+EXTENSAO_COLUNAR = '.bibc'
+_TAMANHO = struct.Struct('<I')
+
+
+def _validar_tabela(tabela):
+    if tabela not in TABELAS_EXPORTAVEIS:
+        raise ValueError(f"Tabela {tabela} não pode ser exportada")
+
+
+def _tipo_coluna(tipo_declarado):
+    tipo = (tipo_declarado or '').upper()
+    if 'INT' in tipo or 'BOOL' in tipo:
+        return 'inteiro'
+    if 'REAL' in tipo:
+        return 'real'
+    # TEXT e TIMESTAMP (datas ISO) são exportados como texto
+    return 'texto'
+
+
+def _percorrer(tabela, tamanho_lote):
+    '''Gera (colunas, lote de linhas) percorrendo a tabela com fetchmany.
+
+    O primeiro lote pode vir vazio (tabela sem linhas), para que o esquema seja
+    sempre conhecido. Usa uma conexão avulsa: a leitura enxerga um instantâneo
+    consistente e não interfere na conexão da thread (que pode estar em uma transação).
+    '''
+    _validar_tabela(tabela)
+    conn = database.get_connection()
+    try:
+        colunas = [(linha['name'], _tipo_coluna(linha['type'])) for linha in conn.execute(f"PRAGMA table_info({tabela})")]
+        # Status são gravados como códigos; a exportação os traz de volta como texto
+        selecao = ', '.join(f"{STATUS_TABELAS[tabela].sql_texto(nome)} AS {nome}" if nome == 'status' else nome for nome, _ in colunas)
+        colunas = [(nome, 'texto' if nome == 'status' else tipo) for nome, tipo in colunas]
+        cursor = conn.execute(f"SELECT {selecao} FROM {tabela} ORDER BY rowid")
+        primeiro = True
+        while True:
+            linhas = cursor.fetchmany(tamanho_lote)
+            if linhas or primeiro:
+                yield colunas, linhas
+            if not linhas:
+                break
+            primeiro = False
+    finally:
+        conn.close()
+
+
+def exportar_csv(tabela, destino, tamanho_lote=TAMANHO_LOTE_EXPORTACAO):
+    '''Exporta a tabela para CSV em streaming; devolve o número de linhas gravadas'''
+    total = 0
+    with open(destino, 'w', newline='', encoding='utf-8') as arquivo:
+        escritor = csv.writer(arquivo)
+        cabecalho = False
+        for colunas, linhas in _percorrer(tabela, tamanho_lote):
+            if not cabecalho:
+                escritor.writerow([nome for nome, _ in colunas])
+                cabecalho = True
+            escritor.writerows(tuple(linha) for linha in linhas)
+            total += len(linhas)
+    return total
+
+
+def _codificar_coluna(valores, tipo):
+    # Bloco: mapa de nulos (1 bit por linha) + valores não nulos
+    nulos = bytearray((len(valores) + 7) // 8)
+    for i, valor in enumerate(valores):
+        if valor is None:
+            nulos[i // 8] |= 1 << (i % 8)
+    presentes = [valor for valor in valores if valor is not None]
+
+    if tipo == 'inteiro':
+        dados = array('q', (int(valor) for valor in presentes)).tobytes()
+    elif tipo == 'real':
+        dados = array('d', (float(valor) for valor in presentes)).tobytes()
+    else:
+        textos = [str(valor).encode('utf-8') for valor in presentes]
+        dados = array('I', (len(texto) for texto in textos)).tobytes() + b''.join(textos)
+
+    return zlib.compress(bytes(nulos) + dados)
+
+
+def _decodificar_coluna(bloco, tipo, quantidade):
+    conteudo = zlib.decompress(bloco)
+    tamanho_nulos = (quantidade + 7) // 8
+    nulos, dados = conteudo[:tamanho_nulos], conteudo[tamanho_nulos:]
+    nulo = [bool(nulos[i // 8] & (1 << (i % 8))) for i in range(quantidade)]
+    presentes = quantidade - sum(nulo)
+
+    if tipo == 'inteiro':
+        valores = array('q')
+        valores.frombytes(dados)
+    elif tipo == 'real':
+        valores = array('d')
+        valores.frombytes(dados)
+    else:
+        tamanhos = array('I')
+        tamanhos.frombytes(dados[:presentes * tamanhos.itemsize])
+        textos = dados[presentes * tamanhos.itemsize:]
+        valores = []
+        inicio = 0
+        for tamanho in tamanhos:
+            valores.append(textos[inicio:inicio + tamanho].decode('utf-8'))
+            inicio += tamanho
+
+    valores = iter(valores)
+    return [None if vazio else next(valores) for vazio in nulo]
+
+
+def exportar_colunar(tabela, destino, tamanho_lote=TAMANHO_LOTE_EXPORTACAO):
+    '''Exporta a tabela para o formato colunar em streaming; devolve o número de linhas gravadas'''
+    total = 0
+    with open(destino, 'wb') as arquivo:
+        arquivo.write(ASSINATURA_COLUNAR)
+        cabecalho = False
+        for colunas, linhas in _percorrer(tabela, tamanho_lote):
+            if not cabecalho:
+                esquema = json.dumps({'tabela': tabela, 'colunas': colunas}).encode('utf-8')
+                arquivo.write(_TAMANHO.pack(len(esquema)) + esquema)
+                cabecalho = True
+            if not linhas:
+                continue
+
+            # Um grupo de linhas por lote lido do banco
+            arquivo.write(_TAMANHO.pack(len(linhas)))
+            for posicao, (_, tipo) in enumerate(colunas):
+                bloco = _codificar_coluna([linha[posicao] for linha in linhas], tipo)
+                arquivo.write(_TAMANHO.pack(len(bloco)) + bloco)
+            total += len(linhas)
+
+        # Grupo vazio marca o fim do arquivo
+        arquivo.write(_TAMANHO.pack(0))
+    return total
+
+
+def _ler_tamanho(arquivo):
+    return _TAMANHO.unpack(arquivo.read(_TAMANHO.size))[0]
+
+
+def ler_colunar(caminho, colunas=None):
+    '''Gera um dicionário {coluna: valores} por grupo de linhas de um arquivo colunar.
+
+    Com 'colunas', apenas essas colunas são descomprimidas; os demais blocos são saltados.
+    '''
+    with open(caminho, 'rb') as arquivo:
+        if arquivo.read(len(ASSINATURA_COLUNAR)) != ASSINATURA_COLUNAR:
+            raise ValueError(f"{caminho} não é um arquivo colunar da biblioteca")
+        esquema = json.loads(arquivo.read(_ler_tamanho(arquivo)))
+
+        while True:
+            quantidade = _ler_tamanho(arquivo)
+            if quantidade == 0:
+                break
+            grupo = {}
+            for nome, tipo in esquema['colunas']:
+                tamanho = _ler_tamanho(arquivo)
+                if colunas is not None and nome not in colunas:
+                    arquivo.seek(tamanho, os.SEEK_CUR)
+                    continue
+                grupo[nome] = _decodificar_coluna(arquivo.read(tamanho), tipo, quantidade)
+            yield grupo
+
+
+EXPORTADORES = {
+    'csv': exportar_csv,
+    'colunar': exportar_colunar
+}
+
+
+def exportar(tabela, destino, formato=None, tamanho_lote=TAMANHO_LOTE_EXPORTACAO):
+    '''Exporta a tabela no formato indicado (ou deduzido pela extensão do destino)'''
+    if formato is None:
+        formato = 'colunar' if destino.endswith(EXTENSAO_COLUNAR) else 'csv'
+    if formato not in EXPORTADORES:
+        raise ValueError(f"Formato de exportação não suportado: {formato}")
+    return EXPORTADORES[formato](tabela, destino, tamanho_lote)
@@ -0,0 +1,77 @@
+from collections import Counter
+
+
+class ContadorFacetas:
+    '''Contagens de uma coleção por faceta (ex.: categoria, status), mantidas a cada alteração.
+
+    As facetas são declaradas como {nome: funcao_valor}; cada função recebe a
+    entidade e devolve o valor contado (ou None para ignorar; nas facetas de
+    'contar_ausentes', None é contado como um valor). Acompanha um Registro
+    como observador e é reclassificado com 'atualizar' após mudanças de
+    estado, de modo que ler uma contagem não percorre a coleção.
+    '''
+
+    def __init__(self, facetas, contar_ausentes=()):
+        self._funcoes = dict(facetas)
+        self._ausentes = frozenset(contar_ausentes)
+        self._contagens = {nome: Counter() for nome in self._funcoes}
+        # Valores contados de cada entidade: a remoção desconta exatamente o que foi somado
+        self._valores = {}
+
+    def __contains__(self, faceta):
+        return faceta in self._contagens
+
+    def _contado(self, nome, valor):
+        return valor is not None or nome in self._ausentes
+
+    def adicionar(self, k, entidade):
+        if k in self._valores:
+            self.remover(k, entidade)
+        valores = tuple(funcao(entidade) for funcao in self._funcoes.values())
+        self._valores[k] = valores
+        for nome, valor in zip(self._funcoes, valores):
+            if self._contado(nome, valor):
+                self._contagens[nome][valor] += 1
+
+    def remover(self, k, entidade):
+        valores = self._valores.pop(k, None)
+        if valores is None:
+            return
+        for nome, valor in zip(self._funcoes, valores):
+            if self._contado(nome, valor):
+                contagem = self._contagens[nome]
+                contagem[valor] -= 1
+                if not contagem[valor]:
+                    del contagem[valor]
+
+    def atualizar(self, k, entidade):
+        '''Reclassifica uma entidade já contada (entidades fora da coleção são ignoradas)'''
+        anteriores = self._valores.get(k)
+        if anteriores is None:
+            return
+        valores = tuple(funcao(entidade) for funcao in self._funcoes.values())
+        if valores == anteriores:
+            return
+        self._valores[k] = valores
+        for nome, anterior, valor in zip(self._funcoes, anteriores, valores):
+            if anterior == valor:
+                continue
+            contagem = self._contagens[nome]
+            if self._contado(nome, anterior):
+                contagem[anterior] -= 1
+                if not contagem[anterior]:
+                    del contagem[anterior]
+            if self._contado(nome, valor):
+                contagem[valor] += 1
+
+    def limpar(self):
+        self._valores.clear()
+        for contagem in self._contagens.values():
+            contagem.clear()
+
+    def contagens(self, faceta):
+        '''{valor: quantidade} da faceta'''
+        return dict(self._contagens[faceta])
+
+    def quantidade(self, faceta, valor):
+        return self._contagens[faceta].get(valor, 0)
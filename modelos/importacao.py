@@ -0,0 +1,177 @@
+from modelos.livro import Livro
+from modelos.ebook import Ebook
+from config import TAMANHO_LOTE_IMPORTACAO
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import csv
+import json
+import os
+import time
+
+# Colunas aceitas nos arquivos de importação (mesmos nomes da tabela 'itens')
+COLUNAS_IMPORTACAO = ('tipo', 'nome', 'autor', 'paginas', 'isbn', 'categoria')
+
+
+def ler_csv(caminho):
+    '''Gera (número da linha, registro) de um CSV com cabeçalho, sem carregar o arquivo inteiro.
+
+    O número é o da linha do arquivo em que o registro termina (campos entre
+    aspas podem ocupar várias linhas).
+    '''
+    with open(caminho, newline='', encoding='utf-8') as arquivo:
+        leitor = csv.DictReader(arquivo)
+        for registro in leitor:
+            yield leitor.line_num, registro
+
+
+def ler_jsonl(caminho):
+    '''Gera (número da linha, registro) de um arquivo JSON Lines (um objeto por linha)'''
+    with open(caminho, encoding='utf-8') as arquivo:
+        for numero, linha in enumerate(arquivo, start=1):
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                yield numero, json.loads(linha)
+            except json.JSONDecodeError as e:
+                # Linha malformada vira rejeição, não interrompe a importação
+                yield numero, ValueError(f"JSON inválido: {e.msg}")
+
+
+LEITORES = {
+    'csv': ler_csv,
+    'jsonl': ler_jsonl
+}
+
+
+def formato_do_arquivo(caminho):
+    extensao = os.path.splitext(caminho)[1].lower().lstrip('.')
+    formato = 'jsonl' if extensao in ('jsonl', 'ndjson') else extensao
+    if formato not in LEITORES:
+        raise ValueError(f"Formato de importação não suportado: {extensao or caminho}")
+    return formato
+
+
+def item_de_registro(registro):
+    '''Constrói um Livro/Ebook a partir de um registro importado, aplicando as validações dos setters de Item'''
+    if isinstance(registro, Exception):
+        raise registro
+
+    tipo = (registro.get('tipo') or 'livro').strip().lower()
+    if tipo not in ('livro', 'ebook'):
+        raise ValueError(f"Tipo de item inválido: {tipo}")
+
+    # Em CSV tudo chega como texto: converte páginas e trata campos vazios como ausentes
+    paginas = registro.get('paginas')
+    if isinstance(paginas, str):
+        paginas = int(paginas) if paginas.strip().isdigit() else paginas
+    categoria = registro.get('categoria') or None
+
+    if tipo == 'livro':
+        return Livro(registro.get('nome'), None, None, registro.get('autor'), paginas, registro.get('isbn'), categoria)
+    return Ebook(registro.get('nome'), None, None, registro.get('autor'), paginas, registro.get('isbn'), categoria, None, None)
+
+
+def validar_lote(lote):
+    '''Valida um lote de (número, registro); devolve (itens válidos, [(número, erro)]).
+
+    Função de módulo para poder ser executada em outro processo.
+    '''
+    itens = []
+    rejeitados = []
+    for numero, registro in lote:
+        try:
+            itens.append(item_de_registro(registro))
+        except (ValueError, TypeError, AttributeError) as e:
+            rejeitados.append((numero, str(e)))
+    return itens, rejeitados
+
+
+def _lotes(registros, tamanho):
+    lote = []
+    for registro in registros:
+        lote.append(registro)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+class RelatorioImportacao:
+    '''Resumo de uma importação: contagens, linhas rejeitadas e vazão'''
+
+    def __init__(self, linhas_retomadas=0, rejeitados=()):
+        self.linhas_retomadas = linhas_retomadas
+        self.linhas_processadas = linhas_retomadas
+        self.importados = 0
+        # Inclui as linhas rejeitadas antes de uma retomada
+        self.rejeitados = list(rejeitados)
+        self.segundos = 0.0
+
+    @property
+    def itens_por_segundo(self):
+        return self.importados / self.segundos if self.segundos else 0.0
+
+    def __str__(self):
+        return (
+            f"Importados: {self.importados} | Rejeitados: {len(self.rejeitados)} | "
+            f"Tempo: {self.segundos:.2f}s | Vazão: {self.itens_por_segundo:.0f} itens/s"
+        )
+
+
+def _validar_em_paralelo(lotes, processos):
+    # Janela limitada de lotes em validação: mantém a leitura em streaming e a ordem dos lotes
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        pendentes = deque()
+        for lote in lotes:
+            pendentes.append((lote, executor.submit(validar_lote, lote)))
+            if len(pendentes) >= processos * 2:
+                lote, futuro = pendentes.popleft()
+                yield lote, futuro.result()
+        while pendentes:
+            lote, futuro = pendentes.popleft()
+            yield lote, futuro.result()
+
+
+def importar_itens(biblioteca, caminho, formato=None, tamanho_lote=TAMANHO_LOTE_IMPORTACAO,
+                   processos=None, checkpoint=None, ao_concluir_lote=None):
+    '''Importa Livros/Ebooks de um arquivo CSV ou JSON Lines em lotes.
+
+    Cada lote é validado (em 'processos' processos, se informado) e gravado com
+    executemany em uma transação própria. Com 'checkpoint' (a chave que identifica
+    a importação), o número de linhas já gravadas e as linhas rejeitadas são
+    salvos no banco na mesma transação de cada lote e uma nova execução retoma
+    dali; o progresso é descartado ao final de uma importação completa.
+    '''
+    if tamanho_lote <= 0:
+        raise ValueError("Tamanho do lote deve ser um valor inteiro positivo")
+
+    leitor = LEITORES[formato or formato_do_arquivo(caminho)]
+    retomar_de, rejeitados_anteriores = biblioteca.progresso_importacao(checkpoint) if checkpoint else (0, [])
+    relatorio = RelatorioImportacao(retomar_de, rejeitados_anteriores)
+
+    registros = ((numero, registro) for numero, registro in leitor(caminho) if numero > retomar_de)
+    lotes = _lotes(registros, tamanho_lote)
+    if processos and processos > 1:
+        validados = _validar_em_paralelo(lotes, processos)
+    else:
+        validados = ((lote, validar_lote(lote)) for lote in lotes)
+
+    inicio = time.perf_counter()
+    for lote, (itens, rejeitados) in validados:
+        linhas_processadas = lote[-1][0]
+        if itens or checkpoint:
+            biblioteca.adicionar_itens_em_lote(itens, (checkpoint, linhas_processadas, rejeitados) if checkpoint else None)
+        relatorio.importados += len(itens)
+        relatorio.rejeitados.extend(rejeitados)
+        relatorio.linhas_processadas = linhas_processadas
+        relatorio.segundos = time.perf_counter() - inicio
+
+        if ao_concluir_lote:
+            ao_concluir_lote(relatorio)
+
+    relatorio.segundos = time.perf_counter() - inicio
+    if checkpoint:
+        biblioteca.concluir_importacao(checkpoint)
+    return relatorio
@@ -0,0 +1,156 @@
+from bisect import bisect_left, insort
+import functools
+import re
+import unicodedata
+
+# Com poucos candidatos (palavras já completas), filtrá-los é mais barato que percorrer o vocabulário
+LIMITE_FILTRO_CANDIDATOS = 256
+# Até esta quantidade de termos novos, o vocabulário é atualizado com insort; acima, reordenado de uma vez
+LIMITE_INSERCAO_ORDENADA = 64
+
+
+def normalizar(texto):
+    '''Texto sem acentos e em minúsculas ('Anéis' -> 'aneis')'''
+    texto = texto.casefold()
+    if texto.isascii():
+        return texto
+    # Acentos viram caracteres combinantes na decomposição NFKD e são descartados
+    return ''.join(c for c in unicodedata.normalize('NFKD', texto) if not unicodedata.combining(c))
+
+
+# Palavras se repetem muito entre títulos, autores e categorias
+_normalizar_palavra = functools.lru_cache(maxsize=65536)(normalizar)
+
+
+def _texto(entidade, atributo):
+    # Suporta objetos do modelo e dicionários antigos
+    return entidade.get(atributo) if isinstance(entidade, dict) else getattr(entidade, atributo, None)
+
+
+def termos(texto):
+    if not texto:
+        return []
+    if not texto.isascii():
+        # Acentos decompostos (letra + combinante) são recompostos para não quebrar as palavras
+        texto = unicodedata.normalize('NFC', texto)
+    return [_normalizar_palavra(palavra) for palavra in re.findall(r'\w+', texto)]
+
+
+# Autores e categorias se repetem entre os itens: os termos de cada valor são reaproveitados
+_termos_campo = functools.lru_cache(maxsize=65536)(lambda texto: tuple(termos(texto)))
+
+
+class IndiceTextual:
+    '''Índice invertido em memória sobre título, autor e categoria dos itens.
+
+    Cada termo normalizado aponta para as entidades que o contêm; o vocabulário
+    é mantido ordenado para buscas por prefixo (faixa contígua via bisect).
+    É atualizado pelo Registro de itens a cada inclusão e remoção; termos novos
+    entram no vocabulário na consulta seguinte (a carga inicial ordena uma só vez).
+    '''
+
+    def __init__(self, atributos=('nome', 'autor', 'categoria')):
+        self._atributos = atributos
+        self._postings = {}
+        self._vocabulario = []
+        self._novos = set()
+        self._termos = {}
+
+    def __len__(self):
+        return len(self._termos)
+
+    def adicionar(self, k, entidade):
+        if k in self._termos:
+            self.remover(k, entidade)
+        # Termos guardados por entidade: a remoção desfaz exatamente o que foi indexado
+        unicos = tuple(dict.fromkeys(t for atributo in self._atributos for t in _termos_campo(_texto(entidade, atributo))))
+        self._termos[k] = unicos
+        for termo in unicos:
+            grupo = self._postings.get(termo)
+            if grupo is None:
+                grupo = self._postings[termo] = {}
+                self._novos.add(termo)
+            grupo[k] = entidade
+
+    def remover(self, k, entidade):
+        for termo in self._termos.pop(k, ()):
+            grupo = self._postings[termo]
+            del grupo[k]
+            if not grupo:
+                del self._postings[termo]
+                if termo in self._novos:
+                    self._novos.discard(termo)
+                else:
+                    del self._vocabulario[bisect_left(self._vocabulario, termo)]
+
+    def limpar(self):
+        self._postings.clear()
+        self._vocabulario.clear()
+        self._novos.clear()
+        self._termos.clear()
+
+    def _ordenado(self):
+        if self._novos:
+            if len(self._novos) <= LIMITE_INSERCAO_ORDENADA:
+                for termo in self._novos:
+                    insort(self._vocabulario, termo)
+            else:
+                self._vocabulario.extend(self._novos)
+                self._vocabulario.sort()
+            self._novos.clear()
+        return self._vocabulario
+
+    def completar(self, prefixo, limite=10):
+        '''Termos do vocabulário que começam com o prefixo, em ordem alfabética'''
+        prefixo = normalizar(prefixo)
+        vocabulario = self._ordenado()
+        inicio = bisect_left(vocabulario, prefixo)
+        resultado = []
+        for termo in vocabulario[inicio:inicio + limite]:
+            if not termo.startswith(prefixo):
+                break
+            resultado.append(termo)
+        return resultado
+
+    def sugerir(self, texto, limite=10, filtro=None):
+        '''Até 'limite' entidades que contêm todas as palavras do texto (a última como prefixo).
+
+        As sugestões seguem a ordem alfabética do termo que completa o prefixo,
+        de modo que a palavra exata vem antes das mais longas. 'filtro', se
+        informado, recebe a entidade e descarta as que devolverem falso.
+        '''
+        palavras = termos(texto)
+        if not palavras or limite <= 0:
+            return []
+        *completas, prefixo = palavras
+
+        # Palavras completas: cada sugestão precisa constar em todos os grupos (do mais raro ao mais comum)
+        grupos = sorted((self._postings.get(termo, {}) for termo in completas), key=len)
+        if grupos and not grupos[0]:
+            return []
+
+        if grupos and len(grupos[0]) <= LIMITE_FILTRO_CANDIDATOS:
+            # Poucos candidatos: filtra o grupo mais raro em vez de percorrer o vocabulário
+            encontrados = sorted(
+                (min(t for t in self._termos[k] if t.startswith(prefixo)), k)
+                for k, entidade in grupos[0].items()
+                if all(k in grupo for grupo in grupos[1:]) and any(t.startswith(prefixo) for t in self._termos[k])
+                and (filtro is None or filtro(entidade))
+            )
+            return [grupos[0][k] for _, k in encontrados[:limite]]
+
+        # Percorre a faixa do vocabulário com o prefixo até reunir 'limite' entidades
+        resultado = {}
+        vocabulario = self._ordenado()
+        posicao = bisect_left(vocabulario, prefixo)
+        while posicao < len(vocabulario) and len(resultado) < limite:
+            termo = vocabulario[posicao]
+            if not termo.startswith(prefixo):
+                break
+            for k, entidade in self._postings[termo].items():
+                if k not in resultado and all(k in grupo for grupo in grupos) and (filtro is None or filtro(entidade)):
+                    resultado[k] = entidade
+                    if len(resultado) == limite:
+                        break
+            posicao += 1
+        return list(resultado.values())
@@ -4,12 +4,19 @@ import datetime
 import re
 
 class Item(ABC):
+    # 'tipo' ('livro' ou 'ebook') e '_status' são mantidos pela Biblioteca
+    __slots__ = ('_id', '_imagem_url', '_imagem_arquivo', '_emprestavel', '_data_cadastro', '_data_ultima_devolucao',
+                 '_nome', '_autor', '_num_paginas', '_isbn', '_categoria', '_status', 'tipo')
+
     def __init__(self, nome, imagem_url, imagem_arquivo, autor, num_paginas, isbn, categoria):
         self._id = uuid4()
+        self._status = None
+        self.tipo = None
         self._imagem_url = imagem_url
         self._imagem_arquivo = imagem_arquivo
         self._emprestavel = True
         self._data_cadastro = datetime.datetime.now()
+        self._data_ultima_devolucao = None
         # Usar os setters para aplicar validações
         self.nome = nome
         self.autor = autor
@@ -103,6 +110,10 @@ class Item(ABC):
     def data_cadastro(self):
         return self._data_cadastro
 
+    @property
+    def data_ultima_devolucao(self):
+        return self._data_ultima_devolucao
+
     @abstractmethod
     def __str__(self):
         pass
@@ -1,6 +1,12 @@
 from modelos.item import Item
 
 class Livro(Item):
+     __slots__ = ()
+
+     def __init__(self, nome, imagem_url, imagem_arquivo, autor, num_paginas, isbn, categoria):
+        super().__init__(nome, imagem_url, imagem_arquivo, autor, num_paginas, isbn, categoria)
+        self.tipo = 'livro'
+
      def __str__(self):
         return (
             f"--- Dados do Livro ---\n"
@@ -0,0 +1,72 @@
+from collections import OrderedDict
+import weakref
+
+
+class MapaIdentidade:
+    '''Mapa de identidade com descarte LRU.
+
+    Garante que cada registro do banco seja representado por um único objeto
+    enquanto estiver em uso e limita quantos objetos ficam em memória: ao
+    ultrapassar a capacidade, o objeto menos usado recentemente deixa de ser
+    mantido pelo mapa. Enquanto outra parte do programa ainda o referencia,
+    ele continua sendo devolvido (referência fraca); só depois de liberado é
+    hidratado novamente do banco se for pedido outra vez.
+    '''
+
+    def __init__(self, capacidade):
+        if capacidade <= 0:
+            raise ValueError('Capacidade do mapa de identidade deve ser positiva')
+        self._capacidade = capacidade
+        self._objetos = OrderedDict()
+        # Objetos descartados pelo LRU mas ainda em uso por quem os obteve
+        self._vivos = weakref.WeakValueDictionary()
+
+    def __len__(self):
+        return len(self._objetos)
+
+    def __contains__(self, chave):
+        return chave in self._objetos or chave in self._vivos
+
+    @property
+    def capacidade(self):
+        return self._capacidade
+
+    def obter(self, chave, padrao=None):
+        if chave in self._objetos:
+            self._objetos.move_to_end(chave)
+            return self._objetos[chave]
+        objeto = self._vivos.get(chave)
+        if objeto is None:
+            return padrao
+        # Ainda em uso: volta a ser mantido pelo mapa como o mais recente
+        self.guardar(chave, objeto)
+        return objeto
+
+    def guardar(self, chave, objeto):
+        self._objetos[chave] = objeto
+        self._objetos.move_to_end(chave)
+        try:
+            self._vivos[chave] = objeto
+        except TypeError:
+            # Objetos sem suporte a referência fraca (ex.: dicionários) valem apenas enquanto no LRU
+            pass
+        while len(self._objetos) > self._capacidade:
+            self._objetos.popitem(last=False)
+
+    def obter_ou_hidratar(self, chave, hidratar):
+        '''Objeto já mapeado para a chave ou, se ausente, o resultado de hidratar()'''
+        objeto = self.obter(chave)
+        if objeto is not None:
+            return objeto
+        objeto = hidratar()
+        if objeto is not None:
+            self.guardar(chave, objeto)
+        return objeto
+
+    def descartar(self, chave):
+        self._objetos.pop(chave, None)
+        self._vivos.pop(chave, None)
+
+    def limpar(self):
+        self._objetos.clear()
+        self._vivos.clear()
@@ -1,4 +1,6 @@
 class Multa:
+    __slots__ = ('_valor', '_paga')
+
     def __init__(self, valor, paga):
         self._valor = valor
         self._paga = paga
@@ -0,0 +1,160 @@
+def chave(obj):
+    '''Chave normalizada de uma entidade: aceita UUIDs, strings, objetos ou dicionários'''
+
+    if isinstance(obj, dict):
+        return str(obj.get('id'))
+
+    # Objetos do modelo expõem 'id'; valores soltos (UUID ou str) são a própria chave
+    return str(getattr(obj, 'id', obj))
+
+
+def _valor(obj, atributo):
+    # Suporta objetos do modelo e dicionários antigos
+    if isinstance(obj, dict):
+        return obj.get(atributo)
+    return getattr(obj, atributo, None)
+
+
+class Registro:
+    '''Coleção de entidades indexada por id, com índices secundários opcionais.
+
+    Mantém a ordem de inserção e o comportamento de lista usado pela interface
+    (iteração, len, índice posicional), mas a busca por id custa O(1). A
+    iteração percorre a coleção sem copiá-la: alterá-la durante a iteração
+    levanta RuntimeError (quem precisa alterar enquanto percorre usa copia()).
+
+    Os índices secundários são declarados como {nome: funcao_chave}; cada
+    função recebe a entidade e devolve o valor indexado (ou None para ignorar).
+    Estruturas externas (ex.: índice textual) podem acompanhar a coleção como
+    observadores, com os métodos adicionar(chave, entidade), remover(chave, entidade) e limpar().
+    '''
+
+    def __init__(self, entidades=(), indices=None, observadores=()):
+        self._entidades = {}
+        self._funcoes_indice = dict(indices or {})
+        self._indices = {nome: {} for nome in self._funcoes_indice}
+        self._observadores = list(observadores)
+        # Sequência posicional (fatias da interface) materializada sob demanda e descartada a cada alteração
+        self._sequencia = None
+        # Incrementada a cada alteração: detecta alterações durante uma iteração
+        self._versao = 0
+        for entidade in entidades:
+            self.adicionar(entidade)
+
+    def __iter__(self):
+        versao = self._versao
+        for entidade in self._entidades.values():
+            if self._versao != versao:
+                raise RuntimeError('Registro alterado durante a iteração')
+            yield entidade
+
+    def copia(self):
+        '''Lista das entidades no momento da chamada (pode ser percorrida enquanto a coleção é alterada)'''
+        return list(self._entidades.values())
+
+    def __len__(self):
+        return len(self._entidades)
+
+    def __bool__(self):
+        return bool(self._entidades)
+
+    def __contains__(self, entidade):
+        return chave(entidade) in self._entidades
+
+    def __getitem__(self, posicao):
+        valores = self._entidades.values()
+
+        if isinstance(posicao, slice):
+            return list(self._em_sequencia()[posicao])
+
+        # Acesso às extremidades sem materializar a coleção
+        if posicao == 0 and self._entidades:
+            return next(iter(valores))
+        if posicao == -1 and self._entidades:
+            return next(reversed(valores))
+
+        return self._em_sequencia()[posicao]
+
+    def _em_sequencia(self):
+        # Páginas consecutivas (ex.: rolagem da grade do acervo) reaproveitam a mesma sequência
+        if self._sequencia is None:
+            self._sequencia = tuple(self._entidades.values())
+        return self._sequencia
+
+    def __repr__(self):
+        return f'Registro({list(self._entidades.values())!r})'
+
+    def obter(self, id, padrao=None):
+        '''Entidade com o id informado (UUID ou string)'''
+        return self._entidades.get(chave(id), padrao)
+
+    def adicionar(self, entidade):
+        k = chave(entidade)
+
+        # Reinserir a mesma chave substitui a entidade anterior nos índices
+        if k in self._entidades:
+            self._desindexar(k, self._entidades[k])
+
+        self._entidades[k] = entidade
+        self._sequencia = None
+        self._versao += 1
+        for nome, funcao in self._funcoes_indice.items():
+            valor = funcao(entidade)
+            if valor is not None:
+                self._indices[nome].setdefault(valor, {})[k] = entidade
+        for observador in self._observadores:
+            observador.adicionar(k, entidade)
+
+    def remover(self, entidade):
+        k = chave(entidade)
+        if k not in self._entidades:
+            raise ValueError(f'Entidade com id {k} não existe')
+        self._desindexar(k, self._entidades.pop(k))
+
+    def buscar(self, indice, valor):
+        '''Lista das entidades cujo índice secundário tem o valor informado'''
+        return list(self._indices[indice].get(valor, {}).values())
+
+    def primeiro(self, indice, valor):
+        '''Primeira entidade do índice secundário com o valor informado, ou None'''
+        grupo = self._indices[indice].get(valor)
+        return next(iter(grupo.values())) if grupo else None
+
+    def limpar(self):
+        self._entidades.clear()
+        self._sequencia = None
+        self._versao += 1
+        for indice in self._indices.values():
+            indice.clear()
+        for observador in self._observadores:
+            observador.limpar()
+
+    # Compatibilidade com a API de lista
+    append = adicionar
+    remove = remover
+
+    def _desindexar(self, k, entidade):
+        self._sequencia = None
+        self._versao += 1
+        for nome, funcao in self._funcoes_indice.items():
+            valor = funcao(entidade)
+            grupo = self._indices[nome].get(valor)
+            if grupo is not None:
+                grupo.pop(k, None)
+                if not grupo:
+                    del self._indices[nome][valor]
+        for observador in self._observadores:
+            observador.remover(k, entidade)
+
+
+def indice_atributo(atributo):
+    '''Função de índice que lê um atributo (ou chave de dicionário) da entidade'''
+    return lambda entidade: _valor(entidade, atributo)
+
+
+def indice_referencia(atributo):
+    '''Função de índice que lê a chave da entidade referenciada (ex.: item, membro)'''
+    def funcao(entidade):
+        referencia = _valor(entidade, atributo)
+        return chave(referencia) if referencia is not None else None
+    return funcao
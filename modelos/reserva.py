@@ -1,13 +1,18 @@
 from uuid import uuid4
+from modelos.status import StatusReserva
 import datetime
 
 class Reserva:
+    # Atributos fixos (sem __dict__ por instância): reduz a memória com históricos grandes
+    # '__weakref__': o mapa de identidade do modo lazy acompanha os objetos ainda em uso
+    __slots__ = ('_id', '_data_reserva', '_data_cancelamento', '_data_finalizacao', '_status', '_item', '_membro', '__weakref__')
+
     def __init__(self, item, membro):
         self._id = uuid4()
         self._data_reserva = datetime.datetime.now()
         self._data_cancelamento = None
         self._data_finalizacao = None
-        self._status = 'aguardando' # 'aguardando', 'cancelada', 'expirada' ou 'finalizada'
+        self._status = StatusReserva.AGUARDANDO
         self._item = item
         self._membro = membro
 
@@ -41,9 +46,13 @@ class Reserva:
 
     def cancelar(self,):
         self._data_cancelamento = datetime.datetime.now()
-        self._status = 'cancelada'
+        self._status = StatusReserva.CANCELADA
 
     def marcar_como_finalizada(self):
         self._data_finalizacao = datetime.datetime.now()
-        self._status = 'finalizada'
-    
\ No newline at end of file
+        self._status = StatusReserva.FINALIZADA
+    
+
+    def expirar(self, data=None):
+        self._data_cancelamento = data or datetime.datetime.now()
+        self._status = StatusReserva.EXPIRADA
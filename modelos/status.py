@@ -0,0 +1,72 @@
+from enum import Enum
+import sqlite3
+
+# Status de itens, empréstimos e reservas como enumerações: cada valor é uma instância
+# única (comparações por identidade), continua igual ao texto correspondente
+# ('ativo' == StatusEmprestimo.ATIVO) e é gravado no banco como um inteiro compacto.
+
+
+class Status(str, Enum):
+    def __new__(cls, valor, codigo):
+        membro = str.__new__(cls, valor)
+        membro._value_ = valor
+        membro.codigo = codigo
+        return membro
+
+    def __str__(self):
+        return self.value
+
+    def __format__(self, especificacao):
+        return format(self.value, especificacao)
+
+    @classmethod
+    def de_banco(cls, valor):
+        '''Converte o valor lido (código inteiro, texto legado ou o próprio status); None se ausente'''
+        if valor is None or type(valor) is cls:
+            return valor
+        if isinstance(valor, int):
+            return cls._por_codigo[valor]
+        return cls(valor)
+
+    @classmethod
+    def sql_codigo(cls, coluna):
+        '''Expressão SQL que converte o texto da coluna no código (textos desconhecidos são mantidos)'''
+        casos = ' '.join(f"WHEN '{membro.value}' THEN {membro.codigo}" for membro in cls)
+        return f"CASE {coluna} {casos} ELSE {coluna} END"
+
+    @classmethod
+    def sql_texto(cls, coluna):
+        '''Expressão SQL que converte o código da coluna de volta no texto'''
+        casos = ' '.join(f"WHEN {membro.codigo} THEN '{membro.value}'" for membro in cls)
+        return f"CASE {coluna} {casos} ELSE {coluna} END"
+
+
+class StatusItem(Status):
+    DISPONIVEL = ('disponivel', 1)
+    EMPRESTADO = ('emprestado', 2)
+
+
+class StatusEmprestimo(Status):
+    ATIVO = ('ativo', 1)
+    MULTADO = ('multado', 2)
+    FINALIZADO = ('finalizado', 3)
+
+
+class StatusReserva(Status):
+    AGUARDANDO = ('aguardando', 1)
+    CANCELADA = ('cancelada', 2)
+    EXPIRADA = ('expirada', 3)
+    FINALIZADA = ('finalizada', 4)
+
+
+# Enumeração da coluna 'status' de cada tabela
+STATUS_TABELAS = {
+    'itens': StatusItem,
+    'emprestimos': StatusEmprestimo,
+    'reservas': StatusReserva
+}
+
+for _classe in STATUS_TABELAS.values():
+    _classe._por_codigo = {membro.codigo: membro for membro in _classe}
+    # Parâmetros SQL recebem o código inteiro
+    sqlite3.register_adapter(_classe, lambda membro: membro.codigo)
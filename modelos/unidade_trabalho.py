@@ -0,0 +1,123 @@
+from modelos import database
+import functools
+
+
+@functools.lru_cache(maxsize=None)
+def _atributos(classe):
+    # Os modelos declaram __slots__ (sem __dict__): os atributos vêm de toda a hierarquia
+    return tuple(nome for c in classe.__mro__ for nome in getattr(c, '__slots__', ()) if nome != '__weakref__')
+
+
+def copiar_estado(objeto):
+    # Cópia rasa dos atributos: suficiente porque os métodos dos modelos reatribuem valores
+    # (objetos aninhados alterados no lugar, como Multa, devem ser registrados à parte)
+    if isinstance(objeto, dict):
+        return dict(objeto)
+    estado = {nome: getattr(objeto, nome) for nome in _atributos(type(objeto)) if hasattr(objeto, nome)}
+    estado.update(getattr(objeto, '__dict__', {}))
+    return estado
+
+
+def restaurar_estado(objeto, estado):
+    if isinstance(objeto, dict):
+        objeto.clear()
+        objeto.update(estado)
+        return
+    for nome in _atributos(type(objeto)):
+        if nome in estado:
+            setattr(objeto, nome, estado[nome])
+        elif hasattr(objeto, nome):
+            delattr(objeto, nome)
+    if hasattr(objeto, '__dict__'):
+        objeto.__dict__.clear()
+        objeto.__dict__.update({nome: valor for nome, valor in estado.items() if nome not in _atributos(type(objeto))})
+
+
+class UnidadeTrabalho:
+    '''Agrupa as alterações em memória e as escritas SQL de uma operação.
+
+    As escritas usam 'conn' dentro de uma única transação. Antes de alterar um
+    objeto existente, a operação o registra com 'registrar'; inclusões e remoções
+    nas coleções da biblioteca passam por 'adicionar' e 'remover'. Se qualquer
+    passo falhar (inclusive o commit), a transação é desfeita e os objetos e
+    coleções voltam ao estado anterior, junto com os índices de circulação.
+
+        with UnidadeTrabalho(biblioteca) as uow:
+            uow.registrar(item)
+            item._status = StatusItem.EMPRESTADO
+            uow.adicionar(biblioteca.emprestimos, emprestimo)
+            uow.conn.execute(...)
+    '''
+
+    def __init__(self, biblioteca):
+        self._biblioteca = biblioteca
+        self._estados = {}
+        self._operacoes = []
+        self._eventos = []
+        self._transacao = None
+        self.conn = None
+
+    def __enter__(self):
+        # Com a escrita adiada ativa, as escritas são confirmadas no diário em vez do banco
+        escritor = getattr(self._biblioteca, '_escritor', None)
+        self._transacao = escritor.transacao() if escritor is not None else database.transacao()
+        self.conn = self._transacao.__enter__()
+        return self
+
+    def __exit__(self, tipo, excecao, rastreamento):
+        if tipo is None and self._eventos:
+            # Eventos de domínio são gravados na mesma transação das alterações
+            try:
+                self._biblioteca._gravar_eventos(self.conn, self._eventos)
+            except BaseException as e:
+                try:
+                    self._transacao.__exit__(type(e), e, e.__traceback__)
+                finally:
+                    self._desfazer()
+                raise
+        try:
+            # Confirma (ou desfaz) a transação; uma falha no commit também é tratada abaixo
+            self._transacao.__exit__(tipo, excecao, rastreamento)
+        except BaseException:
+            self._desfazer()
+            raise
+        if tipo is not None:
+            self._desfazer()
+        return False
+
+    def registrar(self, *objetos):
+        '''Guarda o estado atual dos objetos que serão alterados (apenas a primeira vez)'''
+        for objeto in objetos:
+            if objeto is not None and id(objeto) not in self._estados:
+                self._estados[id(objeto)] = (objeto, copiar_estado(objeto))
+
+    def evento(self, tipo, *objetos, removidos=()):
+        '''Registra um evento de domínio com as entidades alteradas (estado lido ao confirmar)'''
+        self._eventos.append((tipo, objetos, removidos))
+
+    def adicionar(self, colecao, entidade):
+        colecao.append(entidade)
+        self._operacoes.append((colecao, entidade, True))
+        self._biblioteca._atualizar_indices(entidade)
+
+    def remover(self, colecao, entidade):
+        colecao.remove(entidade)
+        self._operacoes.append((colecao, entidade, False))
+        self._biblioteca._remover_indices(entidade)
+
+    def _desfazer(self):
+        for objeto, estado in self._estados.values():
+            restaurar_estado(objeto, estado)
+
+        # Operações nas coleções são revertidas na ordem inversa
+        for colecao, entidade, adicionada in reversed(self._operacoes):
+            if adicionada:
+                colecao.remove(entidade)
+                self._biblioteca._remover_indices(entidade)
+            else:
+                colecao.append(entidade)
+                self._biblioteca._atualizar_indices(entidade)
+
+        self._biblioteca._atualizar_indices(*(objeto for objeto, _ in self._estados.values()))
+        self._estados.clear()
+        self._operacoes.clear()
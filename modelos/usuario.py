@@ -3,8 +3,12 @@ from uuid import uuid4
 import re
 
 class Usuario(ABC):
+    # 'tipo' ('membro', 'bibliotecario' ou 'administrador') é definido por cada subclasse
+    __slots__ = ('_id', '_nome', '_email', '_senha', '_cpf', 'tipo')
+
     def __init__(self, nome, email, senha, cpf):
         self._id = uuid4()
+        self.tipo = None
         # Usar os setters para aplicar validações
         self.nome = nome
         self.email = email
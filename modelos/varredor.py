@@ -0,0 +1,65 @@
+import threading
+
+
+class TarefaPeriodica(threading.Thread):
+    '''Thread de fundo que executa 'executar()' a cada 'intervalo' segundos.
+
+    Uma falha não interrompe a tarefa: fica em 'erro' e é informada a
+    'ao_erro(origem, mensagem)' no início de cada sequência de falhas (a
+    interface as consulta em Biblioteca.falhas_em_segundo_plano()).
+    '''
+
+    origem = 'tarefa de fundo'
+
+    def __init__(self, biblioteca, intervalo, ao_erro=None, nome=None):
+        super().__init__(name=nome, daemon=True)
+        self._biblioteca = biblioteca
+        self._intervalo = intervalo
+        self._ao_erro = ao_erro
+        self._parar = threading.Event()
+        self.erro = None
+
+    def executar(self):
+        raise NotImplementedError
+
+    def run(self):
+        while not self._parar.wait(self._intervalo):
+            try:
+                self.executar()
+            except Exception as e:
+                # Uma falha pontual (ex.: banco ocupado) não deve interromper a tarefa
+                if self.erro is None and self._ao_erro is not None:
+                    self._ao_erro(self.origem, e)
+                self.erro = e
+            else:
+                self.erro = None
+
+    def parar(self):
+        self._parar.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
+
+
+class VarredorReservas(TarefaPeriodica):
+    '''Thread de fundo que expira periodicamente as reservas vencidas da biblioteca'''
+
+    origem = 'varredura de reservas'
+
+    def __init__(self, biblioteca, intervalo, ao_erro=None):
+        super().__init__(biblioteca, intervalo, ao_erro, 'varredor-reservas')
+
+    def executar(self):
+        self._biblioteca.expirar_reservas()
+
+
+class GeradorInstantaneos(TarefaPeriodica):
+    '''Thread de fundo que grava instantâneos do estado quando o log de eventos acumula INTERVALO_INSTANTANEO eventos'''
+
+    origem = 'instantâneos do log de eventos'
+
+    def __init__(self, biblioteca, intervalo, ao_erro=None):
+        super().__init__(biblioteca, intervalo, ao_erro, 'gerador-instantaneos')
+
+    def executar(self):
+        # O instantâneo apenas acelera a inicialização: após uma falha, a próxima verificação tenta de novo
+        self._biblioteca.gerar_instantaneo_se_necessario()
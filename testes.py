@@ -8,8 +8,18 @@ import sys
 import datetime
 import os
 import sqlite3
+import time
+import json
+import tempfile
+import shutil
 from modelos.biblioteca import Biblioteca
+from modelos.biblioteca_lazy import BibliotecaLazy
 from modelos import database
+from modelos.importacao import importar_itens
+from modelos.exportacao import exportar, ler_colunar
+from modelos.escrita_adiada import EscritorAdiado, caminho_diario, caminho_descartadas
+from modelos.status import StatusItem, StatusEmprestimo, StatusReserva
+from modelos.registro import Registro
 # Patch config for tests (user has a very short duration in config.py)
 import modelos.emprestimo
 modelos.emprestimo.PRAZO_DEVOLUCAO = 7
@@ -19,7 +29,7 @@ from modelos.ebook import Ebook
 from modelos.membro import Membro
 from modelos.administrador import Administrador
 from modelos.bibliotecario import Bibliotecario
-from config import PRAZO_DEVOLUCAO, LIMITE_RENOVACOES, LIMITE_EMPRESTIMOS_SIMULTANEOS
+from config import PRAZO_DEVOLUCAO, LIMITE_RENOVACOES, LIMITE_EMPRESTIMOS_SIMULTANEOS, PRAZO_VALIDADE_RESERVA
 
 # Patch config for tests (user has a very short duration in config.py)
 import modelos.emprestimo
@@ -43,6 +53,9 @@ testes_falharam = 0
 
 def criar_biblioteca_vazia():
     """Cria uma instância de Biblioteca com banco de dados limpo"""
+    # Encerrar conexões reutilizáveis antes de apagar o arquivo
+    database.fechar_conexoes()
+
     # Remover banco anterior se existir
     if os.path.exists(TEST_DB):
         try:
@@ -245,7 +258,7 @@ def testes_emprestimos():
     
     # Criar e emprestar muitos livros
     for i in range(LIMITE_EMPRESTIMOS_SIMULTANEOS):
-        livro_temp = Livro(f'Livro {i}', None, None, f'Autor {i}', 300, f'978-0-00000-{i:04d}', 'Teste')
+        livro_temp = Livro(f'Livro {i}', None, None, f'Autor {chr(ord("A") + i)}', 300, f'978-0-00000-{i:04d}', 'Teste')
         bib.adicionar_item(livro_temp)
         livro_temp = bib.itens[-1]
         bib.emprestar_item(livro_temp, membro2)
@@ -419,6 +432,9 @@ def testes_devolucoes_multas():
         emprestimo_devolvido = bib.registrar_devolucao(emprestimo.id)
         teste_assert(emprestimo_devolvido.status == 'finalizado', "Devolução no prazo finaliza empréstimo")
         teste_assert(emprestimo_devolvido.multa is None, "Devolução no prazo não gera multa")
+        teste_assert(livro.data_ultima_devolucao == emprestimo_devolvido.data_devolucao, "Devolução registra a data da última devolução do item")
+        valor_banco = database.conexao().execute("SELECT data_ultima_devolucao FROM itens WHERE id = ?", (str(livro.id),)).fetchone()[0]
+        teste_assert(valor_banco is not None, "Data da última devolução persistida no banco")
     except Exception as e:
         teste_falhou("Devolução no prazo", str(e))
     
@@ -478,6 +494,8 @@ def testes_fila_reserva():
     bib.reservar_item(livro, membro3)
     
     teste_assert(len(bib.reservas) == 2, "Duas reservas criadas")
+    teste_assert(bib.posicao_na_fila(livro, membro2) == 1 and bib.posicao_na_fila(livro, membro3) == 2, "Posições na fila de reservas")
+    teste_assert(bib.posicao_na_fila(livro, membro1) is None, "Membro fora da fila não tem posição")
     
     # Teste 1: Apenas primeiro da fila pode emprestar
     teste_exception(
@@ -500,6 +518,989 @@ def testes_fila_reserva():
     # Teste 3: Reserva foi marcada como finalizada
     primeira_reserva = bib.reservas[0]
     teste_assert(primeira_reserva.status == 'finalizada', "Primeira reserva marcada como finalizada")
+    
+    # Teste 4: Fila avança após a retirada do primeiro membro
+    teste_assert(bib.fila_reservas(livro) == [bib.reservas[1]], "Fila avança após retirada")
+    teste_assert(bib.posicao_na_fila(livro, membro3) == 1, "Próximo membro passa a ser o primeiro da fila")
+
+# ============ TESTES DO REGISTRO INDEXADO ============
+def testes_registro():
+    print(f"\n{NEGRITO}=== TESTES DO REGISTRO INDEXADO ==={RESET}\n")
+    
+    bib = criar_biblioteca_vazia()
+    
+    # Setup
+    bib.adicionar_usuario('João Silva', 'joao@email.com', 'senha123', '123.456.789-10', 'membro')
+    membro = bib.usuarios[0]
+    
+    livro = Livro('Python Avançado', None, None, 'Gustavo Peretti', 450, '978-3-16-148410-0', 'Programação')
+    bib.adicionar_item(livro)
+    
+    # Teste 1: Busca por id aceita UUID e string
+    teste_assert(bib.usuarios.obter(membro.id) is membro, "Busca de usuário por UUID")
+    teste_assert(bib.usuarios.obter(str(membro.id)) is membro, "Busca de usuário por string")
+    
+    # Teste 2: Índices secundários por email e ISBN
+    teste_assert(bib.usuarios.primeiro('email', 'joao@email.com') is membro, "Índice de usuários por email")
+    teste_assert(bib.itens.buscar('isbn', '978-3-16-148410-0') == [livro], "Índice de itens por ISBN")
+    
+    # Teste 3: Índices de empréstimos por membro e por item
+    bib.emprestar_item(livro, membro)
+    emprestimo = bib.emprestimos[0]
+    teste_assert(bib.emprestimos.buscar('membro', str(membro.id)) == [emprestimo], "Índice de empréstimos por membro")
+    teste_assert(bib.emprestimos.buscar('item', str(livro.id)) == [emprestimo], "Índice de empréstimos por item")
+    
+    # Teste 4: Remoção atualiza os índices
+    bib.remover_item(str(livro.id))
+    teste_assert(bib.itens.buscar('isbn', '978-3-16-148410-0') == [], "Remoção atualiza índice por ISBN")
+    
+    # Teste 5: Fatias posicionais (páginas da grade do acervo) acompanham as alterações
+    registro = Registro({'id': i} for i in range(10))
+    teste_assert([e['id'] for e in registro[3:6]] == [3, 4, 5] and registro[7]['id'] == 7, "Fatias por posição")
+    registro.remover({'id': 4})
+    registro.adicionar({'id': 10})
+    teste_assert([e['id'] for e in registro[3:6]] == [3, 5, 6] and registro[9]['id'] == 10, "Fatias atualizadas após inclusão e remoção")
+    
+    # Teste 6: Iteração sem cópia; alterações durante a iteração são detectadas (copia() permite alterar)
+    def alterar_durante_iteracao():
+        for entidade in registro:
+            registro.adicionar({'id': entidade['id']})
+    teste_exception(alterar_durante_iteracao, RuntimeError, "Alteração durante a iteração detectada")
+    for entidade in registro.copia():
+        if entidade['id'] % 2:
+            registro.remover(entidade)
+    teste_assert(all(e['id'] % 2 == 0 for e in registro) and len(registro) == 5, "Cópia permite alterar durante o percurso")
+
+# ============ TESTES DE CARGA DO BANCO ============
+def testes_carga():
+    print(f"\n{NEGRITO}=== TESTES DE CARGA DO BANCO ==={RESET}\n")
+    
+    bib = criar_biblioteca_vazia()
+    
+    # Setup
+    bib.adicionar_usuario('João', 'joao@email.com', 'senha123', '123.456.789-10', 'membro')
+    bib.adicionar_usuario('Maria', 'maria@email.com', 'senha123', '111.222.333-44', 'membro')
+    membro1 = bib.usuarios[0]
+    membro2 = bib.usuarios[1]
+    
+    livro = Livro('Python Avançado', None, None, 'Gustavo Peretti', 450, '978-3-16-148410-0', 'Programação')
+    bib.adicionar_item(livro)
+    bib.emprestar_item(livro, membro1)
+    bib.reservar_item(livro, membro2)
+    
+    # Recarregar do banco em uma nova instância
+    recarregada = Biblioteca()
+    emprestimo = recarregada.emprestimos.obter(bib.emprestimos[0].id)
+    reserva = recarregada.reservas.obter(bib.reservas[0].id)
+    
+    # Teste 1: Empréstimos e reservas são ligados aos objetos carregados
+    teste_assert(emprestimo is not None and emprestimo.item is recarregada.itens.obter(livro.id), "Empréstimo recarregado aponta para o item carregado")
+    teste_assert(reserva is not None and reserva.membro is recarregada.usuarios.obter(membro2.id), "Reserva recarregada aponta para o membro carregado")
+    
+    # Teste 2: Tempos de carga por tabela
+    teste_assert(set(recarregada.tempos_carga) == {'usuarios', 'itens', 'emprestimos', 'reservas'}, "Tempos de carga registrados por tabela")
+
+# ============ TESTES DE CONEXÃO E TRANSAÇÃO ============
+def testes_transacao():
+    print(f"\n{NEGRITO}=== TESTES DE CONEXÃO E TRANSAÇÃO ==={RESET}\n")
+    
+    criar_biblioteca_vazia()
+    
+    # Teste 1: A conexão da thread é reutilizada
+    teste_assert(database.conexao() is database.conexao(), "Conexão reutilizada na mesma thread")
+    
+    # Teste 2: Exceção dentro da transação desfaz as escritas
+    try:
+        with database.transacao() as conn:
+            conn.execute("INSERT INTO usuarios (id, nome) VALUES (?, ?)", ('u1', 'Teste'))
+            raise RuntimeError('falha simulada')
+    except RuntimeError:
+        pass
+    total = database.conexao().execute("SELECT COUNT(*) FROM usuarios").fetchone()[0]
+    teste_assert(total == 0, "Rollback da transação em caso de erro")
+    
+    # Teste 3: Transações aninhadas são confirmadas pela mais externa
+    with database.transacao() as conn:
+        with database.transacao() as interna:
+            interna.execute("INSERT INTO usuarios (id, nome) VALUES (?, ?)", ('u2', 'Teste'))
+        teste_assert(conn.in_transaction, "Transação interna não confirma antes da externa")
+    total = database.conexao().execute("SELECT COUNT(*) FROM usuarios").fetchone()[0]
+    teste_assert(total == 1, "Commit da transação externa")
+    
+    # Teste 4: Perfil de PRAGMAs aplicado na criação da conexão
+    modo = database.conexao().execute("PRAGMA journal_mode").fetchone()[0]
+    teste_assert(modo.upper() == str(database.PRAGMAS_CONEXAO['journal_mode']).upper(), "Journal mode do perfil aplicado")
+
+# ============ TESTES DE MIGRAÇÃO DO ESQUEMA ============
+def testes_migracoes():
+    print(f"\n{NEGRITO}=== TESTES DE MIGRAÇÃO DO ESQUEMA ==={RESET}\n")
+    
+    criar_biblioteca_vazia()
+    conn = database.conexao()
+    
+    # Teste 1: Versão do esquema registrada
+    versao_atual = database.MIGRACOES[-1][0]
+    teste_assert(database.versao_esquema() == versao_atual, "Versão do esquema registrada no banco")
+    
+    # Teste 2: Índices criados
+    indices = {row['name'] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    teste_assert({'idx_emprestimos_status_item', 'idx_reservas_status_membro', 'idx_itens_isbn'} <= indices, "Índices de circulação criados")
+    
+    # Teste 3: Email único no banco
+    conn.execute("INSERT INTO usuarios (id, email) VALUES ('a', 'x@email.com')")
+    teste_exception(
+        lambda sql: conn.execute(sql),
+        sqlite3.IntegrityError,
+        "Email duplicado é rejeitado pelo banco",
+        sql="INSERT INTO usuarios (id, email) VALUES ('b', 'x@email.com')"
+    )
+    conn.rollback()
+    
+    # Teste 4: Banco sem versão é atualizado no lugar
+    conn.execute("DROP INDEX idx_itens_isbn")
+    conn.execute("PRAGMA user_version = 0")
+    conn.commit()
+    database.migrar()
+    indices = {row['name'] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    teste_assert('idx_itens_isbn' in indices and database.versao_esquema() == versao_atual, "Banco antigo é migrado")
+    
+    # Teste 5: Emails duplicados impedem a migração, que informa os usuários e é desfeita por inteiro
+    conn.execute("DROP INDEX idx_usuarios_email")
+    conn.execute("DROP INDEX idx_emprestimos_item")
+    conn.execute("INSERT INTO usuarios (id, email) VALUES ('a', 'x@email.com'), ('b', 'x@email.com')")
+    conn.execute("PRAGMA user_version = 0")
+    conn.commit()
+    try:
+        database.migrar()
+        teste_assert(False, "Migração informa emails duplicados")
+    except RuntimeError as e:
+        teste_assert('x@email.com (usuários a, b)' in str(e), "Migração informa emails duplicados")
+    indices = {row['name'] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    teste_assert('idx_emprestimos_item' not in indices and database.versao_esquema() == 0, "Migração com falha é desfeita (inclusive o DDL)")
+    conn.execute("DELETE FROM usuarios WHERE id = 'b'")
+    conn.commit()
+    teste_assert(database.migrar() == versao_atual, "Migração concluída após corrigir os emails")
+
+# ============ TESTES DO MODO LAZY ============
+def testes_modo_lazy():
+    print(f"\n{NEGRITO}=== TESTES DO MODO LAZY ==={RESET}\n")
+    
+    criar_biblioteca_vazia()
+    bib = BibliotecaLazy(capacidade=2)
+    
+    # Setup
+    membro1 = bib.adicionar_usuario('Ana', 'ana@email.com', 'senha123', '123.456.789-10', 'membro')
+    membro2 = bib.adicionar_usuario('Pedro', 'pedro@email.com', 'senha123', '222.333.444-55', 'membro')
+    livro = Livro('Python Avançado', None, None, 'Gustavo Peretti', 450, '978-3-16-148410-0', 'Programação')
+    bib.adicionar_item(livro)
+    
+    bib.emprestar_item(livro, membro1)
+    bib.reservar_item(livro, membro2)
+    emprestimo = bib.emprestimos[0]
+    
+    # Teste 1: Coleções consultadas no banco
+    teste_assert(len(bib.emprestimos) == 1 and len(bib.reservas) == 1, "Coleções lazy contam registros do banco")
+    teste_assert(bib.emprestimos.obter(emprestimo.id) is emprestimo, "Mapa de identidade devolve o mesmo objeto")
+    teste_assert(bib.posicao_na_fila(livro, membro2) == 1, "Posição na fila consultada no banco")
+    
+    # Teste 2: Regras de empréstimo respondidas por consultas
+    teste_exception(
+        bib.reservar_item,
+        ValueError,
+        "Reserva duplicada detectada no modo lazy",
+        item=livro,
+        membro=membro2
+    )
+    bib.registrar_devolucao(emprestimo.id)
+    teste_exception(
+        bib.emprestar_item,
+        ValueError,
+        "Fila de reservas respeitada no modo lazy",
+        item=livro,
+        membro=membro1
+    )
+    
+    try:
+        bib.emprestar_item(livro, membro2)
+        status = database.conexao().execute("SELECT status FROM reservas").fetchone()[0]
+        teste_assert(status == StatusReserva.FINALIZADA.codigo, "Reserva utilizada é persistida como finalizada")
+    except Exception as e:
+        teste_falhou("Primeiro da fila empresta no modo lazy", str(e))
+    
+    # Teste 3: Memória limitada pela capacidade do mapa
+    list(bib.emprestimos)
+    list(bib.reservas)
+    teste_assert(bib.emprestimos.em_memoria() <= 2, "Mapa de identidade respeita a capacidade")
+    pequena = BibliotecaLazy(capacidade=1)
+    primeiro = pequena.emprestimos[0]
+    pequena.emprestimos[1]
+    teste_assert(pequena.emprestimos.em_memoria() == 1 and pequena.emprestimos.obter(primeiro.id) is primeiro,
+                 "Objeto em uso continua único após sair do mapa")
+    
+    # Teste 4: Reservas com a mesma data têm posições distintas, iguais nos modos lazy e em memória
+    membro3 = bib.adicionar_usuario('Carla', 'carla@email.com', 'senha123', '333.444.555-66', 'membro')
+    bib.reservar_item(livro, membro1)
+    bib.reservar_item(livro, membro3)
+    conn = database.conexao()
+    conn.execute("UPDATE reservas SET data_reserva = (SELECT MIN(data_reserva) FROM reservas WHERE status = ?) WHERE status = ?",
+                 (StatusReserva.AGUARDANDO, StatusReserva.AGUARDANDO))
+    conn.commit()
+    lazy, memoria = BibliotecaLazy(), Biblioteca()
+    posicoes = [lazy.posicao_na_fila(livro, membro1), lazy.posicao_na_fila(livro, membro3)]
+    teste_assert(sorted(posicoes) == [1, 2], "Empate na data da reserva desfeito na posição da fila")
+    teste_assert(posicoes == [memoria.posicao_na_fila(livro, membro1), memoria.posicao_na_fila(livro, membro3)]
+                 and [r.id for r in lazy.fila_reservas(livro)] == [r.id for r in memoria.fila_reservas(livro)],
+                 "Mesma ordem de empate nos modos lazy e em memória")
+
+# ============ TESTES DOS CONTADORES DE CIRCULAÇÃO ============
+def testes_contadores_circulacao():
+    print(f"\n{NEGRITO}=== TESTES DOS CONTADORES DE CIRCULAÇÃO ==={RESET}\n")
+    
+    bib = criar_biblioteca_vazia()
+    
+    # Setup
+    membro1 = bib.adicionar_usuario('João', 'joao@email.com', 'senha123', '123.456.789-10', 'membro')
+    membro2 = bib.adicionar_usuario('Maria', 'maria@email.com', 'senha123', '111.222.333-44', 'membro')
+    livro1 = Livro('Python Avançado', None, None, 'Gustavo Peretti', 450, '978-3-16-148410-0', 'Programação')
+    livro2 = Livro('Design Patterns', None, None, 'Gang of Four', 416, '978-0-201-63361-0', 'Programação')
+    bib.adicionar_item(livro1)
+    bib.adicionar_item(livro2)
+    
+    # Teste 1: Empréstimos e reservas contam para o limite do membro
+    bib.emprestar_item(livro1, membro1)
+    bib.emprestar_item(livro2, membro2)
+    bib.reservar_item(livro2, membro1)
+    teste_assert(bib._quantidade_em_aberto(membro1) == 2, "Contador soma empréstimos e reservas do membro")
+    
+    # Teste 2: Cancelamento e devolução atualizam os contadores
+    bib.cancelar_reserva(bib.reservas[0].id)
+    emprestimo = bib.emprestimos[0]
+    emprestimo._data_emprestimo = datetime.datetime.now() - datetime.timedelta(days=PRAZO_DEVOLUCAO + 5)
+    bib.registrar_devolucao(emprestimo.id)
+    teste_assert(bib._quantidade_em_aberto(membro1) == 0, "Contador atualizado após cancelamento e devolução")
+    teste_assert(bib._emprestimos_ativos_item(livro1) == [], "Item sem empréstimo ativo após devolução")
+    
+    # Teste 3: Multa pendente bloqueia até o pagamento
+    teste_exception(
+        bib.emprestar_item,
+        ValueError,
+        "Multa pendente bloqueia novo empréstimo",
+        item=livro1,
+        membro=membro1
+    )
+    bib.registrar_pagamento_multa(emprestimo.id)
+    teste_assert(bib._multas_pendentes(membro1) == [], "Pagamento remove a multa pendente")
+
+# ============ TESTES DE EXPIRAÇÃO DE RESERVAS ============
+def testes_expiracao_reservas():
+    print(f"\n{NEGRITO}=== TESTES DE EXPIRAÇÃO DE RESERVAS ==={RESET}\n")
+    
+    bib = criar_biblioteca_vazia()
+    
+    # Setup
+    membro1 = bib.adicionar_usuario('João', 'joao@email.com', 'senha123', '123.456.789-10', 'membro')
+    membro2 = bib.adicionar_usuario('Maria', 'maria@email.com', 'senha123', '111.222.333-44', 'membro')
+    livro = Livro('Python Avançado', None, None, 'Gustavo Peretti', 450, '978-3-16-148410-0', 'Programação')
+    bib.adicionar_item(livro)
+    
+    bib.emprestar_item(livro, membro1)
+    bib.reservar_item(livro, membro2)
+    reserva = bib.reservas[0]
+    bib.registrar_devolucao(bib.emprestimos[0].id)
+    
+    # Teste 1: Reserva dentro do prazo não expira
+    teste_assert(bib.expirar_reservas() == 0 and reserva.status == 'aguardando', "Reserva dentro do prazo é mantida")
+    
+    # Simular devolução antiga (prazo de retirada vencido)
+    devolucao_antiga = datetime.datetime.now() - datetime.timedelta(days=PRAZO_VALIDADE_RESERVA + 1)
+    livro._data_ultima_devolucao = devolucao_antiga
+    with database.transacao() as conn:
+        conn.execute("UPDATE itens SET data_ultima_devolucao = ? WHERE id = ?", (devolucao_antiga, str(livro.id)))
+    
+    # Teste 2: Varredura em segundo plano expira a reserva no banco e em memória
+    bib.iniciar_varredura_reservas(0.05)
+    time.sleep(0.3)
+    bib.parar_varredura_reservas()
+    status_banco = database.conexao().execute("SELECT status FROM reservas WHERE id = ?", (str(reserva.id),)).fetchone()[0]
+    teste_assert(reserva.status == 'expirada' and status_banco == StatusReserva.EXPIRADA.codigo, "Varredura expira reserva vencida")
+    teste_assert(bib.posicao_na_fila(livro, membro2) is None, "Reserva expirada sai da fila")
+    
+    # Teste 3: Item volta a ser emprestável por qualquer membro
+    try:
+        bib.emprestar_item(livro, membro1)
+        teste_passou("Empréstimo liberado após expiração")
+    except Exception as e:
+        teste_falhou("Empréstimo liberado após expiração", str(e))
+    
+    # Teste 4: Falhas da varredura ficam disponíveis para a interface (uma por sequência de falhas)
+    def falhar():
+        raise RuntimeError('banco indisponível')
+    bib.expirar_reservas = falhar
+    bib.iniciar_varredura_reservas(0.02)
+    time.sleep(0.2)
+    bib.parar_varredura_reservas()
+    falhas = bib.falhas_em_segundo_plano()
+    teste_assert(len(falhas) == 1 and falhas[0][1] == 'varredura de reservas' and 'banco indisponível' in falhas[0][2],
+                 "Falha da varredura informada à interface")
+
+# ============ TESTES DE IMPORTAÇÃO EM LOTE ============
+def testes_importacao():
+    print(f"\n{NEGRITO}=== TESTES DE IMPORTAÇÃO EM LOTE ==={RESET}\n")
+    
+    bib = criar_biblioteca_vazia()
+    pasta = tempfile.mkdtemp()
+    
+    caminho_csv = os.path.join(pasta, 'acervo.csv')
+    with open(caminho_csv, 'w', encoding='utf-8') as arquivo:
+        arquivo.write("tipo,nome,autor,paginas,isbn,categoria\n")
+        arquivo.write("livro,Dom Casmurro,Machado de Assis,256,978-85-01,Romance\n")
+        arquivo.write("ebook,Clean Code,Robert C. Martin,464,978-0132350884,Tecnologia\n")
+        arquivo.write('livro,"Sem Autor\nValido",Autor 123,100,978-1,Romance\n')  # campo em duas linhas do arquivo
+        arquivo.write("livro,Páginas Inválidas,Jorge Amado,abc,978-2,\n")
+        arquivo.write("livro,Capitães da Areia,Jorge Amado,280,978-3,\n")
+    
+    # Teste 1: Linhas válidas são gravadas, inválidas são relatadas com o número da linha
+    checkpoint = 'acervo'
+    relatorio = importar_itens(bib, caminho_csv, tamanho_lote=2, checkpoint=checkpoint)
+    teste_assert(relatorio.importados == 3, "Importação CSV grava linhas válidas")
+    teste_assert([numero for numero, _ in relatorio.rejeitados] == [5, 6], "Importação relata as linhas do arquivo rejeitadas")
+    
+    total_banco = database.conexao().execute("SELECT COUNT(*) FROM itens").fetchone()[0]
+    teste_assert(total_banco == 3 and len(bib.itens) == 3, "Itens importados no banco e em memória")
+    teste_assert(bib.itens.primeiro('isbn', '978-0132350884').tipo == 'ebook', "Tipo do item importado é respeitado")
+    teste_assert(bib.progresso_importacao(checkpoint) == (0, []), "Progresso descartado ao concluir")
+    
+    # Teste 2: Retomada a partir do checkpoint ignora as linhas já gravadas
+    caminho_jsonl = os.path.join(pasta, 'acervo.jsonl')
+    with open(caminho_jsonl, 'w', encoding='utf-8') as arquivo:
+        for i in range(4):
+            registro = {'nome': f'Volume {i}', 'autor': 'Autor Teste', 'paginas': 10 + i, 'isbn': f'978-9-{i}'}
+            arquivo.write((json.dumps(registro) if i != 1 else '{"nome": ') + "\n")
+    # Queda após o primeiro lote: o progresso foi gravado na mesma transação dos itens
+    def interromper(relatorio):
+        raise KeyboardInterrupt
+    try:
+        importar_itens(bib, caminho_jsonl, tamanho_lote=2, checkpoint=checkpoint, ao_concluir_lote=interromper)
+    except KeyboardInterrupt:
+        pass
+    linhas, rejeitados = bib.progresso_importacao(checkpoint)
+    teste_assert(linhas == 2 and [numero for numero, _ in rejeitados] == [2], "Progresso e rejeições gravados com o lote")
+    
+    relatorio = importar_itens(bib, caminho_jsonl, tamanho_lote=10, checkpoint=checkpoint)
+    teste_assert(relatorio.importados == 2 and relatorio.linhas_retomadas == 2, "Importação retomada do checkpoint")
+    teste_assert([numero for numero, _ in relatorio.rejeitados] == [2], "Rejeições anteriores à retomada relatadas")
+    teste_assert(sum(1 for item in bib.itens if item.autor == 'Autor Teste') == 3, "Retomada não duplica linhas anteriores")
+    
+    # Teste 3: Validação em paralelo produz o mesmo resultado
+    relatorio = importar_itens(bib, caminho_csv, tamanho_lote=1, processos=2)
+    teste_assert(relatorio.importados == 3 and len(relatorio.rejeitados) == 2, "Validação em processos paralelos")
+    
+    # Teste 4: Formato desconhecido
+    teste_exception(lambda: importar_itens(bib, os.path.join(pasta, 'acervo.xml')), ValueError, "Formato de importação inválido")
+    shutil.rmtree(pasta, ignore_errors=True)
+
+# ============ TESTES DE CADASTRO DE USUÁRIOS EM LOTE ============
+def testes_usuarios_em_lote():
+    print(f"\n{NEGRITO}=== TESTES DE CADASTRO DE USUÁRIOS EM LOTE ==={RESET}\n")
+    
+    bib = criar_biblioteca_vazia()
+    bib.adicionar_usuario('João', 'joao@email.com', 'senha123', '123.456.789-10', 'membro')
+    
+    registros = [
+        {'nome': 'Ana', 'email': 'ana@email.com', 'senha': 'senha123', 'cpf': '111.222.333-44', 'tipo': 'membro'},
+        {'nome': 'Bruno', 'email': 'joao@email.com', 'senha': 'senha123', 'cpf': '222.333.444-55', 'tipo': 'membro'},
+        {'nome': 'Carla', 'email': 'carla@email.com', 'senha': 'senha123', 'cpf': '11122233344', 'tipo': 'membro'},
+        {'nome': 'Davi', 'email': 'davi@email.com', 'senha': '123', 'cpf': '333.444.555-66', 'tipo': 'membro'},
+        {'nome': 'Eva', 'email': 'eva@email.com', 'senha': 'senha123', 'cpf': '444.555.666-77', 'tipo': 'bibliotecario'},
+        {'nome': 'Fábio', 'email': 'fabio@email.com', 'senha': 'senha123', 'cpf': '555.666.777-88', 'tipo': 'visitante'},
+    ]
+    usuarios, erros = bib.adicionar_usuarios_em_lote(registros)
+    
+    # Teste 1: Apenas registros válidos e inéditos são cadastrados
+    teste_assert([u.email for u in usuarios] == ['ana@email.com', 'eva@email.com'], "Lote cadastra registros válidos")
+    teste_assert([posicao for posicao, _ in erros] == [1, 2, 3, 5], "Lote relata erro por registro")
+    teste_assert(erros[0][1] == "Email já cadastrado no sistema" and erros[1][1] == "CPF já cadastrado no sistema",
+                 "Duplicidade de email e CPF detectada")
+    
+    # Teste 2: Persistência e índices em memória
+    total_banco = database.conexao().execute("SELECT COUNT(*) FROM usuarios").fetchone()[0]
+    teste_assert(total_banco == 3 and len(bib.usuarios) == 3, "Usuários do lote no banco e em memória")
+    teste_assert(bib.usuarios.primeiro('cpf', '44455566677').tipo == 'bibliotecario', "Usuário do lote indexado por CPF")
+
+# ============ TESTES DE EXPORTAÇÃO ============
+def testes_exportacao():
+    print(f"\n{NEGRITO}=== TESTES DE EXPORTAÇÃO ==={RESET}\n")
+    
+    bib = criar_biblioteca_vazia()
+    pasta = tempfile.mkdtemp()
+    
+    membro = bib.adicionar_usuario('João', 'joao@email.com', 'senha123', '123.456.789-10', 'membro')
+    livros = []
+    for i in range(5):
+        livro = Livro(f'Livro {i}', None, None, 'Autor Teste', 100 + i, f'978-0-{i}', 'Teste')
+        bib.adicionar_item(livro)
+        livros.append(livro)
+    for livro in livros[:3]:
+        bib.emprestar_item(livro, membro)
+    bib.registrar_devolucao(bib.emprestimos[0].id)
+    
+    # Teste 1: CSV com cabeçalho e todas as linhas, lidas em lotes menores que a tabela
+    destino_csv = os.path.join(pasta, 'emprestimos.csv')
+    total = exportar('emprestimos', destino_csv, tamanho_lote=2)
+    with open(destino_csv, encoding='utf-8') as arquivo:
+        linhas = arquivo.read().splitlines()
+    teste_assert(total == 3 and len(linhas) == 4 and linhas[0].startswith('id,item_id'), "Exportação CSV em lotes")
+    
+    # Teste 2: Formato colunar preserva valores, tipos e nulos
+    destino_colunar = os.path.join(pasta, 'emprestimos.bibc')
+    exportar('emprestimos', destino_colunar, tamanho_lote=2)
+    grupos = list(ler_colunar(destino_colunar))
+    ids = [id for grupo in grupos for id in grupo['id']]
+    status = [s for grupo in grupos for s in grupo['status']]
+    renovacoes = [r for grupo in grupos for r in grupo['quantidade_renovacoes']]
+    teste_assert(len(grupos) == 2 and ids == [str(e.id) for e in bib.emprestimos], "Exportação colunar em grupos de linhas")
+    teste_assert(status.count('finalizado') == 1 and renovacoes == [0, 0, 0], "Colunar preserva texto e inteiros")
+    teste_assert(grupos[0]['multa_valor'][1] is None, "Colunar preserva valores nulos")
+    
+    # Teste 3: Leitura seletiva de colunas
+    grupo = next(ler_colunar(destino_colunar, colunas=['status']))
+    teste_assert(list(grupo) == ['status'], "Leitura colunar seletiva")
+    
+    # Teste 4: Tabela vazia e tabela não exportável
+    destino_vazio = os.path.join(pasta, 'reservas.bibc')
+    teste_assert(exportar('reservas', destino_vazio) == 0 and list(ler_colunar(destino_vazio)) == [], "Exportação de tabela vazia")
+    teste_exception(lambda: exportar('usuarios', os.path.join(pasta, 'usuarios.csv')), ValueError, "Tabela de usuários não é exportável")
+    shutil.rmtree(pasta, ignore_errors=True)
+
+# ============ TESTES DE DEVOLUÇÃO EM LOTE ============
+def testes_devolucoes_em_lote():
+    print(f"\n{NEGRITO}=== TESTES DE DEVOLUÇÃO EM LOTE ==={RESET}\n")
+    
+    bib = criar_biblioteca_vazia()
+    membro = bib.adicionar_usuario('João', 'joao@email.com', 'senha123', '123.456.789-10', 'membro')
+    emprestimos = []
+    for i in range(3):
+        livro = Livro(f'Livro {i}', None, None, 'Autor Teste', 100, f'978-1-{i}', 'Teste')
+        bib.adicionar_item(livro)
+        bib.emprestar_item(livro, membro)
+        emprestimos.append(bib.emprestimos[-1])
+    
+    # Simular atraso de 5 dias no segundo empréstimo
+    emprestimos[1]._data_emprestimo -= datetime.timedelta(days=PRAZO_DEVOLUCAO + 5)
+    
+    ids = [e.id for e in emprestimos] + [emprestimos[0].id, 'id-inexistente']
+    resumo = bib.registrar_devolucoes_em_lote(ids)
+    
+    # Teste 1: Resumo com devoluções, multas e erros
+    teste_assert(len(resumo['devolvidos']) == 3, "Lote devolve todos os empréstimos ativos")
+    teste_assert(resumo['multados'] == [emprestimos[1]] and resumo['valor_multas'] == 5, "Lote resume multas geradas")
+    teste_assert([id for id, _ in resumo['erros']] == [emprestimos[0].id, 'id-inexistente'], "Lote relata ids inválidos ou repetidos")
+    
+    # Teste 2: Instante único e persistência
+    datas = {e.data_devolucao for e in emprestimos}
+    teste_assert(len(datas) == 1, "Devoluções do lote compartilham o mesmo instante")
+    status_banco = dict(database.conexao().execute("SELECT id, status FROM emprestimos").fetchall())
+    teste_assert(status_banco[str(emprestimos[1].id)] == StatusEmprestimo.MULTADO.codigo and status_banco[str(emprestimos[0].id)] == StatusEmprestimo.FINALIZADO.codigo,
+                 "Status das devoluções em lote persistidos")
+    itens_disponiveis = database.conexao().execute("SELECT COUNT(*) FROM itens WHERE status = ?", (StatusItem.DISPONIVEL,)).fetchone()[0]
+    teste_assert(itens_disponiveis == 3 and bib._multas_pendentes(membro) == [emprestimos[1]], "Itens liberados e multa pendente indexada")
+
+# ============ TESTES DE UNIDADE DE TRABALHO ============
+def testes_unidade_trabalho():
+    print(f"\n{NEGRITO}=== TESTES DE UNIDADE DE TRABALHO ==={RESET}\n")
+    
+    bib = criar_biblioteca_vazia()
+    membro1 = bib.adicionar_usuario('João', 'joao@email.com', 'senha123', '123.456.789-10', 'membro')
+    membro2 = bib.adicionar_usuario('Maria', 'maria@email.com', 'senha123', '111.222.333-44', 'membro')
+    livro = Livro('Python Avançado', None, None, 'Gustavo Peretti', 450, '978-3-16-148410-0', 'Programação')
+    bib.adicionar_item(livro)
+    
+    def simular_falha(tabela, operacao):
+        with database.transacao() as conn:
+            conn.execute(f"CREATE TRIGGER falha_simulada BEFORE {operacao} ON {tabela} BEGIN SELECT RAISE(ABORT, 'falha simulada'); END")
+    
+    def remover_falha():
+        with database.transacao() as conn:
+            conn.execute("DROP TRIGGER falha_simulada")
+    
+    # Teste 1: Falha ao gravar o empréstimo não deixa o empréstimo em memória
+    simular_falha('itens', 'UPDATE')
+    teste_exception(lambda: bib.emprestar_item(livro, membro1), sqlite3.DatabaseError, "Falha de escrita propaga o erro")
+    teste_assert(len(bib.emprestimos) == 0 and livro._status == 'disponivel', "Empréstimo desfeito em memória após falha")
+    teste_assert(not bib._emprestimos_ativos_item(livro), "Índices de circulação desfeitos após falha")
+    remover_falha()
+    
+    # Teste 2: Falha na devolução restaura empréstimo e item
+    bib.emprestar_item(livro, membro1)
+    emprestimo = bib.emprestimos[0]
+    bib.reservar_item(livro, membro2)
+    simular_falha('itens', 'UPDATE')
+    teste_exception(lambda: bib.registrar_devolucao(emprestimo.id), sqlite3.DatabaseError, "Falha na devolução propaga o erro")
+    teste_assert(emprestimo.status == 'ativo' and emprestimo.data_devolucao is None and livro._status == 'emprestado',
+                 "Devolução desfeita em memória após falha")
+    status_banco = database.conexao().execute("SELECT status FROM emprestimos WHERE id = ?", (str(emprestimo.id),)).fetchone()[0]
+    teste_assert(status_banco == StatusEmprestimo.ATIVO.codigo, "Devolução desfeita no banco após falha")
+    remover_falha()
+    
+    # Teste 3: Falha ao retirar pela reserva mantém a reserva na fila
+    bib.registrar_devolucao(emprestimo.id)
+    reserva = bib.reservas[0]
+    simular_falha('emprestimos', 'INSERT')
+    teste_exception(lambda: bib.emprestar_item(livro, membro2), sqlite3.DatabaseError, "Falha na retirada propaga o erro")
+    teste_assert(reserva.status == 'aguardando' and bib.posicao_na_fila(livro, membro2) == 1, "Reserva restaurada após falha")
+    remover_falha()
+    
+    # Teste 4: Após remover a falha, a operação é concluída normalmente
+    bib.emprestar_item(livro, membro2)
+    teste_assert(reserva.status == 'finalizada' and len(bib.emprestimos) == 2, "Operação concluída após falha transitória")
+
+# ============ TESTES DE ESCRITA ADIADA ============
+def testes_escrita_adiada():
+    print(f"\n{NEGRITO}=== TESTES DE ESCRITA ADIADA ==={RESET}\n")
+    
+    bib = criar_biblioteca_vazia()
+    membro1 = bib.adicionar_usuario('João', 'joao@email.com', 'senha123', '123.456.789-10', 'membro')
+    membro2 = bib.adicionar_usuario('Maria', 'maria@email.com', 'senha123', '111.222.333-44', 'membro')
+    livro = Livro('Python Avançado', None, None, 'Gustavo Peretti', 450, '978-3-16-148410-0', 'Programação')
+    bib.adicionar_item(livro)
+    
+    def contar(tabela):
+        return database.conexao().execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+    
+    # Teste 1: Operação é aplicada em memória e confirmada no diário antes do banco
+    bib.ativar_escrita_adiada(intervalo=60)
+    bib.emprestar_item(livro, membro1)
+    with open(caminho_diario(), encoding='utf-8') as arquivo:
+        entradas = arquivo.readlines()
+    teste_assert(len(bib.emprestimos) == 1 and contar('emprestimos') == 0 and len(entradas) == 1,
+                 "Operação confirmada no diário antes do banco")
+    
+    # Teste 2: Descarregar grava as operações pendentes em uma transação
+    bib.reservar_item(livro, membro2)
+    bib.descarregar_escrita()
+    teste_assert(contar('emprestimos') == 1 and contar('reservas') == 1, "Descarga grava operações pendentes")
+    bib.desativar_escrita_adiada()
+    teste_assert(not os.path.exists(caminho_diario()), "Diário removido ao desativar sem pendências")
+    
+    # Teste 3: Operações no diário são recuperadas após uma queda (thread nunca gravou)
+    bib._escritor = EscritorAdiado(caminho_diario(), 60, 500)
+    bib.registrar_devolucao(bib.emprestimos[0].id)
+    bib._escritor._diario.write('[999, [["UPDATE')  # última linha incompleta
+    bib._escritor._diario.close()
+    bib._escritor = None
+    teste_assert(database.conexao().execute("SELECT status FROM itens").fetchone()[0] == StatusItem.EMPRESTADO.codigo, "Queda antes da gravação")
+    
+    recuperada = Biblioteca()
+    teste_assert(recuperada.emprestimos[0].status == 'finalizado' and recuperada.itens[0]._status == 'disponivel',
+                 "Diário recuperado na inicialização")
+    teste_assert(not os.path.exists(caminho_diario()), "Diário removido após recuperação")
+    
+    # Teste 4: Operação recusada pelo banco é descartada após as tentativas, sem travar a fila
+    conn = database.conexao()
+    conn.execute('''CREATE TRIGGER falha_simulada BEFORE INSERT ON usuarios WHEN new.nome = 'Carla'
+                    BEGIN SELECT RAISE(ABORT, 'falha simulada'); END''')
+    conn.commit()
+    recuperada.ativar_escrita_adiada(intervalo=0.01)
+    try:
+        recuperada.adicionar_usuario('Ana', 'ana@email.com', 'senha123', '555.666.777-88', 'membro')
+        recuperada.adicionar_usuario('Carla', 'carla@email.com', 'senha123', '333.444.555-66', 'membro')
+        recuperada.adicionar_usuario('Bia', 'bia@email.com', 'senha123', '999.888.777-66', 'membro')
+        recuperada.descarregar_escrita()
+        nomes = {row[0] for row in conn.execute("SELECT nome FROM usuarios")}
+        teste_assert({'Ana', 'Bia'} <= nomes and 'Carla' not in nomes, "Fila segue após operação recusada")
+        falhas = recuperada.falhas_em_segundo_plano()
+        teste_assert(len(falhas) == 1 and falhas[0][1] == 'escrita adiada' and 'falha simulada' in falhas[0][2],
+                     "Operação descartada informada à interface")
+        with open(caminho_descartadas(caminho_diario()), encoding='utf-8') as arquivo:
+            teste_assert(len(arquivo.readlines()) == 1, "Operação descartada guardada à parte")
+    finally:
+        recuperada.desativar_escrita_adiada()
+        conn.execute("DROP TRIGGER falha_simulada")
+        conn.commit()
+        if os.path.exists(caminho_descartadas(caminho_diario())):
+            os.remove(caminho_descartadas(caminho_diario()))
+    
+    # Teste 5: Modo lazy não suporta escrita adiada
+    teste_exception(lambda: BibliotecaLazy().ativar_escrita_adiada(), RuntimeError, "Escrita adiada recusada no modo lazy")
+
+# ============ TESTES DE LOG DE EVENTOS ============
+def testes_log_eventos():
+    print(f"\n{NEGRITO}=== TESTES DE LOG DE EVENTOS ==={RESET}\n")
+    
+    import modelos.biblioteca
+    bib = criar_biblioteca_vazia()
+    modelos.biblioteca.REGISTRO_EVENTOS = True
+    modelos.biblioteca.INTERVALO_INSTANTANEO = 4
+    try:
+        # Ativar o log sobre o banco já limpo, partindo de um instantâneo do estado atual
+        bib._registro_eventos = True
+        bib.gerar_instantaneo()
+        membro1 = bib.adicionar_usuario('João', 'joao@email.com', 'senha123', '123.456.789-10', 'membro')
+        membro2 = bib.adicionar_usuario('Maria', 'maria@email.com', 'senha123', '111.222.333-44', 'membro')
+        livro = Livro('Python Avançado', None, None, 'Gustavo Peretti', 450, '978-3-16-148410-0', 'Programação')
+        bib.adicionar_item(livro)
+        bib.emprestar_item(livro, membro1)
+        bib.reservar_item(livro, membro2)
+        emprestimo = bib.emprestimos[0]
+        emprestimo._data_emprestimo -= datetime.timedelta(days=PRAZO_DEVOLUCAO + 2)
+        bib.registrar_devolucao(emprestimo.id)
+        
+        # Teste 1: Cada operação gera um evento com o estado resultante
+        eventos = list(bib.consultar_eventos())
+        tipos = [tipo for _, tipo, _, _ in eventos]
+        teste_assert(tipos[-3:] == ['emprestimo', 'reserva', 'devolucao'], "Operações registradas no log de eventos")
+        linhas_devolucao = dict(eventos[-1][3]['linhas'])
+        teste_assert(linhas_devolucao['emprestimos']['status'] == 'multado' and linhas_devolucao['itens']['status'] == 'disponivel',
+                     "Evento guarda o estado resultante")
+        
+        # Teste 2: Instantâneo periódico (fora das operações, pela tarefa de manutenção)
+        sequencia_instantaneo = database.conexao().execute("SELECT MAX(sequencia) FROM instantaneos").fetchone()[0]
+        teste_assert(sequencia_instantaneo is not None and sequencia_instantaneo < eventos[-1][0],
+                     "Operações não geram instantâneos")
+        teste_assert(bib.gerar_instantaneo_se_necessario() and not bib.gerar_instantaneo_se_necessario(),
+                     "Instantâneo gerado apenas após INTERVALO_INSTANTANEO eventos")
+        sequencia_instantaneo = database.conexao().execute("SELECT MAX(sequencia) FROM instantaneos").fetchone()[0]
+        teste_assert(sequencia_instantaneo == eventos[-1][0], "Instantâneo periódico gravado")
+        
+        def falhar():
+            raise RuntimeError('disco cheio')
+        bib.gerar_instantaneo_se_necessario = falhar
+        bib.iniciar_instantaneos(0.02)
+        time.sleep(0.2)
+        bib.parar_instantaneos()
+        del bib.gerar_instantaneo_se_necessario
+        falhas = bib.falhas_em_segundo_plano()
+        teste_assert(len(falhas) == 1 and 'disco cheio' in falhas[0][2], "Falha ao gerar instantâneo informada à interface")
+        
+        # Teste 3: Inicialização por instantâneo + cauda reconstrói o mesmo estado
+        bib.registrar_pagamento_multa(emprestimo.id)
+        bib.remover_usuario(bib.adicionar_usuario('Ana', 'ana@email.com', 'senha123', '555.666.777-88', 'membro').id)
+        recarregada = Biblioteca()
+        teste_assert('instantaneo' in recarregada.tempos_carga and 'emprestimos' not in recarregada.tempos_carga,
+                     "Inicialização usa o instantâneo")
+        emp = recarregada.emprestimos.obter(emprestimo.id)
+        teste_assert(emp.status == 'finalizado' and emp.multa.paga and emp.item is recarregada.itens.obter(livro.id),
+                     "Eventos posteriores ao instantâneo reaplicados")
+        teste_assert(len(recarregada.usuarios) == 2 and recarregada.posicao_na_fila(livro, recarregada.usuarios.obter(membro2.id)) == 1,
+                     "Remoções e fila de reservas reconstruídas")
+        
+        # Teste 4: Dois terminais no mesmo banco recebem sequências distintas do próprio banco
+        livro2 = Livro('Algoritmos', None, None, 'Thomas Cormen', 1200, '978-8535236996', 'Computação')
+        livro3 = Livro('Redes', None, None, 'Andrew Tanenbaum', 900, '978-8576059240', 'Computação')
+        try:
+            bib.adicionar_item(livro2)
+            recarregada.adicionar_item(livro3)
+            sequencias = [sequencia for sequencia, _, _, _ in bib.consultar_eventos()]
+            teste_assert(len(sequencias) == len(set(sequencias)) and sequencias[-2:] == sorted(sequencias[-2:]),
+                         "Eventos de dois terminais gravados sem conflito")
+        except Exception as e:
+            teste_assert(False, f"Eventos de dois terminais gravados sem conflito ({e})")
+        
+        # Teste 5: O modo lazy (usado pela importação) mantém os instantâneos e registra seus eventos
+        lazy = BibliotecaLazy()
+        lazy.adicionar_item(Livro('Redes II', None, None, 'Andrew Tanenbaum', 900, '978-8576059241', 'Computação'))
+        teste_assert(database.conexao().execute("SELECT COUNT(*) FROM instantaneos").fetchone()[0] == 1
+                     and list(lazy.consultar_eventos())[-1][1] == 'item_cadastrado', "Modo lazy preserva o log de eventos")
+        teste_assert(any(item.nome == 'Redes II' for item in Biblioteca().itens), "Instantâneo segue válido após operações no modo lazy")
+        
+        # Teste 6: Desativar o log invalida os instantâneos
+        modelos.biblioteca.REGISTRO_EVENTOS = False
+        Biblioteca()
+        teste_assert(database.conexao().execute("SELECT COUNT(*) FROM instantaneos").fetchone()[0] == 0,
+                     "Instantâneos descartados sem o log de eventos")
+    finally:
+        modelos.biblioteca.REGISTRO_EVENTOS = False
+        modelos.biblioteca.INTERVALO_INSTANTANEO = 10000
+
+def testes_arquivo_emprestimos():
+    print(f"\n{NEGRITO}=== TESTES DE ARQUIVO DE EMPRÉSTIMOS ==={RESET}\n")
+    
+    import modelos.biblioteca
+    bib = criar_biblioteca_vazia()
+    membro1 = bib.adicionar_usuario('João', 'joao@email.com', 'senha123', '123.456.789-10', 'membro')
+    membro2 = bib.adicionar_usuario('Maria', 'maria@email.com', 'senha123', '111.222.333-44', 'membro')
+    livro1 = Livro('Python Avançado', None, None, 'Gustavo Peretti', 450, '978-3-16-148410-0', 'Programação')
+    livro2 = Livro('Algoritmos', None, None, 'Thomas Cormen', 1200, '978-8535236996', 'Computação')
+    bib.adicionar_item(livro1)
+    bib.adicionar_item(livro2)
+    
+    bib.emprestar_item(livro1, membro1)
+    bib.registrar_devolucao(bib.emprestimos[-1].id)
+    bib.emprestar_item(livro1, membro2)
+    atrasado = bib.emprestimos[-1]
+    atrasado._data_emprestimo -= datetime.timedelta(days=PRAZO_DEVOLUCAO + 2)
+    bib.registrar_devolucao(atrasado.id)
+    bib.registrar_pagamento_multa(atrasado.id)
+    bib.emprestar_item(livro2, membro1)
+    ativo = bib.emprestimos[-1]
+    
+    # Teste 1: Apenas os finalizados saem da memória
+    teste_assert(bib.arquivar_emprestimos_finalizados() == 2, "Empréstimos finalizados arquivados")
+    teste_assert(list(bib.emprestimos) == [ativo] and bib.emprestimos.buscar('membro', str(membro1.id)) == [ativo],
+                 "Registro e índices mantêm apenas os empréstimos em aberto")
+    teste_assert(bib._quantidade_em_aberto(membro1) == 1, "Índices de circulação preservados")
+    
+    # Teste 2: Consultas sobre as colunas
+    arquivo = bib.arquivo_emprestimos
+    historico = arquivo.historico_membro(membro2)
+    teste_assert(len(historico) == 1 and historico[0]['id'] == str(atrasado.id) and historico[0]['multa_paga'] is True,
+                 "Histórico do membro")
+    teste_assert(arquivo.circulacao_item(livro1) == 2 and arquivo.circulacao_item(livro2) == 0, "Circulação por item")
+    mes = atrasado.data_devolucao.strftime('%Y-%m')
+    teste_assert(arquivo.multas_por_mes() == {mes: atrasado.multa.valor}, "Multas agrupadas por mês")
+    teste_assert(historico[0]['data_devolucao'] == atrasado.data_devolucao, "Datas preservadas nas colunas")
+    
+    # Teste 3: Carga direta para o arquivo (sem criar os objetos)
+    modelos.biblioteca.ARQUIVAR_EMPRESTIMOS_FINALIZADOS = True
+    try:
+        recarregada = Biblioteca()
+    finally:
+        modelos.biblioteca.ARQUIVAR_EMPRESTIMOS_FINALIZADOS = False
+    teste_assert(len(recarregada.arquivo_emprestimos) == 2 and [str(e.id) for e in recarregada.emprestimos] == [str(ativo.id)],
+                 "Finalizados carregados no arquivo")
+    teste_assert(recarregada.arquivo_emprestimos.circulacao_item(livro1.id) == 2, "Consultas por id após a carga")
+    
+    # Teste 4: Modo lazy
+    lazy = BibliotecaLazy()
+    try:
+        lazy.arquivar_emprestimos_finalizados()
+        teste_assert(False, "Modo lazy recusa o arquivamento")
+    except RuntimeError:
+        teste_assert(True, "Modo lazy recusa o arquivamento")
+
+def testes_status_e_busca():
+    print(f"\n{NEGRITO}=== TESTES DE STATUS E BUSCA DE ITENS ==={RESET}\n")
+    
+    bib = criar_biblioteca_vazia()
+    conn = database.conexao()
+    membro = bib.adicionar_usuario('João', 'joao@email.com', 'senha123', '123.456.789-10', 'membro')
+    livro = Livro('O Senhor dos Anéis', None, None, 'J.R.R. Tolkien', 1200, '978-8533613379', 'Fantasia')
+    bib.adicionar_item(livro)
+    bib.emprestar_item(livro, membro)
+    emprestimo = bib.emprestimos[-1]
+    
+    # Teste 1: Status como enumeração, iguais ao texto e gravados como inteiros
+    teste_assert(emprestimo.status is StatusEmprestimo.ATIVO and emprestimo.status == 'ativo', "Status compara por identidade e texto")
+    tipo, valor = conn.execute("SELECT typeof(status), status FROM emprestimos").fetchone()
+    teste_assert(tipo == 'integer' and StatusEmprestimo.de_banco(valor) is StatusEmprestimo.ATIVO, "Status gravado como código inteiro")
+    recarregada = Biblioteca()
+    teste_assert(recarregada.emprestimos.obter(emprestimo.id).status is StatusEmprestimo.ATIVO
+                 and recarregada.itens.obter(livro.id)._status is StatusItem.EMPRESTADO, "Status restaurados na carga")
+    
+    # Teste 2: Migração converte status em texto de bancos antigos
+    conn = database.conexao()
+    conn.execute("DROP TABLE reservas")
+    conn.execute('''CREATE TABLE reservas (id TEXT PRIMARY KEY, item_id TEXT, membro_id TEXT, data_reserva TIMESTAMP,
+                     data_cancelamento TIMESTAMP, data_finalizacao TIMESTAMP, status TEXT)''')
+    conn.execute("INSERT INTO reservas (id, item_id, membro_id, data_reserva, status) VALUES ('r1', ?, ?, ?, 'aguardando')",
+                 (str(livro.id), str(membro.id), datetime.datetime.now()))
+    conn.execute("PRAGMA user_version = 4")
+    conn.commit()
+    database.migrar()
+    tipo, valor = conn.execute("SELECT typeof(status), status FROM reservas WHERE id = 'r1'").fetchone()
+    teste_assert(tipo == 'integer' and valor == StatusReserva.AGUARDANDO.codigo, "Migração converte status em texto")
+    
+    # Teste 3: Busca textual sem acentos, por prefixo e ordenada por relevância
+    bib = criar_biblioteca_vazia()
+    senhor = Livro('O Senhor dos Anéis', None, None, 'J.R.R. Tolkien', 1200, '978-8533613379', 'Fantasia')
+    hobbit = Livro('O Hobbit', None, None, 'J.R.R. Tolkien', 300, '978-8595084742', 'Fantasia')
+    guia = Livro('Guia de Fantasia', None, None, 'Ana Souza', 200, '978-0000000001', 'Referência')
+    bib.adicionar_itens_em_lote([senhor, hobbit, guia])
+    teste_assert(bib.buscar_itens('senhor aneis') == [senhor], "Busca ignora acentos e maiúsculas")
+    teste_assert(set(bib.buscar_itens('tolk')) == {senhor, hobbit}, "Busca por prefixo")
+    teste_assert(bib.buscar_itens('fantasia')[0] is guia, "Título pesa mais que categoria")
+    teste_assert(bib.buscar_itens('"') == [] and bib.buscar_itens('hobbit OR') == [], "Texto sem operadores de busca")
+    
+    # Teste 4: Índice mantido pelos gatilhos
+    bib.remover_item(hobbit.id)
+    teste_assert(bib.buscar_itens('hobbit') == [], "Item removido sai da busca")
+    conn = database.conexao()
+    conn.execute("UPDATE itens SET nome = 'O Silmarillion' WHERE id = ?", (str(senhor.id),))
+    conn.commit()
+    teste_assert(bib.buscar_itens('silmarillion') == [senhor] and bib.buscar_itens('aneis') == [], "Alteração reindexa o item")
+    
+    # Teste 5: Rowids de itens renumerados (como pode ocorrer em um VACUUM) não afetam o índice, que usa o id do item
+    conn.execute("UPDATE itens SET rowid = rowid + 100")
+    conn.commit()
+    conn.execute("VACUUM")
+    teste_assert(bib.buscar_itens('guia') == [guia] and bib.buscar_itens('silmarillion') == [senhor], "Busca válida após renumerar rowids")
+
+def testes_sugestao_itens():
+    print(f"\n{NEGRITO}=== TESTES DE SUGESTÕES DA BUSCA INCREMENTAL ==={RESET}\n")
+    
+    bib = criar_biblioteca_vazia()
+    senhor = Livro('O Senhor dos Anéis', None, None, 'J.R.R. Tolkien', 1200, '978-8533613379', 'Fantasia')
+    hobbit = Livro('O Hobbit', None, None, 'J.R.R. Tolkien', 300, '978-8595084742', 'Fantasia')
+    memorias = Livro('Memórias Póstumas de Brás Cubas', None, None, 'Machado de Assis', 200, '978-8508133031', 'Romance')
+    bib.adicionar_item(senhor)
+    bib.adicionar_itens_em_lote([hobbit, memorias])
+    
+    # Teste 1: Prefixos sem acentos e sem diferenciar maiúsculas
+    teste_assert(bib.sugerir_itens('MEMO') == [memorias] and bib.sugerir_itens('bras') == [memorias], "Sugestão ignora acentos e maiúsculas")
+    teste_assert(bib.sugerir_itens('anéis') == [senhor], "Consulta acentuada encontra o termo normalizado")
+    teste_assert(set(bib.sugerir_itens('tolk')) == {senhor, hobbit} and bib.sugerir_itens('tolk', limite=1) in ([senhor], [hobbit]),
+                 "Sugestões limitadas por prefixo")
+    
+    # Teste 2: Várias palavras (a última incompleta) e campos diferentes
+    teste_assert(bib.sugerir_itens('tolkien hob') == [hobbit], "Palavras completas restringem as sugestões")
+    teste_assert(bib.sugerir_itens('fantasia senhor') == [senhor] and bib.sugerir_itens('romance tolk') == [], "Título, autor e categoria indexados")
+    teste_assert(bib.sugerir_itens('') == [] and bib.sugerir_itens('xyz') == [], "Consulta vazia ou sem resultados")
+    
+    # Teste 3: Índice atualizado nas inclusões e remoções
+    bib.remover_item(hobbit.id)
+    teste_assert(bib.sugerir_itens('hob') == [] and set(bib.sugerir_itens('tolk')) == {senhor}, "Item removido sai das sugestões")
+    silmarillion = Livro('O Silmarillion', None, None, 'J.R.R. Tolkien', 400, '978-8595084759', 'Fantasia')
+    bib.adicionar_item(silmarillion)
+    teste_assert(bib.sugerir_itens('silm') == [silmarillion], "Item incluído aparece nas sugestões")
+    
+    # Teste 4: Carga da biblioteca reconstrói o índice
+    recarregada = Biblioteca()
+    teste_assert([str(i.id) for i in recarregada.sugerir_itens('silm')] == [str(silmarillion.id)], "Índice reconstruído na carga")
+
+def testes_facetas():
+    print(f"\n{NEGRITO}=== TESTES DE CONTAGENS POR FACETA ==={RESET}\n")
+    
+    bib = criar_biblioteca_vazia()
+    membro1 = bib.adicionar_usuario('João', 'joao@email.com', 'senha123', '123.456.789-10', 'membro')
+    membro2 = bib.adicionar_usuario('Maria', 'maria@email.com', 'senha123', '111.222.333-44', 'membro')
+    livro1 = Livro('Python Avançado', None, None, 'Gustavo Peretti', 450, '978-3-16-148410-0', 'Programação')
+    livro2 = Livro('Algoritmos', None, None, 'Thomas Cormen', 1200, '978-8535236996', 'Computação')
+    ebook = Ebook('Clean Code', None, None, 'Robert Martin', 464, '978-0132350884', 'Programação', 'clean_code.pdf', 'https://example.com/clean-code')
+    bib.adicionar_item(livro1)
+    bib.adicionar_itens_em_lote([livro2, ebook])
+    
+    # Teste 1: Contagens do acervo
+    teste_assert(bib.contagens('itens', 'categoria') == {'Programação': 2, 'Computação': 1}, "Itens por categoria")
+    teste_assert(bib.contagens('itens', 'tipo') == {'livro': 2, 'ebook': 1}, "Itens por tipo")
+    teste_assert(bib.quantidade('itens', 'status', 'disponivel') == 3, "Itens disponíveis")
+    teste_assert(bib.contagens('itens', 'autor') == {'Gustavo Peretti': 1, 'Thomas Cormen': 1, 'Robert Martin': 1}, "Itens por autor")
+    sem_autor = {'id': 'sem-autor', 'nome': 'Periódico', 'tipo': 'livro', 'categoria': 'Periódicos', 'status': 'disponivel'}
+    bib.itens.adicionar(sem_autor)
+    teste_assert(bib.quantidade('itens', 'autor', None) == 1, "Itens sem autor contados em None")
+    bib.itens.remover(sem_autor)
+    
+    # Teste 2: Transições de empréstimo e reserva
+    bib.emprestar_item(livro1, membro1)
+    emprestimo = bib.emprestimos[-1]
+    teste_assert(bib.quantidade('itens', 'status', StatusItem.EMPRESTADO) == 1 and bib.quantidade('itens', 'status', 'disponivel') == 2,
+                 "Status do item atualizado no empréstimo")
+    teste_assert(bib.quantidade('emprestimos', 'membro_status', (str(membro1.id), 'ativo')) == 1, "Empréstimos ativos do membro")
+    bib.reservar_item(livro1, membro2)
+    reserva = bib.reservas[-1]
+    teste_assert(bib.contagens('reservas', 'status') == {'aguardando': 1} and bib.quantidade('reservas', 'membro', str(membro2.id)) == 1,
+                 "Reservas por status e por membro")
+    bib.cancelar_reserva(reserva.id)
+    teste_assert(bib.contagens('reservas', 'status') == {'cancelada': 1}, "Cancelamento reclassifica a reserva")
+    bib.registrar_devolucao(emprestimo.id)
+    teste_assert(bib.contagens('emprestimos', 'status') == {'finalizado': 1} and bib.quantidade('itens', 'status', 'disponivel') == 3,
+                 "Devolução atualiza empréstimo e item")
+    
+    # Teste 3: Remoções e operações desfeitas
+    bib.remover_item(livro2.id)
+    teste_assert(bib.contagens('itens', 'categoria') == {'Programação': 2}, "Item removido sai das contagens")
+    with database.transacao() as conn:
+        conn.execute("CREATE TRIGGER falha_simulada BEFORE INSERT ON emprestimos BEGIN SELECT RAISE(ABORT, 'falha simulada'); END")
+    try:
+        bib.emprestar_item(ebook, membro1)
+    except sqlite3.DatabaseError:
+        pass
+    finally:
+        with database.transacao() as conn:
+            conn.execute("DROP TRIGGER falha_simulada")
+    teste_assert(bib.quantidade('itens', 'status', 'emprestado') == 0, "Contagens restauradas após falha")
+    teste_exception(lambda: bib.contagens('reservas', 'categoria'), ValueError, "Faceta inexistente recusada")
+    
+    # Teste 4: Carga e modo lazy (agregação no banco)
+    recarregada = Biblioteca()
+    teste_assert(recarregada.contagens('emprestimos', 'status') == {'finalizado': 1} and recarregada.contagens('itens', 'tipo') == {'livro': 1, 'ebook': 1},
+                 "Contagens reconstruídas na carga")
+    lazy = BibliotecaLazy()
+    teste_assert(lazy.contagens('reservas', 'status') == {'cancelada': 1} and lazy.quantidade('emprestimos', 'status', 'finalizado') == 1,
+                 "Modo lazy agrega no banco")
+    teste_assert(lazy.contagens('emprestimos', 'membro_status') == {(str(membro1.id), 'finalizado'): 1}
+                 and lazy.quantidade('emprestimos', 'membro_status', (str(membro1.id), 'finalizado')) == 1, "Faceta composta no modo lazy")
+    teste_assert(lazy.contagens('itens', 'categoria') == {'Programação': 2}, "Itens do modo lazy contados em memória")
+
+def testes_busca_usuarios():
+    print(f"\n{NEGRITO}=== TESTES DE BUSCA DE USUÁRIOS ==={RESET}\n")
+    
+    bib = criar_biblioteca_vazia()
+    joana = bib.adicionar_usuario('Joana Ávila', 'Joana@Email.com', 'senha123', '123.456.789-10', 'membro')
+    joaquim = bib.adicionar_usuario('Joaquim Souza', 'joaquim@email.com', 'senha123', '111.222.333-44', 'membro')
+    josefa = bib.adicionar_usuario('Josefa Lima', 'josefa@email.com', 'senha123', '555.666.777-88', 'bibliotecario')
+    
+    # Teste 1: Login por email normalizado
+    teste_assert(bib.autenticar('joana@email.com', 'senha123') is joana and bib.autenticar(' JOANA@EMAIL.COM', 'senha123') is joana,
+                 "Autenticação sem diferenciar maiúsculas")
+    teste_assert(bib.autenticar('joana@email.com', 'errada') is None and bib.autenticar('ninguem@email.com', 'senha123') is None,
+                 "Credenciais inválidas recusadas")
+    teste_exception(lambda: bib.adicionar_usuario('Outra Joana', 'JOANA@email.com', 'senha123', '999.888.777-66', 'membro'), ValueError,
+                    "Email repetido com outra capitalização recusado")
+    
+    # Teste 2: CPF com ou sem pontuação
+    teste_assert(bib.usuario_por_cpf('111.222.333-44') is joaquim and bib.usuario_por_cpf('11122233344') is joaquim, "Busca por CPF normalizado")
+    teste_assert(bib.buscar_usuarios('555.666.777-88') == [josefa] and bib.buscar_usuarios('555.666.777-88', tipo='membro') == [],
+                 "Seletor encontra CPF completo respeitando o tipo")
+    
+    # Teste 3: Prefixo do nome
+    teste_assert(set(bib.buscar_usuarios('jo', tipo='membro')) == {joana, joaquim}, "Prefixo do nome restrito a membros")
+    teste_assert(bib.buscar_usuarios('joana avi') == [joana] and bib.buscar_usuarios('JOAQ') == [joaquim], "Várias palavras, acentos e maiúsculas")
+    teste_assert(bib.buscar_usuarios('joana@email.com') == [joana] and bib.buscar_usuarios('') == [], "Email completo e consulta vazia")
+    
+    # Teste 4: Remoção e recarga
+    bib.remover_usuario(joaquim.id)
+    teste_assert(bib.buscar_usuarios('joaq') == [] and bib.usuario_por_cpf('11122233344') is None, "Usuário removido sai dos índices")
+    recarregada = Biblioteca()
+    teste_assert(str(recarregada.autenticar('joana@email.com', 'senha123').id) == str(joana.id)
+                 and [u.nome for u in recarregada.buscar_usuarios('jos')] == ['Josefa Lima'], "Índices reconstruídos na carga")
+
+def testes_consultas_paginadas():
+    print(f"\n{NEGRITO}=== TESTES DE CONSULTAS PAGINADAS ==={RESET}\n")
+    
+    bib = criar_biblioteca_vazia()
+    ana = bib.adicionar_usuario('Ana', 'ana@email.com', 'senha123', '123.456.789-10', 'membro')
+    bruno = bib.adicionar_usuario('Bruno', 'bruno@email.com', 'senha123', '111.222.333-44', 'membro')
+    livros = [Livro(f'Livro {letra}', None, None, 'Autor', 100, f'978-000000000{i}', 'Teste') for i, letra in enumerate('CAB')]
+    for livro in livros:
+        bib.adicionar_item(livro)
+    bib.emprestar_item(livros[0], bruno)
+    bib.emprestar_item(livros[1], ana)
+    bib.emprestar_item(livros[2], ana)
+    emprestimos = list(bib.emprestimos)
+    bib.reservar_item(livros[0], ana)
+    
+    # Teste 1: Ordenação e paginação feitas pelo banco
+    teste_assert(bib.consultar_emprestimos('ativo') == emprestimos, "Ordem padrão pela data do empréstimo")
+    teste_assert([e.item.nome for e in bib.consultar_emprestimos('ativo', ordem='item')] == ['Livro A', 'Livro B', 'Livro C'], "Ordenação pelo nome do item")
+    teste_assert([e.membro.nome for e in bib.consultar_emprestimos(ordem='membro', decrescente=True)][0] == 'Bruno', "Ordenação decrescente pelo membro")
+    paginas = bib.consultar_emprestimos(ordem='item', limite=2) + bib.consultar_emprestimos(ordem='item', limite=2, deslocamento=2)
+    teste_assert(paginas == bib.consultar_emprestimos(ordem='item'), "Páginas consecutivas sem repetição")
+    
+    # Teste 2: Filtros por status e membro
+    teste_assert(bib.consultar_emprestimos('ativo', ana) == emprestimos[1:], "Filtro por membro")
+    teste_assert(bib.consultar_emprestimos(('multado', 'finalizado')) == [], "Filtro por vários status")
+    teste_assert(bib.consultar_reservas('aguardando', ana, ordem='item') == list(bib.reservas), "Reservas filtradas")
+    teste_exception(lambda: bib.consultar_reservas(ordem='renovacoes'), ValueError, "Ordenação inexistente recusada")
+    
+    # Teste 3: Modo lazy hidrata as páginas diretamente
+    lazy = BibliotecaLazy()
+    teste_assert([str(e.id) for e in lazy.consultar_emprestimos('ativo', ordem='data_prevista', decrescente=True, limite=2)]
+                 == [str(e.id) for e in bib.consultar_emprestimos('ativo', ordem='data_prevista', decrescente=True, limite=2)],
+                 "Mesma página no modo lazy")
+    
+    # Teste 4: Reservas de itens removidos (não carregadas) não encurtam nem deslocam as páginas
+    carla = bib.adicionar_usuario('Carla', 'carla@email.com', 'senha123', '555.666.777-88', 'membro')
+    for livro in livros[1:]:
+        bib.reservar_item(livro, bruno)
+        bib.reservar_item(livro, carla)
+    conn = database.conexao()
+    conn.execute("DELETE FROM itens WHERE id = ?", (str(livros[1].id),))
+    conn.commit()
+    for biblioteca in (Biblioteca(), BibliotecaLazy()):
+        paginas = [biblioteca.consultar_reservas(limite=2, deslocamento=deslocamento) for deslocamento in (0, 2)]
+        teste_assert([len(pagina) for pagina in paginas] == [2, 1], f"Páginas completas apesar de linhas órfãs ({type(biblioteca).__name__})")
+        teste_assert([str(r.id) for r in paginas[0] + paginas[1]] == [str(r.id) for r in biblioteca.consultar_reservas()]
+                     and len(paginas[0] + paginas[1]) == 3, f"Páginas sem repetição após linhas órfãs ({type(biblioteca).__name__})")
 
 # ============ FUNÇÃO PRINCIPAL ============
 def executar_todos_testes():
@@ -515,6 +1516,26 @@ def executar_todos_testes():
         testes_renovacoes()
         testes_devolucoes_multas()
         testes_fila_reserva()
+        testes_registro()
+        testes_carga()
+        testes_transacao()
+        testes_migracoes()
+        testes_modo_lazy()
+        testes_contadores_circulacao()
+        testes_expiracao_reservas()
+        testes_importacao()
+        testes_usuarios_em_lote()
+        testes_exportacao()
+        testes_devolucoes_em_lote()
+        testes_unidade_trabalho()
+        testes_escrita_adiada()
+        testes_log_eventos()
+        testes_arquivo_emprestimos()
+        testes_status_e_busca()
+        testes_sugestao_itens()
+        testes_facetas()
+        testes_busca_usuarios()
+        testes_consultas_paginadas()
     except Exception as e:
         print(f"\n{VERMELHO}ERRO CRÍTICO NA SUITE DE TESTES:{RESET}")
         print(f"  {type(e).__name__}: {e}")
@@ -522,6 +1543,7 @@ def executar_todos_testes():
         traceback.print_exc()
     finally:
         # Limpar banco de teste ao final
+        database.fechar_conexoes()
         if os.path.exists(TEST_DB):
             try:
                 os.remove(TEST_DB)